@@ -0,0 +1,45 @@
+"""
+Gunicorn settings for serving Trasker in production.
+
+    gunicorn -c Trasker/gunicorn.conf.py Trasker.wsgi
+
+Every view is synchronous, so this runs the WSGI app on threaded (gthread) workers: threads let a
+worker keep serving while other requests wait on PostgreSQL or stream a document download. With
+CONN_MAX_AGE each thread keeps its own database connection, so the server holds up to
+workers x threads connections; keep that under PostgreSQL's max_connections (100 by default).
+The default worker count is capped at MAX_DEFAULT_WORKERS so it stays under that budget.
+
+Environment:
+    PORT                  listen port (default 8000)
+    WEB_CONCURRENCY       worker processes (default 2 x usable CPUs + 1, at most MAX_DEFAULT_WORKERS)
+    GUNICORN_THREADS      threads per worker (default 4)
+    GUNICORN_TIMEOUT      seconds a request may take before its worker is restarted (default 60)
+"""
+import os
+
+# 9 workers x 4 threads = 36 connections, leaving room under max_connections=100 for a second
+# instance, migrations and psql sessions.
+MAX_DEFAULT_WORKERS = 9
+
+
+def usable_cpus():
+    """CPUs this process may run on. Unlike os.cpu_count(), this honours affinity limits such as docker --cpuset-cpus."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS.
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", min(usable_cpus() * 2 + 1, MAX_DEFAULT_WORKERS)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+# Recycle workers now and then so a slow leak can't grow forever; jitter keeps them from restarting together.
+max_requests = 2000
+max_requests_jitter = 200
+# Import the app once in the master so workers fork with it loaded and share its memory.
+preload_app = True
+accesslog = "-"
+errorlog = "-"
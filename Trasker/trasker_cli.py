@@ -125,17 +125,23 @@ def main():
     elif args.list:
         trasker.print_tasks(trasker.list_tasks())
     elif args.listCategory:
-        trasker.print_tasks(trasker.list_category_tasks(args.listCategory[0]))
+        trasker.print_tasks(trasker.query_tasks({"category": args.listCategory[0]}))
     elif args.listPriority:
-        trasker.print_tasks(trasker.list_priority_tasks(args.listPriority[0]))
+        trasker.print_tasks(trasker.query_tasks({"priority": args.listPriority[0]}))
     elif args.listStatus:
-        trasker.print_tasks(trasker.list_status_tasks(args.listStatus[0]))
+        trasker.print_tasks(trasker.query_tasks({"status": args.listStatus[0]}))
     elif args.listSub:
-        trasker.print_tasks(trasker.list_sub_tasks(args.listSub[0]))
+        trasker.print_tasks(trasker.query_tasks({"parent_task_id": args.listSub[0]}))
     elif args.listDateFrame:
-        trasker.print_tasks(trasker.search_task_by_dateframe(args.listDateFrame[0], args.listDateFrame[1]))
+        trasker.print_tasks(trasker.query_tasks({"due_from": args.listDateFrame[0], "due_to": args.listDateFrame[1]}))
     elif args.listAll:
-        trasker.print_tasks(trasker.list_all_tasks())
+        # Print page by page so the first rows appear without loading the whole table.
+        printed = False
+        for page in trasker.pages(trasker.list_all_tasks):
+            trasker.print_tasks(page)
+            printed = True
+        if not printed:
+            trasker.print_tasks([])
     elif args.search:
         trasker.print_tasks(trasker.search_task_by_keyword(args.search[0]))
     elif args.complete:
@@ -174,11 +180,12 @@ def main():
 
     # ----- Process Bugs Management Commands -----
     elif args.listBugs:
-        bugs = trasker.list_all_bugs()
-        if bugs:
-            for bug in bugs:
+        printed = False
+        for page in trasker.pages(trasker.list_all_bugs):
+            for bug in page:
                 print(bug)
-        else:
+            printed = True
+        if not printed:
             print("No bugs found.")
     elif args.listBugsByTask:
         bugs = trasker.list_bugs_by_task(args.listBugsByTask[0])
@@ -207,7 +214,13 @@ def main():
     elif args.addNote:
         trasker.add_note(args.addNote[0], args.addNote[1], args.addNote[2])
     elif args.listNotes:
-        trasker.print_notes(trasker.list_notes(args.listNotes[0], args.listNotes[1]))
+        printed = False
+        for page in trasker.pages(trasker.list_notes, args.listNotes[0], args.listNotes[1]):
+            for note in page:
+                print(note)
+            printed = True
+        if not printed:
+            print("No notes found.")
     elif args.deleteNote:
         trasker.delete_note(args.deleteNote)
 
@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import psycopg2
+from psycopg2 import OperationalError, pool
+
+# Default host options, tried in this order of preference.
+LOCAL_DB_HOST = "192.168.68.123"
+EXTERNAL_DB_HOST = os.environ.get("DB_HOST", "EXTERNAL_IP_ADDRESS")
+
+# Where the last working endpoint is remembered, and for how long (seconds).
+HOST_CACHE_FILE = os.environ.get("DB_HOST_CACHE", os.path.join(os.path.expanduser("~"), ".trasker", "db_host.json"))
+HOST_CACHE_TTL = int(os.environ.get("DB_HOST_CACHE_TTL", "3600"))
+CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))
+
+
+def parse_hosts(hosts, port):
+    """Parse "host[:port],host[:port]" into (host, port) pairs, using port where an entry has none."""
+    candidates = []
+    for entry in hosts.split(","):
+        host, _, host_port = entry.strip().partition(":")
+        if host:
+            candidates.append((host, host_port or port))
+    return candidates
+
+
+def default_candidates():
+    """
+    Return the (host, port) pairs to probe.
+    DB_HOSTS may list them explicitly as "host[:port],host[:port]"; otherwise local first, then external.
+    """
+    port = os.environ.get("DB_PORT", "5432")
+    hosts = os.environ.get("DB_HOSTS")
+    if hosts:
+        return parse_hosts(hosts, port)
+    return [(LOCAL_DB_HOST, port), (EXTERNAL_DB_HOST, port)]
+
+
+class ConnectionFactory:
+    """
+    Resolves which database host is reachable and hands out connections or pools for it.
+    The winning host is cached in memory and on disk so later process starts skip the probe.
+    """
+
+    def __init__(self, candidates=None, cache_file=HOST_CACHE_FILE, ttl=HOST_CACHE_TTL, timeout=CONNECT_TIMEOUT):
+        self.candidates = candidates if candidates is not None else default_candidates()
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.timeout = timeout
+        self.endpoint = None
+        self.lock = threading.Lock()
+
+    def connection_params(self, host, port):
+        return {
+            "host": host,
+            "port": port,
+            "database": os.environ.get("DB_NAME", "trasker_db"),
+            "user": os.environ.get("DB_USER", "trasker_user"),
+            "password": os.environ.get("DB_PASSWORD", "wotgyx-Risky5-hazsej"),
+            "connect_timeout": self.timeout,
+        }
+
+    # ---------------- HOST CACHE ----------------
+
+    def load_cached_endpoint(self):
+        """Return the cached (host, port) if it is still fresh and still a candidate, else None."""
+        try:
+            with open(self.cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        endpoint = (cached.get("host"), str(cached.get("port")))
+        if time.time() - cached.get("resolved_at", 0) > self.ttl:
+            return None
+        if endpoint not in [(host, str(port)) for host, port in self.candidates]:
+            return None
+        return endpoint
+
+    def save_cached_endpoint(self, endpoint):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(self.cache_file, "w") as f:
+                json.dump({"host": endpoint[0], "port": endpoint[1], "resolved_at": time.time()}, f)
+        except OSError as e:
+            print("Could not write database host cache:", e)
+
+    def invalidate(self):
+        """Forget the resolved host, e.g. after its connections start failing."""
+        with self.lock:
+            self.endpoint = None
+            try:
+                os.remove(self.cache_file)
+            except OSError:
+                pass
+
+    # ---------------- HOST RESOLUTION ----------------
+
+    def probe(self):
+        """
+        Try every candidate at once and return (endpoint, connection) for the first one that answers.
+        Slower probes are not waited for; their connections are closed when they finish.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(self.candidates) or 1)
+        futures = {
+            executor.submit(psycopg2.connect, **self.connection_params(host, port)): (host, port)
+            for host, port in self.candidates
+        }
+        errors = []
+        try:
+            for future in as_completed(futures):
+                endpoint = futures[future]
+                try:
+                    conn = future.result()
+                except OperationalError as e:
+                    print(f"Connection to {endpoint[0]} failed:", e)
+                    errors.append(e)
+                    continue
+                for other in futures:
+                    if other is not future:
+                        other.add_done_callback(_close_probe_connection)
+                return endpoint, conn
+        finally:
+            executor.shutdown(wait=False)
+        raise errors[-1] if errors else OperationalError("No database hosts configured.")
+
+    def resolve(self):
+        """
+        Return (endpoint, connection) for a reachable host.
+        Uses the cached endpoint when fresh and falls back to a parallel probe of all candidates.
+        """
+        with self.lock:
+            endpoint = self.endpoint or self.load_cached_endpoint()
+            if endpoint:
+                try:
+                    conn = psycopg2.connect(**self.connection_params(*endpoint))
+                    self.endpoint = endpoint
+                    return endpoint, conn
+                except OperationalError as e:
+                    print(f"Cached database host {endpoint[0]} failed:", e)
+                    print("Probing all database hosts...")
+            endpoint, conn = self.probe()
+            self.endpoint = endpoint
+            self.save_cached_endpoint(endpoint)
+            print("Connected to database at", endpoint[0])
+            return endpoint, conn
+
+    # ---------------- CONNECTIONS ----------------
+
+    def connect(self):
+        """Open a single connection to the resolved host."""
+        endpoint, conn = self.resolve()
+        return conn
+
+    def create_pool(self, minconn=1, maxconn=10):
+        """Create a ThreadedConnectionPool against the resolved host."""
+        endpoint, conn = self.resolve()
+        conn.close()
+        return pool.ThreadedConnectionPool(minconn, maxconn, **self.connection_params(*endpoint))
+
+
+def _close_probe_connection(future):
+    """Close the connection of a probe that lost the race."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+_factory = None
+_factory_lock = threading.Lock()
+
+
+def get_connection_factory():
+    """Return the process-wide ConnectionFactory shared by the GUI, CLI and setup scripts."""
+    global _factory
+    with _factory_lock:
+        if _factory is None:
+            _factory = ConnectionFactory()
+        return _factory
@@ -1,61 +1,36 @@
+import hashlib
 import psycopg2
 from psycopg2 import sql, OperationalError
 from datetime import datetime
 import os
+from trasker_connection import HOST_CACHE_FILE, ConnectionFactory, parse_hosts
+
+
+# setup(), drop() and the migrations go to the local development server unless DB_HOSTS names another one,
+# so a stray run never drops the shared database the GUI uses by default.
+DEV_DB_HOSTS = "127.0.0.1:5433"
+SETUP_HOST_CACHE_FILE = os.path.join(os.path.dirname(HOST_CACHE_FILE), "setup_db_host.json")
+_factory = None
 
 
 def connect():
     """
-    Try connecting to the local PostgreSQL server first (using a 5-second timeout).
-    If that fails, fall back to the external host.
+    Open a connection for the setup, drop and migration scripts: DB_HOSTS if it is set, else DEV_DB_HOSTS.
+    The reachable host is cached apart from the GUI's, so neither overwrites the other's choice.
     """
-    # Define the two host options.
-    LOCAL_DB_HOST = "127.0.0.1"
-    # EXTERNAL_DB_HOST = os.environ.get("DB_HOST", "IP_ADDRESS_HERE")
-
-    # Other connection parameters.
-    DB_NAME = os.environ.get("DB_NAME", "trasker_db")
-    DB_USER = os.environ.get("DB_USER", "trasker_user")
-    DB_PASSWORD = os.environ.get("DB_PASSWORD", "wotgyx-Risky5-hazsej")
-    DB_PORT = os.environ.get("DB_PORT", "5433")
-
-    # Try connecting to the local database first.
-    try:
-        conn = psycopg2.connect(
-            host=LOCAL_DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            port=DB_PORT,
-            connect_timeout=5  # Timeout in seconds
-        )
-        print("Connected to local database at", LOCAL_DB_HOST)
-        return conn
-    except OperationalError as local_error:
-        print("Local connection failed:", local_error)
-        print("Falling back to external connection...")
-
-    # Try connecting to the external database.
-    # try:
-    #     conn = psycopg2.connect(
-    #         host=EXTERNAL_DB_HOST,
-    #         database=DB_NAME,
-    #         user=DB_USER,
-    #         password=DB_PASSWORD,
-    #         port=DB_PORT,
-    #         connect_timeout=5  # You can adjust this timeout as needed
-    #     )
-    #     print("Connected to external database at", EXTERNAL_DB_HOST)
-    #     return conn
-    # except OperationalError as external_error:
-    #     print("External connection failed:", external_error)
-    #     raise external_error
+    global _factory
+    if _factory is None:
+        candidates = parse_hosts(os.environ.get("DB_HOSTS", DEV_DB_HOSTS), os.environ.get("DB_PORT", "5432"))
+        _factory = ConnectionFactory(candidates, cache_file=SETUP_HOST_CACHE_FILE)
+    return _factory.connect()
 
 def setup():
     """Setup the database with tables for multi-user support:
        - Users, Teams, and a mapping table user_team.
        - Existing tables (epics, sprints, tasks, bugs, notes, documents) now include user_id and team_id.
+       Existing databases with TEXT date columns are upgraded with trasker_migrate.py instead.
     """
+    from trasker_migrate import has_typed_columns, mark_applied, migrate
     conn = connect()
     cursor = conn.cursor()
 
@@ -98,8 +73,8 @@ def setup():
             id SERIAL PRIMARY KEY,
             name TEXT,
             description TEXT,
-            start_date TEXT,
-            end_date TEXT,
+            start_date DATE,
+            end_date DATE,
             user_id INTEGER,
             team_id INTEGER,
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
@@ -113,8 +88,8 @@ def setup():
             id SERIAL PRIMARY KEY,
             title TEXT NOT NULL,
             description TEXT,
-            start_date TEXT,
-            end_date TEXT,
+            start_date DATE,
+            end_date DATE,
             epic_id INTEGER DEFAULT NULL,
             user_id INTEGER,
             team_id INTEGER,
@@ -130,7 +105,7 @@ def setup():
             id SERIAL PRIMARY KEY,
             title TEXT NOT NULL,
             description TEXT,
-            due_date TEXT,
+            due_date DATE,
             status TEXT DEFAULT 'Pending',
             category TEXT DEFAULT 'General',
             priority TEXT DEFAULT 'Medium',
@@ -151,9 +126,26 @@ def setup():
         CREATE TABLE IF NOT EXISTS task_sessions (
             id SERIAL PRIMARY KEY,
             task_id INTEGER NOT NULL,
-            start_time TEXT,
-            end_time TEXT,
+            start_time TIMESTAMPTZ,
+            end_time TIMESTAMPTZ,
             elapsed_time INTEGER DEFAULT 0,
+            user_id INTEGER,
+            FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+        )
+    ''')
+    cursor.execute("ALTER TABLE task_sessions ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE SET NULL")
+
+    # Per task, per user, per day totals maintained by Trasker.stop_task_timer.
+    # user_id 0 collects sessions that were started without a known user.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_time_rollups (
+            task_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL DEFAULT 0,
+            day DATE NOT NULL,
+            elapsed_time BIGINT NOT NULL DEFAULT 0,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (task_id, user_id, day),
             FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE CASCADE
         )
     ''')
@@ -165,8 +157,8 @@ def setup():
             title TEXT NOT NULL,
             description TEXT,
             status TEXT DEFAULT 'Open',
-            created_date TEXT,
-            resolved_date TEXT,
+            created_date TIMESTAMPTZ,
+            resolved_date TIMESTAMPTZ,
             task_id INTEGER DEFAULT NULL,
             user_id INTEGER,
             team_id INTEGER,
@@ -185,8 +177,8 @@ def setup():
             reference_id INTEGER, -- The ID of the associated epic/sprint/task/bug
             user_id INTEGER,
             team_id INTEGER,
-            created_date TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            created_date TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+            updated_date TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
             FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE SET NULL
         )
@@ -200,7 +192,7 @@ def setup():
             filename TEXT,
             mimetype TEXT,
             document_blob BYTEA,
-            upload_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            upload_date TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
             user_id INTEGER,
             team_id INTEGER,
             FOREIGN KEY (note_id) REFERENCES notes(id) ON DELETE CASCADE,
@@ -209,19 +201,28 @@ def setup():
         )
     ''')
 
+    # Tables created above have typed date columns already, so migration 1 has nothing to convert.
+    # Tables that already existed may still have TEXT ones; migrate() below converts those.
+    if has_typed_columns(cursor):
+        mark_applied(cursor, {1})
+
     conn.commit()
     cursor.close()
     conn.close()
+    migrate(explain=False)
     print("[SETUP] Database initialized successfully.")
 
 def drop():
     """Drop all tables in the database."""
     conn = connect()
     cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS document_versions")
     cursor.execute("DROP TABLE IF EXISTS documents")
+    cursor.execute("DROP TABLE IF EXISTS document_blobs")
     cursor.execute("DROP TABLE IF EXISTS notes")
     cursor.execute("DROP TABLE IF EXISTS bug_tasks")
     cursor.execute("DROP TABLE IF EXISTS bugs")
+    cursor.execute("DROP TABLE IF EXISTS task_time_rollups")
     cursor.execute("DROP TABLE IF EXISTS task_sessions")
     cursor.execute("DROP TABLE IF EXISTS tasks")
     cursor.execute("DROP TABLE IF EXISTS sprints")
@@ -229,11 +230,29 @@ def drop():
     cursor.execute("DROP TABLE IF EXISTS user_team")
     cursor.execute("DROP TABLE IF EXISTS teams")
     cursor.execute("DROP TABLE IF EXISTS users")
+    cursor.execute("DROP TABLE IF EXISTS schema_migrations")
+    cursor.execute("DROP FUNCTION IF EXISTS document_versions_refcount() CASCADE")
+    cursor.execute("DROP FUNCTION IF EXISTS trasker_notify_change() CASCADE")
     conn.commit()
     cursor.close()
     conn.close()
     print("[DROP] All tables dropped.")
 
+def rebuild_time_rollups(conn=None):
+    """Recompute task_time_rollups from every closed task session (e.g. after importing old data)."""
+    from trasker_migrate import REBUILD_TIME_ROLLUPS
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+    cursor = conn.cursor()
+    for statement in REBUILD_TIME_ROLLUPS:
+        cursor.execute(statement)
+    conn.commit()
+    cursor.close()
+    if own_conn:
+        conn.close()
+    print("[ROLLUPS] Task time rollups rebuilt.")
+
 def insert_sample_data():
     conn = connect()
     cursor = conn.cursor()
@@ -372,13 +391,26 @@ def insert_sample_data():
     ]
     for doc in document_data:
         # For documents, assign them to hsmith and "Projects Together".
+        # Content lives in the deduplicated blob store; documents and document_versions reference it by hash.
+        content_hash = hashlib.sha256(doc[3]).hexdigest()
         cursor.execute("""
-            INSERT INTO documents (note_id, filename, mimetype, document_blob, user_id, team_id)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (doc[0], doc[1], doc[2], doc[3], user_ids["hsmith"], team_ids["Projects Together"]))
+            INSERT INTO document_blobs (content_hash, content, size) VALUES (%s, %s, %s)
+            ON CONFLICT (content_hash) DO NOTHING
+        """, (content_hash, doc[3], len(doc[3])))
+        cursor.execute("""
+            INSERT INTO documents (note_id, filename, mimetype, content_hash, size, version, user_id, team_id)
+            VALUES (%s, %s, %s, %s, %s, 1, %s, %s)
+            RETURNING id
+        """, (doc[0], doc[1], doc[2], content_hash, len(doc[3]), user_ids["hsmith"], team_ids["Projects Together"]))
+        document_id = cursor.fetchone()[0]
+        cursor.execute("""
+            INSERT INTO document_versions (document_id, version, content_hash, filename, mimetype, size, user_id)
+            VALUES (%s, 1, %s, %s, %s, %s, %s)
+        """, (document_id, content_hash, doc[1], doc[2], len(doc[3]), user_ids["hsmith"]))
 
     conn.commit()
     cursor.close()
+    rebuild_time_rollups(conn)
     conn.close()
     print("[SAMPLE DATA] Sample data inserted successfully.")
 
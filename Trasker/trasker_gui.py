@@ -1,5 +1,7 @@
 import configparser
 import os
+import queue
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from trasker_psql import Trasker
@@ -13,6 +15,15 @@ from trasker_gui.notes_view import NotesView
 from trasker_gui.documents_view import DocumentsView
 from trasker_gui.setting_view import SettingView
 from trasker_gui.admin_view import AdminView
+from trasker_gui.query_runner import QueryRunner
+
+# Set TRASKER_STARTUP_PROFILE=1 to print how long each view takes to build.
+STARTUP_PROFILE = os.environ.get("TRASKER_STARTUP_PROFILE") == "1"
+# How often database change notifications are handed to the views, in milliseconds. Changes arriving
+# within one interval reach a view as one batch.
+CHANGE_DISPATCH_INTERVAL = 250
+# Changes queued for a hidden view beyond this are replaced by a single full reload.
+MAX_PENDING_CHANGES = 200
 
 
 class LoginDialog(tk.Toplevel):
@@ -86,6 +97,17 @@ class TraskerGUI(tk.Tk):
             self.current_user = login_dialog.result
             self.trasker.set_current_user(self.current_user)
 
+        # Views run their list queries on this worker pool instead of the Tk main loop.
+        self.queries = QueryRunner(self)
+
+        # Row changes from any client arrive on the listener thread and are dispatched from the Tk loop.
+        self.changes = queue.Queue()
+        self.pending_changes = {}  # view name -> changes that arrived while the view was hidden
+        self.current_view = None
+        self.trasker.subscribe(self.changes.put)
+        self.after(CHANGE_DISPATCH_INTERVAL, self.dispatch_changes)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Create navigation bar.
         nav_menu = ttk.Frame(self, relief="raised")
         nav_menu.pack(side="top", fill="x")
@@ -110,28 +132,56 @@ class TraskerGUI(tk.Tk):
             btn = ttk.Button(nav_menu, text=text, command=lambda vn=view_name: self.show_frame(vn))
             btn.pack(side="left", padx=5, pady=5)
 
-        # Container for all views.
+        # Container for all views. Views are built the first time they are shown, then cached in self.frames.
         self.frames = {}
-        container = ttk.Frame(self)
-        container.pack(side="top", fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        self.container = ttk.Frame(self)
+        self.container.pack(side="top", fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
         view_classes = (
         HomeView, EpicView, SprintView, BoardView, TaskView, BugView, NotesView, DocumentsView, SettingView, AdminView)
-        for ViewClass in view_classes:
-            frame = ViewClass(container, self)
-            self.frames[ViewClass.__name__] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.view_classes = {ViewClass.__name__: ViewClass for ViewClass in view_classes}
 
+        # Startup profile: seconds spent constructing each view, and from login to the first painted view.
+        self.view_build_times = {}
+        self.login_time = time.perf_counter()
         self.show_frame("HomeView")
+        self.after_idle(self.record_first_paint)
 
-    def show_frame(self, view_name):
+    def get_frame(self, view_name):
+        """Return the view, building and caching it on first use. The bool is True if it was just built."""
         frame = self.frames.get(view_name)
+        if frame is not None:
+            return frame, False
+        ViewClass = self.view_classes.get(view_name)
+        if ViewClass is None:
+            return None, False
+        started = time.perf_counter()
+        frame = ViewClass(self.container, self)
+        frame.grid(row=0, column=0, sticky="nsew")
+        self.frames[view_name] = frame
+        self.view_build_times[view_name] = time.perf_counter() - started
+        if STARTUP_PROFILE:
+            print(f"[STARTUP] Built {view_name} in {self.view_build_times[view_name] * 1000:.0f} ms")
+        return frame, True
+
+    def show_frame(self, view_name):
+        frame, built = self.get_frame(view_name)
         if frame:
             frame.tkraise()
-            if view_name == "TaskView" and hasattr(frame, "filter_tasks"):
-                frame.filter_tasks()
+            self.current_view = view_name
+            changes = self.pending_changes.pop(view_name, None)
+            # A view that was just built has already loaded its data.
+            if built:
+                return
+            if self.trasker.listener.connected:
+                # Live updates: only catch up on what changed while the view was hidden.
+                if changes:
+                    frame.on_data_changed(changes)
+                return
+            if view_name == "TaskView" and hasattr(frame, "load_tasks"):
+                frame.load_tasks()
             if view_name == "BoardView" and hasattr(frame, "refresh_board"):
                 frame.refresh_board()
             if view_name == "HomeView" and hasattr(frame, "refresh_home"):
@@ -139,6 +189,41 @@ class TraskerGUI(tk.Tk):
         else:
             print(f"View {view_name} not found")
 
+    def dispatch_changes(self):
+        """
+        Hand queued change notifications to the views watching their tables: straight away to the
+        visible view, and on its next show_frame() to the others.
+        """
+        changes = []
+        while True:
+            try:
+                changes.append(self.changes.get_nowait())
+            except queue.Empty:
+                break
+        for view_name, frame in self.frames.items():
+            tables = getattr(frame, "watched_tables", None)
+            if not tables:
+                continue
+            relevant = [change for change in changes if change.get("table") in tables or change["op"] == "resync"]
+            if not relevant:
+                continue
+            if view_name == self.current_view:
+                try:
+                    frame.on_data_changed(relevant)
+                except Exception as e:
+                    print("Failed to apply changes:", e)
+                continue
+            pending = self.pending_changes.setdefault(view_name, [])
+            pending.extend(relevant)
+            if len(pending) > MAX_PENDING_CHANGES:
+                self.pending_changes[view_name] = [{"table": None, "op": "resync"}]
+        self.after(CHANGE_DISPATCH_INTERVAL, self.dispatch_changes)
+
+    def record_first_paint(self):
+        self.first_paint_time = time.perf_counter() - self.login_time
+        if STARTUP_PROFILE:
+            print(f"[STARTUP] Login to first paint: {self.first_paint_time * 1000:.0f} ms")
+
     def set_dark_mode(self):
         """Apply dark mode to the root window."""
         bg_color = "#2e2e2e"
@@ -172,6 +257,12 @@ class TraskerGUI(tk.Tk):
                 return config["Settings"]["theme"]
         return "light"
 
+    def on_close(self):
+        """Stop the query workers and release pooled connections before closing the window."""
+        self.queries.shutdown()
+        self.trasker.close()
+        self.destroy()
+
 
 if __name__ == "__main__":
     app = TraskerGUI()
@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from trasker_psql import Trasker
 
 class AdminView(ttk.Frame):
     def __init__(self, parent, controller):
@@ -10,7 +9,7 @@ class AdminView(ttk.Frame):
         """
         super().__init__(parent)
         self.controller = controller
-        self.trasker = Trasker()  # Use the Trasker instance for all DB interactions.
+        self.trasker = controller.trasker  # Share the controller's pooled Trasker instance.
 
         # Create Notebook with two tabs: one for user and one for team management.
         self.notebook = ttk.Notebook(self)
@@ -133,8 +132,7 @@ class AdminView(ttk.Frame):
         confirm = messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete user '{user[1]}'?")
         if confirm:
             try:
-                query = "DELETE FROM users WHERE id = %s"
-                self.trasker.db_execute(query, (user_id,))
+                self.trasker.delete_user(user_id)
                 messagebox.showinfo("Success", "User deleted successfully.")
                 self.refresh_users()
             except Exception as e:
@@ -241,8 +239,7 @@ class AdminView(ttk.Frame):
         confirm = messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete team '{team[1]}'?")
         if confirm:
             try:
-                query = "DELETE FROM teams WHERE id = %s"
-                self.trasker.db_execute(query, (team_id,))
+                self.trasker.delete_team(team_id)
                 messagebox.showinfo("Success", "Team deleted successfully.")
                 self.refresh_teams()
             except Exception as e:
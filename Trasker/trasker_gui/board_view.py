@@ -1,13 +1,19 @@
-import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
+from trasker_gui.refresh_scheduler import RefreshScheduler
+from trasker_gui.supporting_view.card_column import CardColumn
 from trasker_gui.supporting_view.single_task_view import SingleTaskView
 from trasker_gui.supporting_view.edit_task_view import EditTaskView
 
 class BoardView(tk.Frame):
+    # Tables whose change notifications this view applies (see TraskerGUI.dispatch_changes).
+    watched_tables = {"tasks"}
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        # Filter changes are debounced into one reload, skipped when the filters end up unchanged.
+        self.refresher = RefreshScheduler(self, self.get_board_filters, self.load_board_tasks)
 
         # --- Filter Panel ---
         filter_panel = ttk.Frame(self)
@@ -17,25 +23,28 @@ class BoardView(tk.Frame):
         ttk.Label(filter_panel, text="Filter by Team:").pack(side=tk.LEFT, padx=5)
         self.team_filter = ttk.Combobox(filter_panel, state="readonly")
         self.team_filter.pack(side=tk.LEFT, padx=5)
-        self.team_filter.bind("<<ComboboxSelected>>", self.refresh_board)
+        self.team_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
 
         # User filter combobox
         ttk.Label(filter_panel, text="Filter by User:").pack(side=tk.LEFT, padx=5)
         self.user_filter = ttk.Combobox(filter_panel, state="readonly")
         self.user_filter.pack(side=tk.LEFT, padx=5)
-        self.user_filter.bind("<<ComboboxSelected>>", self.refresh_board)
+        self.user_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
 
         # Epic filter combobox
         ttk.Label(filter_panel, text="Filter by Epic:").pack(side=tk.LEFT, padx=5)
         self.epic_filter = ttk.Combobox(filter_panel, state="readonly")
         self.epic_filter.pack(side=tk.LEFT, padx=5)
-        self.epic_filter.bind("<<ComboboxSelected>>", self.refresh_board)
+        self.epic_filter.bind("<<ComboboxSelected>>", self.epic_filter_changed)
 
         # Sprint filter combobox
         ttk.Label(filter_panel, text="Filter by Sprint:").pack(side=tk.LEFT, padx=5)
         self.sprint_filter = ttk.Combobox(filter_panel, state="readonly")
         self.sprint_filter.pack(side=tk.LEFT, padx=5)
-        self.sprint_filter.bind("<<ComboboxSelected>>", self.refresh_board)
+        self.sprint_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
+
+        self.loading_label = ttk.Label(filter_panel, text="")
+        self.loading_label.pack(side=tk.LEFT, padx=10)
 
         self.load_epic_dropdown()
         self.load_sprint_dropdown()
@@ -49,6 +58,8 @@ class BoardView(tk.Frame):
         # Define board statuses (adjust these to match your task status values)
         self.board_statuses = ["Holding", "Pending", "In Progress", "Completed"]
         self.columns = {}
+        self.tasks = {}  # task_id -> task tuple of every card on the board
+        self.positions = {}  # task_id -> position in the last fetched listing; orders the columns
 
         # Create one column per status
         for status in self.board_statuses:
@@ -56,10 +67,7 @@ class BoardView(tk.Frame):
             col_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
             title_label = ttk.Label(col_frame, text=status, font=("Arial", 14, "bold"))
             title_label.pack(pady=5)
-            # Use a plain tk.Frame for the container to allow free positioning during drag and drop
-            tasks_container = ttk.Frame(col_frame)
-            tasks_container.pack(fill=tk.BOTH, expand=True)
-            self.columns[status] = tasks_container
+            self.columns[status] = CardColumn(col_frame, self)
 
         # Initialize drag data dictionary and load tasks
         self.drag_data = {}
@@ -69,6 +77,7 @@ class BoardView(tk.Frame):
         """Populate the epic filter combobox."""
         epics = self.controller.trasker.list_epics()
         epic_names = ["All Epics"] + [epic[1] for epic in epics]
+        self.epic_map = {epic[1]: epic[0] for epic in epics}
         self.epic_filter["values"] = epic_names
         self.epic_filter.current(0)
 
@@ -77,6 +86,9 @@ class BoardView(tk.Frame):
         if sprints is None:
             sprints = self.controller.trasker.list_sprints()
         sprint_names = ["All Sprints"] + [sprint[1] for sprint in sprints]
+        self.sprint_map = {}
+        for sprint in reversed(sprints):
+            self.sprint_map[sprint[1]] = sprint[0]  # First sprint with a given title wins.
         self.sprint_filter["values"] = sprint_names
         self.sprint_filter.current(0)
 
@@ -89,19 +101,15 @@ class BoardView(tk.Frame):
                 current_team_id = current_team
             else:
                 current_team_id = current_team[0]
-            query = """
-                SELECT u.id, u.username
-                FROM users u
-                JOIN user_team ut ON u.id = ut.user_id
-                WHERE ut.team_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_team_id,), fetch=True)
+            rows = self.controller.trasker.team_members(current_team_id)
             user_names = ["All Users"] + [row[1] for row in rows]
+            self.user_map = {row[1]: row[0] for row in rows}
             self.user_filter["values"] = user_names
             self.user_filter.current(0)
         else:
             self.user_filter["values"] = ["All Users"]
             self.user_filter.current(0)
+            self.user_map = {}
 
     def load_team_dropdown(self):
         """Load teams that the current user belongs to into the team filter combobox."""
@@ -114,13 +122,7 @@ class BoardView(tk.Frame):
             else:
                 current_user_id = current_user
 
-            query = """
-                SELECT t.id, t.name
-                FROM teams t
-                JOIN user_team ut ON t.id = ut.team_id
-                WHERE ut.user_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_user_id,), fetch=True)
+            rows = self.controller.trasker.teams_for_user(current_user_id)
             team_names = ["All Teams"]
             self.team_map = {}
             for row in rows:
@@ -132,94 +134,106 @@ class BoardView(tk.Frame):
         else:
             self.team_filter["values"] = ["All Teams"]
             self.team_filter.current(0)
+            self.team_map = {}
 
-    def refresh_board(self, event=None):
-        """Reload board tasks based on current filters."""
-        self.load_board_tasks()
+    def epic_filter_changed(self, event=None):
+        """Limit the sprint filter to the selected epic's sprints, then reload the board."""
+        selected_epic = self.epic_filter.get()
+        if selected_epic == "All Epics":
+            self.load_sprint_dropdown()
+        else:
+            # list_sprints() is served from the reference cache, which sprint edits invalidate.
+            epic_id = self.epic_map.get(selected_epic)
+            self.load_sprint_dropdown([sprint for sprint in self.controller.trasker.list_sprints()
+                                       if sprint[5] == epic_id])
+        self.refresher.schedule()
 
-    def load_board_tasks(self):
-        """Clear and repopulate board columns with tasks filtered by epic, sprint, user, and team."""
-        # Clear existing tasks from each column.
-        for container in self.columns.values():
-            for widget in container.winfo_children():
-                widget.destroy()
+    def refresh_board(self, event=None):
+        """Reload board tasks based on current filters now, e.g. after a task changed."""
+        self.refresher.refresh_now()
 
-        tasks = self.controller.trasker.list_all_tasks()
+    def get_board_filters(self):
+        """Translate the filter comboboxes into a Trasker.query_tasks() filter dict."""
+        filters = {}
         epic_filter = self.epic_filter.get()
-        sprint_filter = self.sprint_filter.get()
-        user_filter_value = self.user_filter.get()
-        team_filter_value = self.team_filter.get()
-
-        filtered_tasks = tasks
-
-        # Epic filtering.
         if epic_filter != "All Epics":
-            epics = self.controller.trasker.list_epics()
-            epic_id = next((epic[0] for epic in epics if epic[1] == epic_filter), None)
-            if epic_id:
-                filtered_tasks = [task for task in filtered_tasks if self._task_belongs_to_epic(task, epic_id)]
-            else:
-                filtered_tasks = []
-
-        # Sprint filtering.
+            filters["epic_id"] = [self.epic_map[epic_filter]] if epic_filter in self.epic_map else []
+        sprint_filter = self.sprint_filter.get()
         if sprint_filter != "All Sprints":
-            sprints = self.controller.trasker.list_sprints()
-            sprint_id = next((sprint[0] for sprint in sprints if sprint[1] == sprint_filter), None)
-            if sprint_id:
-                # Assuming sprint_id is at index 9 in the task tuple.
-                filtered_tasks = [task for task in filtered_tasks if task[9] == sprint_id]
-            else:
-                filtered_tasks = []
-
-        # User filtering.
+            filters["sprint_id"] = [self.sprint_map[sprint_filter]] if sprint_filter in self.sprint_map else []
+        user_filter_value = self.user_filter.get()
         if user_filter_value != "All Users":
-            # Assuming user_id is at index 10 in the task tuple.
-            filtered_tasks = [task for task in filtered_tasks
-                              if task[10] == user_filter_value]
-
-        # Team filtering.
+            filters["user_id"] = [self.user_map[user_filter_value]] if user_filter_value in self.user_map else []
+        team_filter_value = self.team_filter.get()
         if team_filter_value != "All Teams":
-            # Use our team_map to look up the team_id based on team name.
-
-            team_id = self.team_map.get(team_filter_value)
-            if team_id is not None:
-                # Assuming team_id is at index 11 in the task tuple.
-                filtered_tasks = [task for task in filtered_tasks if task[11] == team_filter_value]
-            else:
-                filtered_tasks = []
-
-        # Distribute tasks into columns by status.
+            filters["team_id"] = [self.team_map[team_filter_value]] if team_filter_value in self.team_map else []
+        return filters
+
+    def load_board_tasks(self, filters):
+        """Fetch tasks filtered by epic, sprint, user, and team in the background, then show them."""
+        self.controller.queries.submit((id(self), "board"), lambda: self.controller.trasker.query_tasks(filters),
+                                       self.show_board_tasks, loading=self.loading_label)
+
+    def board_status(self, task):
+        return task[4] if task[4] in self.board_statuses else "Holding"
+
+    def show_board_tasks(self, filtered_tasks):
+        """Bring the columns in line with the fetched tasks; only columns whose cards changed are redrawn."""
+        self.tasks = {task[0]: task for task in filtered_tasks}
+        self.positions = {task[0]: position for position, task in enumerate(filtered_tasks)}
+        by_status = {status: [] for status in self.board_statuses}
         for task in filtered_tasks:
-            task_id = task[0]
-            status = task[4] if task[4] in self.board_statuses else "Holding"
-            container = self.columns.get(status, self.columns["Holding"])
-            task_widget = ttk.Label(container, text=task[1], relief="raised", padding=5)
-            task_widget.pack(pady=5, padx=5, fill=tk.X)
-            # Bind events with lambda so that the task id is passed.
-            task_widget.bind("<ButtonPress-1>",
-                             lambda event, t_id=task_id, w=task_widget: self.on_task_press(event, t_id, w))
-            task_widget.bind("<B1-Motion>", self.on_task_drag)
-            task_widget.bind("<ButtonRelease-1>",
-                             lambda event, t_id=task_id: self.on_task_drop(event, t_id))
-            # Bind right-click to show context menu (using Control-Button-1 on macOS).
-            if sys.platform == "darwin":
-                task_widget.bind("<Control-Button-1>",
-                                 lambda event, t_id=task_id: self.show_task_context_menu(event, t_id))
-                task_widget.bind("<Button-2>",
-                                 lambda event, t_id=task_id: self.show_task_context_menu(event, t_id))
-            else:
-                task_widget.bind("<Button-3>",
-                                 lambda event, t_id=task_id: self.show_task_context_menu(event, t_id))
-
-    def _task_belongs_to_epic(self, task, epic_id):
-        """Return True if the task belongs to the given epic via its sprint."""
-        sprint_id = task[9]
-        if sprint_id is None:
-            return False
-        sprint = self.controller.trasker.get_sprint_by_id(sprint_id)
-        if sprint and sprint[5] == epic_id:
-            return True
-        return False
+            by_status[self.board_status(task)].append(task)
+        for status, column in self.columns.items():
+            column.set_tasks(by_status[status])
+
+    def move_task(self, task_id, target_status):
+        """Move one card to another column straight away and save the new status in the background."""
+        task = self.tasks.get(task_id)
+        if task is None:
+            return
+        source_status = self.board_status(task)
+        if source_status == target_status:
+            return
+        task = task[:4] + (target_status,) + task[5:]
+        self.tasks[task_id] = task
+        self.columns[source_status].remove(task_id)
+        self.columns[target_status].insert(task, lambda t: self.positions.get(t[0], len(self.positions)))
+        trasker = self.controller.trasker
+        self.controller.queries.submit((id(self), "status", task_id),
+                                       lambda: trasker.task_change_status(task_id, target_status),
+                                       lambda result: None, on_error=self.move_failed, loading=self.loading_label)
+
+    def on_data_changed(self, changes):
+        """Move, update or drop the cards of changed tasks; a resync reloads the board."""
+        if any(change["op"] == "resync" for change in changes):
+            self.refresh_board()
+            return
+        task_ids = list({change["id"] for change in changes if change.get("id") is not None})
+        filters = self.refresher.state
+        if not task_ids or filters is None:
+            return
+        trasker = self.controller.trasker
+        # Deleted tasks, and tasks that no longer match the filters, simply don't come back.
+        self.controller.queries.submit((id(self), "patch"), lambda: trasker.query_tasks({**filters, "id": task_ids}),
+                                       lambda tasks: self.apply_task_changes(task_ids, tasks))
+
+    def apply_task_changes(self, task_ids, tasks):
+        fetched = {task[0]: task for task in tasks}
+        position = lambda t: self.positions.get(t[0], len(self.positions))
+        for task_id in task_ids:
+            old, new = self.tasks.get(task_id), fetched.get(task_id)
+            if old is not None:
+                self.columns[self.board_status(old)].remove(task_id)
+                del self.tasks[task_id]
+            if new is not None:
+                self.positions.setdefault(task_id, len(self.positions))
+                self.tasks[task_id] = new
+                self.columns[self.board_status(new)].insert(new, position)
+
+    def move_failed(self, error):
+        messagebox.showerror("Error", f"Failed to update task status: {error}")
+        self.refresh_board()
 
     def on_task_press(self, event, task_id, orig_widget):
         """Create a floating copy of the task widget for dragging."""
@@ -243,7 +257,8 @@ class BoardView(tk.Frame):
         drop_x = event.x_root
         drop_y = event.y_root
         target_status = None
-        for status, container in self.columns.items():
+        for status, column in self.columns.items():
+            container = column.canvas
             cont_x = container.winfo_rootx()
             cont_y = container.winfo_rooty()
             cont_width = container.winfo_width()
@@ -259,10 +274,9 @@ class BoardView(tk.Frame):
             self.floating = None
             self.drag_data = {}
         if target_status is not None:
-            self.controller.trasker.task_change_status(task_id, target_status)
+            self.move_task(task_id, target_status)
         else:
             messagebox.showinfo("Drop", "Task was not dropped in a valid column. No status update performed.")
-        self.load_board_tasks()
 
     def show_task_context_menu(self, event, task_id):
         """Show a right-click context menu for a task."""
@@ -2,8 +2,12 @@ import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+from trasker_gui.supporting_view.tree_pager import TreePager
 
 class BugView(ttk.Frame):
+    # Tables whose change notifications this view applies (see TraskerGUI.dispatch_changes).
+    watched_tables = {"bugs"}
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
@@ -49,6 +53,8 @@ class BugView(ttk.Frame):
 
         # Button to apply all filters.
         ttk.Button(filter_panel, text="Apply Filters", command=self.filter_bugs).grid(row=4, column=0, columnspan=4, pady=5)
+        self.loading_label = ttk.Label(filter_panel, text="")
+        self.loading_label.grid(row=4, column=4, padx=5, pady=5, sticky="w")
 
         # --- Main Panel ---
         main_frame = ttk.Frame(self)
@@ -73,6 +79,7 @@ class BugView(ttk.Frame):
             self.tree.column(col, width=150)
         self.tree.pack(fill=tk.BOTH, expand=True, pady=10)
         self.tree.bind("<Double-1>", self.view_bug_details)
+        self.pager = TreePager(self.tree, self.bug_values, runner=controller.queries, loading=self.loading_label)
 
         # Initially load all bugs.
         self.load_bugs()
@@ -85,13 +92,7 @@ class BugView(ttk.Frame):
                 current_team_id = current_team
             else:
                 current_team_id = current_team[0]
-            query = """
-                SELECT u.id, u.username
-                FROM users u
-                JOIN user_team ut ON u.id = ut.user_id
-                WHERE ut.team_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_team_id,), fetch=True)
+            rows = self.controller.trasker.team_members(current_team_id)
             user_options = ["All"] + [row[1] for row in rows]
             self.user_filter["values"] = user_options
             self.user_filter.current(0)
@@ -107,13 +108,7 @@ class BugView(ttk.Frame):
                 current_user_id = current_user[0]
             else:
                 current_user_id = current_user
-            query = """
-                SELECT t.id, t.name
-                FROM teams t
-                JOIN user_team ut ON t.id = ut.team_id
-                WHERE ut.user_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_user_id,), fetch=True)
+            rows = self.controller.trasker.teams_for_user(current_user_id)
             team_options = ["All"] + [row[1] for row in rows]
             # Build a mapping from team name to team id.
             self.team_map = {row[1]: row[0] for row in rows}
@@ -125,111 +120,78 @@ class BugView(ttk.Frame):
             self.team_map = {}
 
     def load_bugs(self):
-        """Load bugs from the database into the treeview."""
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        bugs = self.controller.trasker.list_all_bugs()  # Ensure this is implemented in Trasker.
-        for bug in bugs:
-            # Bug tuple is assumed to be:
-            # (id, title, description, status, created_date, resolved_date, task_id, user_id, team_id)
-            user_name = (bug[7]) if bug[7] is not None else "N/A"
-            team_name = (bug[8]) if bug[8] is not None else "N/A"
-            values = (bug[0], bug[1], bug[2], bug[3], bug[4], bug[5], bug[6], user_name, team_name)
-            self.tree.insert("", tk.END, values=values)
+        """Load bugs from the database into the treeview, one page at a time as the list is scrolled."""
+        self.pager.load(self.controller.trasker.pages(self.controller.trasker.list_all_bugs))
+
+    @staticmethod
+    def bug_values(bug):
+        # Bug tuple is:
+        # (id, title, description, status, created_date, resolved_date, task_id, username, team_name)
+        user_name = bug[7] if bug[7] is not None else "N/A"
+        team_name = bug[8] if bug[8] is not None else "N/A"
+        return (bug[0], bug[1], bug[2], bug[3], bug[4], bug[5], bug[6], user_name, team_name)
+
+    @staticmethod
+    def parse_date(value):
+        """Return the YYYY-MM-DD date at the start of value (a string or datetime), or None."""
+        if not value:
+            return None
+        try:
+            return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+
+    def on_data_changed(self, changes):
+        self.filter_bugs()
 
     def filter_bugs(self):
         """Filter bugs based on related task ID, created/resolved date ranges, user, and team."""
-        bugs = self.controller.trasker.list_all_bugs()
-
-        # Filter by related task ID.
         task_id_filter = self.task_id_entry.get().strip()
-        if task_id_filter:
-            bugs = [bug for bug in bugs if bug[6] is not None and str(bug[6]) == task_id_filter]
 
-        # Filter by Created Date Range.
         created_from_str = self.created_from_entry.get().strip()
         created_to_str = self.created_to_entry.get().strip()
-        if created_from_str or created_to_str:
-            filtered = []
-            try:
-                created_from = datetime.strptime(created_from_str, "%Y-%m-%d") if created_from_str else None
-                created_to = datetime.strptime(created_to_str, "%Y-%m-%d") if created_to_str else None
-            except ValueError:
-                messagebox.showerror("Error", "Created Date filters must be in YYYY-MM-DD format")
-                return
-            for bug in bugs:
-                created_date_str = bug[4]
-                try:
-                    created_date = datetime.strptime(created_date_str, "%Y-%m-%d")
-                except (ValueError, TypeError):
-                    continue
-                if created_from and created_to:
-                    if created_from <= created_date <= created_to:
-                        filtered.append(bug)
-                elif created_from:
-                    if created_date >= created_from:
-                        filtered.append(bug)
-                elif created_to:
-                    if created_date <= created_to:
-                        filtered.append(bug)
-            bugs = filtered
+        try:
+            created_from = datetime.strptime(created_from_str, "%Y-%m-%d") if created_from_str else None
+            created_to = datetime.strptime(created_to_str, "%Y-%m-%d") if created_to_str else None
+        except ValueError:
+            messagebox.showerror("Error", "Created Date filters must be in YYYY-MM-DD format")
+            return
 
-        # Filter by Resolved Date Range.
         resolved_from_str = self.resolved_from_entry.get().strip()
         resolved_to_str = self.resolved_to_entry.get().strip()
-        if resolved_from_str or resolved_to_str:
-            filtered = []
-            try:
-                resolved_from = datetime.strptime(resolved_from_str, "%Y-%m-%d") if resolved_from_str else None
-                resolved_to = datetime.strptime(resolved_to_str, "%Y-%m-%d") if resolved_to_str else None
-            except ValueError:
-                messagebox.showerror("Error", "Resolved Date filters must be in YYYY-MM-DD format")
-                return
-            for bug in bugs:
-                resolved_date_str = bug[5]
-                if not resolved_date_str:
-                    continue
-                try:
-                    resolved_date = datetime.strptime(resolved_date_str, "%Y-%m-%d")
-                except ValueError:
-                    continue
-                if resolved_from and resolved_to:
-                    if resolved_from <= resolved_date <= resolved_to:
-                        filtered.append(bug)
-                elif resolved_from:
-                    if resolved_date >= resolved_from:
-                        filtered.append(bug)
-                elif resolved_to:
-                    if resolved_date <= resolved_to:
-                        filtered.append(bug)
-            bugs = filtered
+        try:
+            resolved_from = datetime.strptime(resolved_from_str, "%Y-%m-%d") if resolved_from_str else None
+            resolved_to = datetime.strptime(resolved_to_str, "%Y-%m-%d") if resolved_to_str else None
+        except ValueError:
+            messagebox.showerror("Error", "Resolved Date filters must be in YYYY-MM-DD format")
+            return
 
-        # Filter by User.
         user_filter_value = self.user_filter.get()
-        if user_filter_value and user_filter_value != "All":
-            user_id = self.controller.trasker.get_user_id_from_username(user_filter_value)
-            if user_id is not None:
-                bugs = [bug for bug in bugs if bug[7] == user_id]
-            else:
-                bugs = []
-
-        # Filter by Team.
         team_filter_value = self.team_filter.get()
-        if team_filter_value and team_filter_value != "All":
-            team_id = self.team_map.get(team_filter_value)
-            if team_id is not None:
-                bugs = [bug for bug in bugs if bug[8] == team_id]
-            else:
-                bugs = []
 
-        # Update the treeview.
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for bug in bugs:
-            user_name = self.controller.trasker.get_username(bug[7]) if bug[7] is not None else "N/A"
-            team_name = self.controller.trasker.get_team_name(bug[8]) if bug[8] is not None else "N/A"
-            values = (bug[0], bug[1], bug[2], bug[3], bug[4], bug[5], bug[6], user_name, team_name)
-            self.tree.insert("", tk.END, values=values)
+        def in_range(value, date_from, date_to):
+            if date_from is None and date_to is None:
+                return True
+            date = self.parse_date(value)
+            if date is None:
+                return False
+            return (date_from is None or date >= date_from) and (date_to is None or date <= date_to)
+
+        def matches(bug):
+            if task_id_filter and (bug[6] is None or str(bug[6]) != task_id_filter):
+                return False
+            if not in_range(bug[4], created_from, created_to):
+                return False
+            if not in_range(bug[5], resolved_from, resolved_to):
+                return False
+            # Rows carry the username and team name, so compare against the selected names.
+            if user_filter_value and user_filter_value != "All" and bug[7] != user_filter_value:
+                return False
+            if team_filter_value and team_filter_value != "All" and bug[8] != team_filter_value:
+                return False
+            return True
+
+        self.pager.load(self.controller.trasker.pages(self.controller.trasker.list_all_bugs), matches)
 
     def show_add_bug_window(self):
         from trasker_gui.supporting_view.add_bug_view import AddBugView
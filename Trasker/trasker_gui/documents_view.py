@@ -3,8 +3,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.filedialog import askopenfilename
 import mimetypes
+from trasker_gui.supporting_view.tree_pager import TreePager
 
 class DocumentsView(ttk.Frame):
+    # Tables whose change notifications this view applies (see TraskerGUI.dispatch_changes).
+    watched_tables = {"documents"}
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
@@ -35,6 +39,8 @@ class DocumentsView(ttk.Frame):
         self.load_team_dropdown()
 
         ttk.Button(filter_panel, text="Apply Filters", command=self.filter_documents).pack(side=tk.LEFT, padx=5)
+        self.loading_label = ttk.Label(filter_panel, text="")
+        self.loading_label.pack(side=tk.LEFT, padx=10)
 
         # --- Main Panel ---
         main_frame = ttk.Frame(self)
@@ -57,6 +63,7 @@ class DocumentsView(ttk.Frame):
             self.tree.column(col, width=150)
         self.tree.pack(fill=tk.BOTH, expand=True, pady=10)
         self.tree.bind("<Double-1>", self.view_document)
+        self.pager = TreePager(self.tree, self.document_values, runner=controller.queries, loading=self.loading_label)
 
         self.load_documents()
 
@@ -68,13 +75,7 @@ class DocumentsView(ttk.Frame):
                 current_team_id = current_team
             else:
                 current_team_id = current_team[0]
-            query = """
-                SELECT u.id, u.username
-                FROM users u
-                JOIN user_team ut ON u.id = ut.user_id
-                WHERE ut.team_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_team_id,), fetch=True)
+            rows = self.controller.trasker.team_members(current_team_id)
             user_options = ["All"] + [row[1] for row in rows]
             self.user_filter["values"] = user_options
             self.user_filter.current(0)
@@ -90,13 +91,7 @@ class DocumentsView(ttk.Frame):
                 current_user_id = current_user[0]
             else:
                 current_user_id = current_user
-            query = """
-                SELECT t.id, t.name
-                FROM teams t
-                JOIN user_team ut ON t.id = ut.team_id
-                WHERE ut.user_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_user_id,), fetch=True)
+            rows = self.controller.trasker.teams_for_user(current_user_id)
             team_options = ["All"] + [row[1] for row in rows]
             # Build a mapping from team name to team id for filtering later.
             self.team_map = {row[1]: row[0] for row in rows}
@@ -108,52 +103,38 @@ class DocumentsView(ttk.Frame):
             self.team_map = {}
 
     def load_documents(self):
-        """Load documents from the database into the treeview."""
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        documents = self.controller.trasker.list_all_documents()
-        for doc in documents:
-            # Ensure the document tuple has 8 columns (pad with None if necessary)
-            if len(doc) < 8:
-                doc = doc + (None,) * (8 - len(doc))
-            user_name = (doc[6]) if doc[6] is not None else "N/A"
-            team_name = (doc[7]) if doc[7] is not None else "N/A"
-            doc_data = (doc[0], doc[1], doc[2], doc[3], doc[4], user_name, team_name)
-            self.tree.insert("", tk.END, values=doc_data)
+        """Load documents from the database into the treeview, one page at a time as the list is scrolled."""
+        self.pager.load(self.controller.trasker.pages(self.controller.trasker.list_all_documents))
+
+    @staticmethod
+    def document_values(doc):
+        # Document tuple is (id, note_id, filename, mimetype, upload_date, username, team_name).
+        user_name = doc[5] if doc[5] is not None else "N/A"
+        team_name = doc[6] if doc[6] is not None else "N/A"
+        return (doc[0], doc[1], doc[2], doc[3], doc[4], user_name, team_name)
+
+    def on_data_changed(self, changes):
+        self.filter_documents()
 
     def filter_documents(self):
-        documents = self.controller.trasker.list_all_documents()
         note_id_filter = self.note_id_entry.get().strip()
         filename_filter = self.filename_entry.get().strip().lower()
         user_filter_value = self.user_filter.get()
         team_filter_value = self.team_filter.get()
 
-        if note_id_filter:
-            documents = [doc for doc in documents if doc[1] is not None and str(doc[1]) == note_id_filter]
-        if filename_filter:
-            documents = [doc for doc in documents if filename_filter in doc[2].lower()]
-        if user_filter_value and user_filter_value != "All":
-            user_id = self.controller.trasker.get_user_id_from_username(user_filter_value)
-            if user_id is not None:
-                documents = [doc for doc in documents if len(doc) >= 7 and doc[6] == user_id]
-            else:
-                documents = []
-        if team_filter_value and team_filter_value != "All":
-            team_id = self.team_map.get(team_filter_value)
-            if team_id is not None:
-                documents = [doc for doc in documents if len(doc) >= 8 and doc[7] == team_id]
-            else:
-                documents = []
-
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for doc in documents:
-            if len(doc) < 8:
-                doc = doc + (None,) * (8 - len(doc))
-            user_name = self.controller.trasker.get_username(doc[6]) if doc[6] is not None else "N/A"
-            team_name = self.controller.trasker.get_team_name(doc[7]) if doc[7] is not None else "N/A"
-            doc_data = (doc[0], doc[1], doc[2], doc[3], doc[4], user_name, team_name)
-            self.tree.insert("", tk.END, values=doc_data)
+        def matches(doc):
+            if note_id_filter and (doc[1] is None or str(doc[1]) != note_id_filter):
+                return False
+            if filename_filter and filename_filter not in doc[2].lower():
+                return False
+            # Rows carry the username and team name, so compare against the selected names.
+            if user_filter_value and user_filter_value != "All" and doc[5] != user_filter_value:
+                return False
+            if team_filter_value and team_filter_value != "All" and doc[6] != team_filter_value:
+                return False
+            return True
+
+        self.pager.load(self.controller.trasker.pages(self.controller.trasker.list_all_documents), matches)
 
     def show_add_document_window(self):
         from trasker_gui.supporting_view.add_document_view import AddDocumentView
@@ -1,11 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from trasker_gui.refresh_scheduler import RefreshScheduler
+from trasker_gui.supporting_view.tree_pager import TreePager
 
 
 class EpicView(ttk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller  # Reference to your main controller (TraskerGUI)
+        # Filter changes are debounced into one reload, skipped when the filter ends up unchanged.
+        self.refresher = RefreshScheduler(self, lambda: self.team_filter.get(), self.show_epics)
 
         # Header label for the view
         header = ttk.Label(self, text="Epics Dashboard", font=("Arial", 24, "bold"))
@@ -23,7 +27,7 @@ class EpicView(ttk.Frame):
         ttk.Label(left_panel, text="Filter by Team:", font=("Arial", 10, "bold")).pack(pady=(20, 5))
         self.team_filter = ttk.Combobox(left_panel, state="readonly")
         self.team_filter.pack(pady=5, fill=tk.X, padx=5)
-        self.team_filter.bind("<<ComboboxSelected>>", lambda e: self.load_epics())
+        self.team_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
         self.load_team_dropdown()
 
         # Epic management buttons
@@ -31,6 +35,8 @@ class EpicView(ttk.Frame):
         ttk.Button(left_panel, text="View Epic", command=self.view_epic_details, width=20).pack(pady=5)
         ttk.Button(left_panel, text="Edit Epic", command=self.edit_epic, width=20).pack(pady=5)
         ttk.Button(left_panel, text="Delete Epic", command=self.delete_epic, width=20).pack(pady=5)
+        self.loading_label = ttk.Label(left_panel, text="")
+        self.loading_label.pack(pady=5)
 
         # RIGHT PANEL: Epic list (Treeview)
         right_panel = ttk.Frame(main_frame)
@@ -47,44 +53,33 @@ class EpicView(ttk.Frame):
 
         # (Optional) Bind a double-click event to view details.
         self.tree.bind("<Double-1>", self.view_epic_details)
+        # Epic tuples (id, name, description, start_date, end_date, owner_username, team_name) are shown as-is.
+        self.pager = TreePager(self.tree, tuple, runner=controller.queries, loading=self.loading_label)
 
         # Load the epics when the view is created.
         self.load_epics()
 
     def load_team_dropdown(self):
         """Load the teams the current user belongs to into the team filter combobox."""
-        # Query the teams for the current user.
-        # (We use the controller's trasker.db_execute method directly.)
         user_id = self.controller.trasker.current_user[0]
-        query = """
-            SELECT t.name 
-            FROM teams t
-            JOIN user_team ut ON t.id = ut.team_id
-            WHERE ut.user_id = %s
-        """
-        teams = self.controller.trasker.db_execute(query, (user_id,), fetch=True)
-        team_names = ["All Teams"] + [team[0] for team in teams]
+        teams = self.controller.trasker.teams_for_user(user_id)
+        team_names = ["All Teams"] + [team[1] for team in teams]
         self.team_filter['values'] = team_names
         self.team_filter.current(0)
 
     def load_epics(self):
-        """Load epics from the database into the Treeview, optionally filtering by team."""
-        # Clear any existing rows
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        # Get all epics visible to the user (the Trasker.list_epics method already filters by current user/team)
-        all_epics = self.controller.trasker.list_epics()
-        # Determine the team filter value.
-        team_filter_value = self.team_filter.get()
+        """Reload epics now, e.g. after an epic changed."""
+        self.refresher.refresh_now()
+
+    def show_epics(self, team_filter_value):
+        """Load epics from the database into the Treeview a page at a time, optionally filtering by team."""
+        # Trasker.list_epics already filters by current user/team.
+        pages = self.controller.trasker.pages(self.controller.trasker.list_epics)
         if team_filter_value and team_filter_value != "All Teams":
-            # Filter epics where the team name matches the selection.
-            filtered_epics = [epic for epic in all_epics if epic[6] == team_filter_value]
+            # Keep epics where the team name matches the selection.
+            self.pager.load(pages, lambda epic: epic[6] == team_filter_value)
         else:
-            filtered_epics = all_epics
-        # Insert each epic into the Treeview.
-        for epic in filtered_epics:
-            # Expected epic tuple: (id, name, description, start_date, end_date, owner_username, team_name)
-            self.tree.insert("", tk.END, values=epic)
+            self.pager.load(pages)
 
     def show_add_epic_window(self):
         """Open the add epic view."""
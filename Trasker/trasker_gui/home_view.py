@@ -1,10 +1,22 @@
+import base64
+import io
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import ttk
-import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Rendered chart images kept for reuse, keyed on (data, colours, size).
+CHART_CACHE_SIZE = 32
+# Chart size before the card has been laid out, and the step sizes are rounded to so resizes reuse images.
+CHART_SIZE = 300
+CHART_SIZE_STEP = 20
+CHART_DPI = 100
 
 class HomeView(tk.Frame):
+    # Tables whose change notifications this view applies (see TraskerGUI.dispatch_changes).
+    watched_tables = {"tasks", "sprints"}
+
     def __init__(self, parent, controller):
         self.controller = controller
         mode = self.controller.mode
@@ -31,6 +43,8 @@ class HomeView(tk.Frame):
         self.team_filter = ttk.Combobox(team_filter_frame, state="readonly", width=20)
         self.team_filter.pack(side=tk.LEFT, padx=5)
         ttk.Button(team_filter_frame, text="Apply Team Filter", command=self.update_charts).pack(side=tk.LEFT, padx=5)
+        self.loading_label = ttk.Label(team_filter_frame, text="")
+        self.loading_label.pack(side=tk.LEFT, padx=10)
         self.load_team_dropdown()
 
         # Create a frame to hold the chart cards in a grid.
@@ -48,6 +62,9 @@ class HomeView(tk.Frame):
         self.charts_frame.columnconfigure(1, weight=1)
         self.charts_frame.rowconfigure(0, weight=1)
 
+        self.chart_cache = OrderedDict()  # chart key -> PhotoImage
+        self.stats = None  # Last dashboard_stats() result, redrawn on theme and size changes.
+
         # Initial chart drawing.
         self.update_charts()
 
@@ -61,13 +78,7 @@ class HomeView(tk.Frame):
             user_id = self.controller.trasker.current_user
             if isinstance(user_id, tuple):
                 user_id = user_id[0]
-            query = """
-                SELECT t.id, t.name
-                FROM teams t
-                JOIN user_team ut ON t.id = ut.team_id
-                WHERE ut.user_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (user_id,), fetch=True)
+            rows = self.controller.trasker.teams_for_user(user_id)
             team_options = ["All"] + [row[1] for row in rows]
             self.team_map = {row[1]: row[0] for row in rows}  # Map team name to team id.
             self.team_filter["values"] = team_options
@@ -79,98 +90,115 @@ class HomeView(tk.Frame):
 
     def create_chart_card(self, parent, title_text):
         """
-        Create a card that displays a title and embeds a matplotlib pie chart.
-        Returns a dict with keys: "frame", "canvas", "figure", and "ax".
+        Create a card that displays a title and a pie chart image.
+        Returns a dict with keys: "frame", "label", "key" (of the image shown) and "counts".
         """
         card_frame = tk.Frame(parent, relief="raised", padx=10, pady=10, bg=self.bg_color)
         title_label = ttk.Label(card_frame, text=title_text, font=("Arial", 14, "bold"))
         title_label.configure(background=self.bg_color, foreground=self.fg_color)
         title_label.pack(anchor="w")
 
-        figure = Figure(figsize=(3, 3), dpi=100, facecolor=self.bg_color)
-        ax = figure.add_subplot(111)
-        ax.set_facecolor(self.bg_color)
-
-        canvas = FigureCanvasTkAgg(figure, master=card_frame)
-        canvas_widget = canvas.get_tk_widget()
-        canvas_widget.pack(fill=tk.BOTH, expand=True)
-        return {"frame": card_frame, "canvas": canvas, "figure": figure, "ax": ax}
+        # A Label without an image measures width/height in characters, so until the first chart is
+        # rendered it shows a blank image of CHART_SIZE pixels. The fixed requested size keeps images
+        # from feeding back into the layout; the label still stretches with the card and charts are
+        # rendered at its actual size.
+        placeholder = tk.PhotoImage(master=self, width=CHART_SIZE, height=CHART_SIZE)
+        label = tk.Label(card_frame, bg=self.bg_color, image=placeholder, width=CHART_SIZE, height=CHART_SIZE)
+        label.pack(fill=tk.BOTH, expand=True)
+        chart = {"frame": card_frame, "label": label, "key": None, "counts": None, "resize": None,
+                 "image": placeholder}
+        label.bind("<Configure>", lambda event: self.chart_resized(chart))
+        return chart
+
+    def chart_resized(self, chart):
+        """Re-render after the card has stopped resizing for a moment."""
+        if chart["resize"] is not None:
+            self.after_cancel(chart["resize"])
+        chart["resize"] = self.after(150, lambda: self.chart_resize_settled(chart))
+
+    def chart_resize_settled(self, chart):
+        chart["resize"] = None
+        if chart["counts"] is not None:
+            self.draw_completion_chart(chart, chart["counts"])
 
     def update_charts(self):
-        """Update both pie charts using the current chart text color and applied team filter."""
-        self.update_last_sprint_chart()
-        self.update_overall_chart()
-
-    def update_last_sprint_chart(self):
-        """Update the last sprint pie chart with optional team filtering."""
-        sprints = self.controller.trasker.list_sprints()
-        if sprints:
-            last_sprint = sprints[-1]
-            sprint_id = last_sprint[0]
-            tasks = self.controller.trasker.list_sprint_tasks(sprint_id)
-        else:
-            tasks = self.controller.trasker.list_all_tasks()
-
-        # Apply team filter if set.
-        team_filter_value = self.team_filter.get()
-        if team_filter_value and team_filter_value != "All":
-            team_id = self.team_map.get(team_filter_value)
-            if team_id is not None:
-                # Assuming team_id is at index 11 in the task tuple.
-                tasks = [task for task in tasks if task[11] == team_id]
-
-        total = len(tasks)
-        if total == 0:
-            completed = 0
-            not_completed = 0
-        else:
-            completed = len([task for task in tasks if task[4].lower() == "completed"])
-            not_completed = total - completed
-
-        ax = self.last_sprint_chart["ax"]
-        ax.clear()
-        if total == 0:
-            ax.text(0.5, 0.5, "No Data", horizontalalignment="center", verticalalignment="center",
-                    transform=ax.transAxes, fontsize=18, color=self.chart_text_color)
-        else:
-            labels = ["Completed", "Not Completed"]
-            sizes = [completed, not_completed]
-            ax.pie(sizes, labels=labels, autopct=lambda pct: f"{pct:.1f}%", startangle=90,
-                   textprops={"fontsize": 16, "color": self.chart_text_color})
-            ax.axis("equal")
-        self.last_sprint_chart["canvas"].draw()
-
-    def update_overall_chart(self):
-        """Update the overall task completion pie chart with optional team filtering."""
-        tasks = self.controller.trasker.list_all_tasks()
-
-        # Apply team filter if set.
+        """Fetch the dashboard counts in the background, then redraw both pie charts with the applied team filter."""
+        trasker = self.controller.trasker
         team_filter_value = self.team_filter.get()
-        if team_filter_value and team_filter_value != "All":
-            team_id = self.team_map.get(team_filter_value)
-            if team_id is not None:
-                tasks = [task for task in tasks if task[11] == team_id]
-
-        total = len(tasks)
-        if total == 0:
-            completed = 0
-            not_completed = 0
-        else:
-            completed = len([task for task in tasks if task[4].lower() == "completed"])
-            not_completed = total - completed
-
-        ax = self.overall_chart["ax"]
-        ax.clear()
-        if total == 0:
+        team_id = self.team_map.get(team_filter_value) if team_filter_value != "All" else None
+        self.controller.queries.submit((id(self), "charts"), lambda: trasker.dashboard_stats(team_id),
+                                       self.draw_charts, loading=self.loading_label)
+
+    def draw_charts(self, stats):
+        self.stats = stats
+        self.draw_completion_chart(self.last_sprint_chart, stats["last_sprint_counts"])
+        self.draw_completion_chart(self.overall_chart, stats["overall"])
+
+    def chart_size(self, chart):
+        label = chart["label"]
+        width, height = label.winfo_width(), label.winfo_height()
+        if width <= 1 or height <= 1:
+            return CHART_SIZE, CHART_SIZE  # Not laid out yet.
+        return (max(CHART_SIZE_STEP, width // CHART_SIZE_STEP * CHART_SIZE_STEP),
+                max(CHART_SIZE_STEP, height // CHART_SIZE_STEP * CHART_SIZE_STEP))
+
+    def draw_completion_chart(self, chart, counts):
+        """
+        Show a completed / not completed pie chart from {status: count} on the given chart card.
+        Nothing is redrawn if the numbers, colours and size match the image already shown; otherwise a
+        cached image is reused, or the chart is rasterized with Agg on the query pool.
+        """
+        chart["counts"] = counts
+        total = sum(counts.values())
+        completed = sum(count for status, count in counts.items() if status and status.lower() == "completed")
+        key = ((completed, total - completed), (self.bg_color, self.chart_text_color), self.chart_size(chart))
+        render_request = (id(self), "render", id(chart["label"]))
+        if key == chart["key"]:
+            self.controller.queries.cancel(render_request)  # An older render must not replace this image.
+            return
+        image = self.chart_cache.get(key)
+        if image is not None:
+            self.controller.queries.cancel(render_request)
+            self.chart_cache.move_to_end(key)
+            self.show_chart(chart, key, image)
+            return
+        self.controller.queries.submit(render_request, lambda: self.render_chart(*key),
+                                       lambda png: self.chart_rendered(chart, key, png))
+
+    @staticmethod
+    def render_chart(sizes, colors, size):
+        """Rasterize a pie chart to PNG bytes. Uses no Tk state, so it can run on a worker thread."""
+        completed, not_completed = sizes
+        bg_color, text_color = colors
+        width, height = size
+        figure = Figure(figsize=(width / CHART_DPI, height / CHART_DPI), dpi=CHART_DPI, facecolor=bg_color)
+        FigureCanvasAgg(figure)
+        ax = figure.add_subplot(111)
+        ax.set_facecolor(bg_color)
+        if completed + not_completed == 0:
             ax.text(0.5, 0.5, "No Data", horizontalalignment="center", verticalalignment="center",
-                    transform=ax.transAxes, fontsize=18, color=self.chart_text_color)
+                    transform=ax.transAxes, fontsize=18, color=text_color)
+            ax.axis("off")
         else:
             labels = ["Completed", "Not Completed"]
-            sizes = [completed, not_completed]
-            ax.pie(sizes, labels=labels, autopct=lambda pct: f"{pct:.1f}%", startangle=90,
-                   textprops={"fontsize": 16, "color": self.chart_text_color})
+            ax.pie([completed, not_completed], labels=labels, autopct=lambda pct: f"{pct:.1f}%", startangle=90,
+                   textprops={"fontsize": 16, "color": text_color})
             ax.axis("equal")
-        self.overall_chart["canvas"].draw()
+        output = io.BytesIO()
+        figure.savefig(output, format="png", facecolor=bg_color)
+        return output.getvalue()
+
+    def chart_rendered(self, chart, key, png):
+        image = tk.PhotoImage(master=self, data=base64.b64encode(png))
+        self.chart_cache[key] = image
+        while len(self.chart_cache) > CHART_CACHE_SIZE:
+            self.chart_cache.popitem(last=False)
+        self.show_chart(chart, key, image)
+
+    def show_chart(self, chart, key, image):
+        chart["key"] = key
+        chart["label"].configure(image=image)
+        chart["image"] = image  # Keep a reference; Tk drops images Python no longer holds.
 
     def update_theme(self):
         """Update HomeView's theme based on the controller's mode."""
@@ -191,8 +219,13 @@ class HomeView(tk.Frame):
         for chart in [self.last_sprint_chart, self.overall_chart]:
             chart["frame"].configure(bg=self.bg_color)
             chart["frame"].winfo_children()[0].configure(background=self.bg_color, foreground=self.fg_color)
-            chart["figure"].set_facecolor(self.bg_color)
-            chart["ax"].set_facecolor(self.bg_color)
+            chart["label"].configure(bg=self.bg_color)
+        # The numbers haven't changed; only redraw (or reuse) the images in the new colours.
+        if self.stats is not None:
+            self.draw_charts(self.stats)
+
+    def on_data_changed(self, changes):
+        # Trasker already dropped the cached dashboard counts; the charts only redraw if the numbers moved.
         self.update_charts()
 
     def refresh_home(self):
@@ -1,7 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from trasker_gui.supporting_view.tree_pager import TreePager
 
 class NotesView(ttk.Frame):
+    # Tables whose change notifications this view applies (see TraskerGUI.dispatch_changes).
+    watched_tables = {"notes"}
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
@@ -40,6 +44,8 @@ class NotesView(ttk.Frame):
         self.load_team_dropdown()
 
         ttk.Button(filter_panel, text="Apply Filters", command=self.filter_notes).pack(side=tk.LEFT, padx=5)
+        self.loading_label = ttk.Label(filter_panel, text="")
+        self.loading_label.pack(side=tk.LEFT, padx=10)
 
         # --- Main Panel ---
         main_frame = ttk.Frame(self)
@@ -64,6 +70,7 @@ class NotesView(ttk.Frame):
             self.tree.column(col, width=150)
         self.tree.pack(fill=tk.BOTH, expand=True, pady=10)
         self.tree.bind("<Double-1>", self.view_note_details)
+        self.pager = TreePager(self.tree, self.note_values, runner=controller.queries, loading=self.loading_label)
 
         self.load_notes()
 
@@ -76,13 +83,7 @@ class NotesView(ttk.Frame):
                 current_team_id = current_team
             else:
                 current_team_id = current_team[0]
-            query = """
-                SELECT u.id, u.username
-                FROM users u
-                JOIN user_team ut ON u.id = ut.user_id
-                WHERE ut.team_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_team_id,), fetch=True)
+            rows = self.controller.trasker.team_members(current_team_id)
             user_options = ["All"] + [row[1] for row in rows]
             self.user_filter["values"] = user_options
             self.user_filter.current(0)
@@ -98,13 +99,7 @@ class NotesView(ttk.Frame):
                 current_user_id = current_user[0]
             else:
                 current_user_id = current_user
-            query = """
-                SELECT t.id, t.name
-                FROM teams t
-                JOIN user_team ut ON t.id = ut.team_id
-                WHERE ut.user_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_user_id,), fetch=True)
+            rows = self.controller.trasker.teams_for_user(current_user_id)
             team_options = ["All"] + [row[1] for row in rows]
             # Build a mapping from team name to team id.
             self.team_map = {row[1]: row[0] for row in rows}
@@ -115,11 +110,11 @@ class NotesView(ttk.Frame):
             self.team_filter.current(0)
             self.team_map = {}
 
-    def load_notes(self):
-        """Load all notes into the treeview, applying current filters if any."""
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+    def on_data_changed(self, changes):
+        self.load_notes()
 
+    def load_notes(self):
+        """Load notes into the treeview a page at a time, applying current filters if any."""
         # Get filter values.
         note_type = self.note_type_filter.get()
         if note_type == "All":
@@ -129,42 +124,33 @@ class NotesView(ttk.Frame):
         user_filter_value = self.user_filter.get()
         if user_filter_value == "All":
             user_filter_value = None
+        user_id = None
+        if user_filter_value:
+            user_id = self.controller.trasker.get_user_id_from_username(user_filter_value)
 
         team_filter_value = self.team_filter.get()
         if team_filter_value == "All":
             team_filter_value = None
-
-        # Get notes from the Trasker instance.
-        notes = self.controller.trasker.list_notes(note_type, ref_id)
-
-        # Further filter by user.
-        if user_filter_value:
-            # Assuming that in the notes tuple, user_id is at index 4.
-            # (You might need to adjust this based on your actual query result.)
-            user_id = self.controller.trasker.get_user_id_from_username(user_filter_value)
-            if user_id is not None:
-                notes = [note for note in notes if note[4] == user_id]
-            else:
-                notes = []
-
-        # Further filter by team.
-        if team_filter_value:
-            # Convert the team name to team id using self.team_map.
-            team_id = self.team_map.get(team_filter_value)
-            if team_id is not None:
-                # Assuming that in the notes tuple, team_id is at index 5.
-                notes = [note for note in notes if note[5] == team_id]
-            else:
-                notes = []
-
-        # Insert notes into the treeview. For display, we convert user_id and team_id to names.
-        for note in notes:
-            # Note tuple is assumed to be:
-            # (id, note, note_type, reference_id, user_id, team_id, created_date, updated_date)
-            user_name = self.controller.trasker.get_username(note[4]) if note[4] else "N/A"
-            team_name = self.controller.trasker.get_team_name(note[5]) if note[5] else "N/A"
-            values = (note[0], note[1], note[2], note[3], user_name, team_name, note[6], note[7])
-            self.tree.insert("", tk.END, values=values)
+        # Convert the team name to team id using self.team_map.
+        team_id = self.team_map.get(team_filter_value) if team_filter_value else None
+
+        def matches(note):
+            # Note tuple is (id, note, note_type, reference_id, user_id, team_id, created_date, updated_date).
+            if user_filter_value and (user_id is None or note[4] != user_id):
+                return False
+            if team_filter_value and (team_id is None or note[5] != team_id):
+                return False
+            return True
+
+        # Note type and reference id are filtered in the query; user and team per page.
+        pages = self.controller.trasker.pages(self.controller.trasker.list_notes, note_type, ref_id)
+        self.pager.load(pages, matches)
+
+    def note_values(self, note):
+        # For display, convert user_id and team_id to names.
+        user_name = self.controller.trasker.get_username(note[4]) if note[4] else "N/A"
+        team_name = self.controller.trasker.get_team_name(note[5]) if note[5] else "N/A"
+        return (note[0], note[1], note[2], note[3], user_name, team_name, note[6], note[7])
 
     def filter_notes(self, event=None):
         self.load_notes()
@@ -0,0 +1,111 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+
+# Worker threads for GUI queries; keep this at or below the Trasker pool size (DB_POOL_MAX).
+QUERY_WORKERS = int(os.environ.get("TRASKER_GUI_WORKERS", "4"))
+# How often the Tk main loop checks for finished queries, in milliseconds.
+POLL_INTERVAL = 30
+
+
+class QueryRunner:
+    """
+    Runs Trasker calls on a worker pool so the Tk main loop never waits on the database.
+
+    Views call submit(key, work, on_done) with a function that only touches the database (read the
+    filter widgets first, on the main thread). Results are queued by the worker and handed to
+    on_done on the main thread by a poll scheduled with after().
+
+    Requests sharing a key supersede each other: when a filter changes again, the older request is
+    cancelled if it has not started yet, and its result is dropped if it has.
+    """
+
+    def __init__(self, root, workers=QUERY_WORKERS):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trasker-query")
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.latest = {}  # key -> (request number, future) of the newest request
+        self.loading = {}  # loading widget -> number of its requests still running
+        self.counter = 0
+        self.closed = False
+        self.root.after(POLL_INTERVAL, self.poll)
+
+    def submit(self, key, work, on_done, on_error=None, loading=None):
+        """
+        Run work() in the background and call on_done(result) on the main thread.
+        on_error(exception) is called instead if work raises; by default an error dialog is shown.
+        loading, if given, is a label that shows "Loading..." while the request runs.
+        """
+        with self.lock:
+            self.counter += 1
+            request = self.counter
+            previous = self.latest.get(key)
+            if previous is not None and previous[1].cancel():
+                # Never started: the worker won't report back, so settle its loading state here.
+                self.results.put((key, previous[0], None, None, None, None, previous[2]))
+            future = self.executor.submit(self.run, key, request, work, on_done, on_error, loading)
+            self.latest[key] = (request, future, loading)
+        self.set_loading(loading, 1)
+        return request
+
+    def cancel(self, key):
+        """Forget the pending request for key; its result will not be delivered."""
+        with self.lock:
+            previous = self.latest.pop(key, None)
+        if previous is not None and previous[1].cancel():
+            self.set_loading(previous[2], -1)
+
+    def run(self, key, request, work, on_done, on_error, loading):
+        try:
+            result, error = work(), None
+        except Exception as e:
+            result, error = None, e
+        self.results.put((key, request, result, error, on_done, on_error, loading))
+
+    def poll(self):
+        """Deliver finished results on the main thread, then check again after POLL_INTERVAL."""
+        if self.closed:
+            return
+        while True:
+            try:
+                key, request, result, error, on_done, on_error, loading = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.set_loading(loading, -1)
+            with self.lock:
+                current = self.latest.get(key)
+                if current is None or current[0] != request:
+                    continue  # Superseded by a newer request for the same key.
+                del self.latest[key]
+            try:
+                if error is not None:
+                    (on_error or self.show_error)(error)
+                else:
+                    on_done(result)
+            except Exception as e:
+                # A view destroyed while its query ran is not an error worth a dialog.
+                print("Failed to apply query result:", e)
+        self.root.after(POLL_INTERVAL, self.poll)
+
+    def set_loading(self, widget, delta):
+        if widget is None:
+            return
+        count = self.loading.get(widget, 0) + delta
+        if count > 0:
+            self.loading[widget] = count
+        else:
+            self.loading.pop(widget, None)
+        try:
+            widget.configure(text="Loading..." if count > 0 else "")
+        except Exception:
+            self.loading.pop(widget, None)
+
+    def show_error(self, error):
+        messagebox.showerror("Error", f"Failed to load data: {error}")
+
+    def shutdown(self):
+        self.closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
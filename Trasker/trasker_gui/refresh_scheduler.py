@@ -0,0 +1,44 @@
+import os
+
+# How long filter widgets must be left alone before the view reloads, in milliseconds.
+FILTER_DELAY = int(os.environ.get("TRASKER_FILTER_DELAY", "250"))
+
+
+class RefreshScheduler:
+    """
+    Debounces a view's filter events into a single reload.
+
+    read_state() reads the filter widgets and returns the effective filter state (anything comparable
+    with ==), or None when the filters are invalid and nothing should load. refresh(state) reloads
+    the view for that state.
+
+    Filter widgets call schedule(): a burst of changes within FILTER_DELAY ms becomes one reload, and
+    none at all when the state ends up the same as the last one loaded. After the data itself
+    changed (add, edit, delete), call refresh_now() to reload straight away even if the filters didn't.
+    """
+
+    def __init__(self, widget, read_state, refresh, delay=FILTER_DELAY):
+        self.widget = widget
+        self.read_state = read_state
+        self.refresh = refresh
+        self.delay = delay
+        self.pending = None
+        self.state = None
+
+    def schedule(self, event=None):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+        self.pending = self.widget.after(self.delay, self.run)
+
+    def refresh_now(self, event=None):
+        self.run(force=True)
+
+    def run(self, force=False):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+        state = self.read_state()
+        if state is None or (not force and state == self.state):
+            return
+        self.state = state
+        self.refresh(state)
@@ -70,6 +70,8 @@ class SettingView(tk.Frame):
             self.mode = "light"
             self.set_light_mode()
         self.save_config()
+        # Views that haven't been built yet read the mode from the controller when they are.
+        self.controller.mode = self.mode
         # Update the theme for all views using the controller's frames.
         for frame in self.controller.frames.values():
             if hasattr(frame, "update_theme"):
@@ -2,11 +2,18 @@ import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+from trasker_gui.refresh_scheduler import RefreshScheduler
+from trasker_gui.supporting_view.tree_pager import TreePager
 
 class SprintView(ttk.Frame):
+    # Tables whose change notifications this view applies (see TraskerGUI.dispatch_changes).
+    watched_tables = {"sprints"}
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        # Filter changes are debounced into one reload, skipped when the filters end up unchanged.
+        self.refresher = RefreshScheduler(self, self.get_sprint_filters, self.load_sprints)
 
         header = ttk.Label(self, text="Sprint Dashboard", font=("Arial", 24, "bold"))
         header.pack(padx=10, pady=20)
@@ -19,13 +26,13 @@ class SprintView(ttk.Frame):
         ttk.Label(filter_panel, text="Filter by Epic:").pack(side=tk.LEFT, padx=5)
         self.epic_filter = ttk.Combobox(filter_panel, state="readonly")
         self.epic_filter.pack(side=tk.LEFT, padx=5)
-        self.epic_filter.bind("<<ComboboxSelected>>", self.refresh_sprints)
+        self.epic_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
 
         # Team filter combobox
         ttk.Label(filter_panel, text="Filter by Team:").pack(side=tk.LEFT, padx=5)
         self.team_filter = ttk.Combobox(filter_panel, state="readonly")
         self.team_filter.pack(side=tk.LEFT, padx=5)
-        self.team_filter.bind("<<ComboboxSelected>>", self.refresh_sprints)
+        self.team_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
 
         # Date range filters
         ttk.Label(filter_panel, text="From (YYYY-MM-DD):").pack(side=tk.LEFT, padx=5)
@@ -34,7 +41,9 @@ class SprintView(ttk.Frame):
         ttk.Label(filter_panel, text="To (YYYY-MM-DD):").pack(side=tk.LEFT, padx=5)
         self.to_date_entry = ttk.Entry(filter_panel, width=12)
         self.to_date_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Button(filter_panel, text="Apply Date Filter", command=self.refresh_sprints).pack(side=tk.LEFT, padx=5)
+        ttk.Button(filter_panel, text="Apply Date Filter", command=self.refresher.schedule).pack(side=tk.LEFT, padx=5)
+        self.loading_label = ttk.Label(filter_panel, text="")
+        self.loading_label.pack(side=tk.LEFT, padx=10)
 
         # Load dropdown data
         self.load_epic_dropdown()
@@ -63,6 +72,7 @@ class SprintView(ttk.Frame):
             self.tree.column(col, width=150)
         self.tree.pack(fill=tk.BOTH, expand=True, pady=10)
         self.tree.bind("<Double-1>", self.view_sprint_details)
+        self.pager = TreePager(self.tree, self.sprint_values, runner=controller.queries, loading=self.loading_label)
 
         # Load sprints initially
         self.refresh_sprints()
@@ -82,13 +92,7 @@ class SprintView(ttk.Frame):
                 current_user_id = current_user[0]
             else:
                 current_user_id = current_user
-            query = """
-                SELECT t.id, t.name
-                FROM teams t
-                JOIN user_team ut ON t.id = ut.team_id
-                WHERE ut.user_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_user_id,), fetch=True)
+            rows = self.controller.trasker.teams_for_user(current_user_id)
             team_names = ["All Teams"]
             self.team_map = {}
             for row in rows:
@@ -101,69 +105,69 @@ class SprintView(ttk.Frame):
             self.team_filter["values"] = ["All Teams"]
             self.team_filter.current(0)
 
+    def on_data_changed(self, changes):
+        self.refresh_sprints()
+
     def refresh_sprints(self, event=None):
-        """Reload sprints based on epic, team, and date range filters."""
-        sprints = self.controller.trasker.list_sprints()  # Expecting sprint tuple: (id, title, description, start_date, end_date, epic_id, user_id, team_id)
+        """Reload sprints now, e.g. after a sprint changed."""
+        self.refresher.refresh_now()
 
+    def get_sprint_filters(self):
+        """Read the filter widgets as (epic_filter, epic_id, team_filter, from_dt, to_dt); None if a date is invalid."""
         # Epic filtering.
         epic_filter = self.epic_filter.get()
+        epic_id = None
         if epic_filter != "All Epics":
             epics = self.controller.trasker.list_epics()
             epic_id = next((epic[0] for epic in epics if epic[1] == epic_filter), None)
-            if epic_id:
-                sprints = [s for s in sprints if s[5] == epic_id]
-            else:
-                sprints = []
 
         # Team filtering.
         team_filter = self.team_filter.get()
-        if team_filter != "All Teams":
-            team_id = self.team_map.get(team_filter)
-            if team_id:
-                sprints = [s for s in sprints if s[7] == team_filter]
-            else:
-                sprints = []
 
         # Date range filtering.
         from_date_str = self.from_date_entry.get().strip()
         to_date_str = self.to_date_entry.get().strip()
-        if from_date_str or to_date_str:
-            filtered = []
-            try:
-                from_dt = datetime.strptime(from_date_str, "%Y-%m-%d") if from_date_str else None
-                to_dt = datetime.strptime(to_date_str, "%Y-%m-%d") if to_date_str else None
-            except ValueError:
-                messagebox.showerror("Error", "Date format must be YYYY-MM-DD")
-                return
-            for sprint in sprints:
-                sprint_start = sprint[3]
-                sprint_end = sprint[4]
+        try:
+            from_dt = datetime.strptime(from_date_str, "%Y-%m-%d") if from_date_str else None
+            to_dt = datetime.strptime(to_date_str, "%Y-%m-%d") if to_date_str else None
+        except ValueError:
+            messagebox.showerror("Error", "Date format must be YYYY-MM-DD")
+            return None
+        return epic_filter, epic_id, team_filter, from_dt, to_dt
+
+    def load_sprints(self, filters):
+        """Load sprints matching the epic, team, and date range filters, a page at a time."""
+        epic_filter, epic_id, team_filter, from_dt, to_dt = filters
+
+        def matches(sprint):
+            # Sprint tuple: (id, title, description, start_date, end_date, epic_id, username, team_name)
+            if epic_filter != "All Epics" and (epic_id is None or sprint[5] != epic_id):
+                return False
+            if team_filter != "All Teams" and (team_filter not in self.team_map or sprint[7] != team_filter):
+                return False
+            if from_dt or to_dt:
                 try:
-                    sprint_start_dt = datetime.strptime(sprint_start, "%Y-%m-%d")
-                    sprint_end_dt = datetime.strptime(sprint_end, "%Y-%m-%d")
+                    sprint_start_dt = datetime.strptime(str(sprint[3]), "%Y-%m-%d")
+                    sprint_end_dt = datetime.strptime(str(sprint[4]), "%Y-%m-%d")
                 except ValueError:
-                    continue
+                    return False
                 if from_dt and to_dt:
-                    if (from_dt <= sprint_start_dt <= to_dt) or (from_dt <= sprint_end_dt <= to_dt):
-                        filtered.append(sprint)
-                elif from_dt and (sprint_start_dt >= from_dt or sprint_end_dt >= from_dt):
-                    filtered.append(sprint)
-                elif to_dt and (sprint_start_dt <= to_dt or sprint_end_dt <= to_dt):
-                    filtered.append(sprint)
-            sprints = filtered
-
-        self.load_sprints_into_tree(sprints)
-
-    def load_sprints_into_tree(self, sprints):
-        """Clear the treeview and insert the provided sprint data."""
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for sprint in sprints:
-            # Here we display: ID, Title, Description, Start Date, End Date, Epic ID, and Team name.
-            team_name = "N/A"
-            if len(sprint) >= 8:
-                team_name = sprint[7]
-            self.tree.insert("", tk.END, values=(sprint[0], sprint[1], sprint[2], sprint[3], sprint[4], sprint[5], team_name))
+                    return (from_dt <= sprint_start_dt <= to_dt) or (from_dt <= sprint_end_dt <= to_dt)
+                elif from_dt:
+                    return sprint_start_dt >= from_dt or sprint_end_dt >= from_dt
+                else:
+                    return sprint_start_dt <= to_dt or sprint_end_dt <= to_dt
+            return True
+
+        self.pager.load(self.controller.trasker.pages(self.controller.trasker.list_sprints), matches)
+
+    @staticmethod
+    def sprint_values(sprint):
+        # Here we display: ID, Title, Description, Start Date, End Date, Epic ID, and Team name.
+        team_name = "N/A"
+        if len(sprint) >= 8:
+            team_name = sprint[7]
+        return (sprint[0], sprint[1], sprint[2], sprint[3], sprint[4], sprint[5], team_name)
 
     def show_add_sprint_window(self):
         from trasker_gui.supporting_view.add_sprint_view import AddSprintView
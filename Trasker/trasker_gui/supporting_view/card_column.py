@@ -0,0 +1,114 @@
+import bisect
+import sys
+import tkinter as tk
+from tkinter import ttk
+
+# Card geometry on the column canvas, in pixels.
+CARD_HEIGHT = 32
+CARD_GAP = 5
+CARD_PITCH = CARD_HEIGHT + CARD_GAP
+
+
+class CardColumn:
+    """
+    One Kanban column drawn on a scrollable canvas. The column holds the full list of its task
+    tuples, but only enough card widgets to cover the visible height exist; scrolling re-points
+    those cards at other tasks instead of creating new ones. Card bindings read card.task_id when
+    they fire, so a recycled card never needs rebinding.
+    """
+
+    def __init__(self, parent, board):
+        self.board = board  # BoardView; receives the drag and context-menu events of the cards.
+        self.tasks = []  # Task tuples in display order.
+        self.cards = []  # Recycled card labels; cards[i] shows tasks[first + i].
+        self.shown = {}  # task_id -> card currently showing it.
+        self.first = 0
+        self.render_scheduled = False
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0, yscrollincrement=CARD_PITCH)
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=lambda first, last: self.on_scroll(scrollbar, first, last))
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.schedule_render())
+        self.bind_wheel(self.canvas)
+
+    def bind_wheel(self, widget):
+        if sys.platform.startswith("linux"):
+            widget.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+            widget.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+        else:
+            widget.bind("<MouseWheel>",
+                        lambda event: self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units"))
+
+    def set_tasks(self, tasks):
+        """Show tasks in this column. Nothing is redrawn if the cards would look the same."""
+        changed = [(task[0], task[1]) for task in tasks] != [(task[0], task[1]) for task in self.tasks]
+        self.tasks = list(tasks)
+        if changed:
+            self.refresh()
+
+    def remove(self, task_id):
+        self.tasks = [task for task in self.tasks if task[0] != task_id]
+        self.refresh()
+
+    def insert(self, task, position):
+        """Insert task keeping the column ordered by position(task)."""
+        bisect.insort(self.tasks, task, key=position)
+        self.refresh()
+
+    def refresh(self):
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.tasks) * CARD_PITCH))
+        self.schedule_render()
+
+    def on_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        self.schedule_render()
+
+    def schedule_render(self):
+        if not self.render_scheduled:
+            self.render_scheduled = True
+            self.canvas.after_idle(self.render)
+
+    def new_card(self):
+        card = ttk.Label(self.canvas, relief="raised", padding=5)
+        card.task_id = None
+        card.window = self.canvas.create_window(CARD_GAP, 0, window=card, anchor="nw", height=CARD_HEIGHT,
+                                                state="hidden")
+        board = self.board
+        card.bind("<ButtonPress-1>", lambda event: board.on_task_press(event, card.task_id, card))
+        card.bind("<B1-Motion>", board.on_task_drag)
+        card.bind("<ButtonRelease-1>", lambda event: board.on_task_drop(event, card.task_id))
+        # Bind right-click to show context menu (using Control-Button-1 on macOS).
+        if sys.platform == "darwin":
+            card.bind("<Control-Button-1>", lambda event: board.show_task_context_menu(event, card.task_id))
+            card.bind("<Button-2>", lambda event: board.show_task_context_menu(event, card.task_id))
+        else:
+            card.bind("<Button-3>", lambda event: board.show_task_context_menu(event, card.task_id))
+        self.bind_wheel(card)
+        return card
+
+    def render(self):
+        """Point the card pool at the tasks in view, creating cards only if the view grew."""
+        self.render_scheduled = False
+        height = self.canvas.winfo_height()
+        width = max(1, self.canvas.winfo_width() - 2 * CARD_GAP)
+        self.first = max(0, int(self.canvas.canvasy(0)) // CARD_PITCH)
+        needed = height // CARD_PITCH + 2
+        while len(self.cards) < needed:
+            self.cards.append(self.new_card())
+
+        self.shown = {}
+        for offset, card in enumerate(self.cards):
+            index = self.first + offset
+            if offset >= needed or index >= len(self.tasks):
+                card.task_id = None
+                self.canvas.itemconfigure(card.window, state="hidden")
+                continue
+            task = self.tasks[index]
+            if card.task_id != task[0] or card.cget("text") != task[1]:
+                card.configure(text=task[1])
+            card.task_id = task[0]
+            self.shown[task[0]] = card
+            self.canvas.coords(card.window, CARD_GAP, index * CARD_PITCH)
+            self.canvas.itemconfigure(card.window, width=width, state="normal")
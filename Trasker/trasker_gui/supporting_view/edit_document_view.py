@@ -14,7 +14,7 @@ class EditDocumentView(tk.Toplevel):
 
         # Retrieve the document details from the database.
         # Expecting the document tuple to be:
-        # (id, note_id, filename, mimetype, document_blob, upload_date, user_id, team_id)
+        # (id, note_id, filename, mimetype, size, upload_date, username, team_name)
         document = self.controller.trasker.get_document(self.document_id)
         if not document:
             messagebox.showerror("Error", "Document not found!")
@@ -22,7 +22,7 @@ class EditDocumentView(tk.Toplevel):
             return
 
         # Unpack the document tuple. We ignore any extra fields (user_id, team_id) by using *_
-        doc_id, self.note_id, filename, mimetype, document_blob, upload_date, *_ = document
+        doc_id, self.note_id, filename, mimetype, size, upload_date, *_ = document
 
         # Build the UI.
         frame = ttk.Frame(self, padding=20)
@@ -70,7 +70,7 @@ class EditDocumentView(tk.Toplevel):
             return
 
         # Update the document record in the database.
-        self.controller.trasker.update_document(self.document_id, filename, mimetype, document_blob)
+        self.controller.trasker.update_document(self.document_id, document_blob, filename=filename, mimetype=mimetype)
         if self.refresh_callback:
             self.refresh_callback()
         self.destroy()
@@ -29,7 +29,7 @@ class SingleDocumentView(tk.Toplevel):
         self.geometry("800x600")
         self.configure(bg="white")
 
-        # Retrieve the document record from the database.
+        # Retrieve the document metadata; the content itself is only read when a view needs it.
         doc = self.controller.trasker.get_document(document_id)
         if not doc:
             messagebox.showerror("Error", "Document not found.")
@@ -38,10 +38,10 @@ class SingleDocumentView(tk.Toplevel):
 
         # Unpack document record:
         # Expected schema:
-        # (id, note_id, filename, mimetype, document_blob, upload_date, user_id, team_id)
+        # (id, note_id, filename, mimetype, size, upload_date, username, team_name)
         try:
             (self.doc_id, self.note_id, self.filename, self.mimetype,
-             self.document_blob, self.upload_date, self.user_id, self.team_id) = doc
+             self.size, self.upload_date, self.user_id, self.team_id) = doc
         except Exception as e:
             messagebox.showerror("Error", f"Failed to unpack document data: {e}")
             self.destroy()
@@ -54,7 +54,9 @@ class SingleDocumentView(tk.Toplevel):
         # Create a metadata frame to display uploader and team information.
         metadata_frame = ttk.Frame(self, padding=10)
         metadata_frame.pack(fill=tk.X)
-        metadata_label = ttk.Label(metadata_frame, text=f"Uploaded by: {uploader}    Team: {team_name}", font=("Arial", 10))
+        size_kb = (self.size or 0) / 1024
+        metadata_label = ttk.Label(metadata_frame, text=f"Uploaded by: {uploader}    Team: {team_name}    Size: {size_kb:,.1f} KB",
+                                   font=("Arial", 10))
         metadata_label.pack(side=tk.LEFT)
 
         # Create a main content frame.
@@ -82,16 +84,12 @@ class SingleDocumentView(tk.Toplevel):
                            font=("Arial", 14))
         prompt.pack(pady=10)
         try:
-            # Convert memoryview to bytes if needed and decode
-            if isinstance(self.document_blob, memoryview):
-                content = self.document_blob.tobytes().decode('utf-8')
-            elif isinstance(self.document_blob, bytes):
-                content = self.document_blob.decode('utf-8')
-            else:
-                content = str(self.document_blob)
+            # Only the start of the file is needed for the preview; a cut multi-byte character is dropped.
+            content = self.controller.trasker.read_document(self.document_id, limit=2048).decode('utf-8', errors='ignore')
         except Exception as e:
             content = "Error decoding document."
-        snippet = content[:500] + ("..." if len(content) > 500 else "")
+        truncated = len(content) > 500 or (self.size or 0) > 2048
+        snippet = content[:500] + ("..." if truncated else "")
         snippet_label = ttk.Label(self.content_frame, text=snippet, wraplength=750)
         snippet_label.pack(pady=10)
         btn_frame = ttk.Frame(self.content_frame)
@@ -108,8 +106,8 @@ class SingleDocumentView(tk.Toplevel):
         editor.geometry("800x600")
         text_widget = tk.Text(editor, wrap="word")
         text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        content = self.document_blob.decode('utf-8') if isinstance(self.document_blob, bytes) else self.document_blob
-        text_widget.insert("1.0", content)
+        content = self.controller.trasker.read_document(self.document_id) or b""
+        text_widget.insert("1.0", content.decode('utf-8', errors='replace'))
         def save_edits():
             new_content = text_widget.get("1.0", tk.END).rstrip()
             try:
@@ -143,8 +141,7 @@ class SingleDocumentView(tk.Toplevel):
         temp_dir = tempfile.gettempdir()
         temp_path = os.path.join(temp_dir, self.filename)
         try:
-            with open(temp_path, "wb") as f:
-                f.write(self.document_blob)
+            self.write_content(temp_path)
             if sys.platform == "darwin":
                 subprocess.call(["open", temp_path])
             elif sys.platform == "win32":
@@ -161,6 +158,7 @@ class SingleDocumentView(tk.Toplevel):
         title_label.pack(pady=10)
         try:
             from PIL import Image
+            self.document_blob = self.controller.trasker.read_document(self.document_id)
             image = Image.open(io.BytesIO(self.document_blob))
             image.thumbnail((750, 500))
             self.photo = ImageTk.PhotoImage(image)
@@ -219,15 +217,20 @@ class SingleDocumentView(tk.Toplevel):
         file_path = filedialog.asksaveasfilename(initialfile=self.filename)
         if file_path:
             try:
-                with open(file_path, "wb") as f:
-                    if isinstance(self.document_blob, str):
-                        f.write(self.document_blob.encode('utf-8'))
-                    else:
-                        f.write(self.document_blob)
+                self.write_content(file_path)
                 messagebox.showinfo("Downloaded", "Document downloaded successfully.")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to download document: {e}")
 
+    def write_content(self, path):
+        """Stream the document content to path one chunk at a time."""
+        stream = self.controller.trasker.open_document_stream(self.document_id)
+        if stream is None:
+            raise LookupError("Document not found.")
+        with open(path, "wb") as f:
+            for chunk in stream:
+                f.write(chunk)
+
     def upload_new_version(self):
         """Allow the user to upload a new version of the document."""
         new_file = filedialog.askopenfilename(title="Select new version of document")
@@ -0,0 +1,186 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+
+# Rows kept in the Treeview above and below the visible ones, so scrolling a little never waits on a redraw.
+WINDOW_BUFFER = int(os.environ.get("TRASKER_TREE_BUFFER", "20"))
+
+
+class TreePager:
+    """
+    Virtualized Treeview filled one page at a time from a Trasker.pages() generator.
+
+    Every fetched row is kept in a plain list, but only the visible window plus WINDOW_BUFFER rows
+    on either side exist as Treeview items. Scrolling (wheel, keyboard or the scrollbar) moves that
+    window over the list, and the next page is only fetched once the window nears the end of what
+    has been loaded. With a QueryRunner, pages are fetched in the background and loading shows
+    "Loading...".
+
+    Items are keyed by key(row) (the row id by default), so a refresh or a window move only deletes
+    the rows that left, inserts the ones that arrived and updates values that changed. Selections
+    survive refreshes, and tree.item(iid, "values") works as it would on a plain Treeview.
+    """
+
+    def __init__(self, tree, format_row, scrollbar=None, runner=None, loading=None, key=None,
+                 buffer=WINDOW_BUFFER):
+        self.tree = tree
+        self.format_row = format_row  # Maps a database row to the Treeview values tuple.
+        self.key = key or (lambda row: row[0])
+        self.runner = runner
+        self.loading = loading
+        self.buffer = buffer
+        self.rows = []  # Every row fetched so far, in listing order.
+        self.keys = set()
+        self.shown = {}  # iid -> values of the rows currently in the Treeview.
+        self.top = 0  # Index in rows of the first visible row.
+        self.visible = int(tree.cget("height"))
+        self.pages = None
+        self.fresh = False  # The next page starts a new listing and replaces rows.
+        self.pending = False
+        self.render_scheduled = False
+        if scrollbar is None and tree.winfo_manager() == "pack":
+            scrollbar = ttk.Scrollbar(tree.master, orient=tk.VERTICAL)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=tree.pack_info().get("pady", 0), before=tree)
+        self.scrollbar = scrollbar
+        if scrollbar is not None:
+            # The scrollbar spans every loaded row, not just the items in the Treeview.
+            scrollbar.configure(command=self.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+
+    def load(self, pages, row_filter=None):
+        """
+        Start showing rows from `pages`, keeping only rows accepted by row_filter.
+        The current rows stay on screen until the first page of the new listing arrives.
+        """
+        if row_filter is not None:
+            pages = ([row for row in page if row_filter(row)] for page in pages)
+        self.pages = pages
+        self.fresh = True
+        self.pending = False
+        self.load_next()
+
+    def next_page(self, pages):
+        """Return the next non-empty page from pages, or None when it is exhausted."""
+        for page in pages:
+            if page:
+                return page
+        return None
+
+    def load_next(self):
+        """Fetch the next non-empty page, if there is one."""
+        if self.pages is None:
+            self.pending = False
+            return
+        self.pending = True
+        pages = self.pages
+        if self.runner is None:
+            self.show_page(pages, self.next_page(pages))
+        else:
+            self.runner.submit((id(self), "page"), lambda: self.next_page(pages),
+                               lambda page: self.show_page(pages, page), loading=self.loading)
+
+    def show_page(self, pages, page):
+        if pages is not self.pages:
+            return  # A newer load() replaced this listing.
+        self.pending = False
+        if self.fresh:
+            self.fresh = False
+            self.rows, self.keys, self.top = [], set(), 0
+        if page is None:
+            self.pages = None
+        else:
+            for row in page:
+                key = self.key(row)
+                if key not in self.keys:  # Item ids must be unique; keep the first row for a key.
+                    self.keys.add(key)
+                    self.rows.append(row)
+        self.render()
+
+    def patch(self, rows):
+        """Replace loaded rows that share a key with one of rows, in place. Rows not loaded are ignored."""
+        replacements = {self.key(row): row for row in rows}
+        self.rows = [replacements.get(self.key(row), row) for row in self.rows]
+        self.render()
+
+    def remove(self, keys):
+        """Drop the rows with the given keys."""
+        keys = set(keys) & self.keys
+        if keys:
+            self.rows = [row for row in self.rows if self.key(row) not in keys]
+            self.keys -= keys
+            self.render()
+
+    def render(self):
+        """Make the Treeview hold the window of rows around self.top, reusing items that stay."""
+        self.render_scheduled = False
+        self.top = max(0, min(self.top, len(self.rows) - self.visible))
+        start = max(0, self.top - self.buffer)
+        window = self.rows[start:self.top + self.visible + self.buffer]
+
+        wanted = [(str(self.key(row)), self.format_row(row)) for row in window]
+        wanted_ids = {iid for iid, _ in wanted}
+        stale = [iid for iid in self.shown if iid not in wanted_ids]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self.shown[iid]
+        for position, (iid, values) in enumerate(wanted):
+            values = tuple(values)
+            if iid not in self.shown:
+                self.tree.insert("", position, iid=iid, values=values)
+            else:
+                if self.shown[iid] != values:
+                    self.tree.item(iid, values=values)
+                if self.tree.index(iid) != position:
+                    self.tree.move(iid, "", position)
+            self.shown[iid] = values
+
+        if wanted:
+            self.tree.yview_moveto((self.top - start) / len(wanted))
+        self.update_scrollbar()
+        if self.pages is not None and not self.pending and self.top + self.visible + self.buffer >= len(self.rows):
+            self.pending = True
+            self.tree.after_idle(self.load_next)
+
+    def schedule_render(self):
+        if not self.render_scheduled:
+            self.render_scheduled = True
+            self.tree.after_idle(self.render)
+
+    def update_scrollbar(self):
+        if self.scrollbar is None:
+            return
+        if not self.rows:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        total = len(self.rows)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible) / total))
+
+    def on_scroll(self, first, last):
+        """Treeview yscrollcommand: translate a native scroll inside the window into a window move."""
+        count = len(self.shown)
+        if count == 0:
+            self.update_scrollbar()
+            return
+        first, last = float(first), float(last)
+        self.visible = max(1, round((last - first) * count))
+        start = max(0, self.top - self.buffer)
+        top = start + round(first * count)
+        # Also re-render when the view grew taller than the window holds (e.g. after a resize).
+        if top != self.top or min(len(self.rows), self.top + self.visible + self.buffer) > start + count:
+            self.top = top
+            self.schedule_render()
+        else:
+            self.update_scrollbar()
+
+    def yview(self, *args):
+        """Scrollbar command: scroll over every loaded row."""
+        if args[0] == "moveto":
+            top = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            top = self.top + int(args[1]) * step
+        else:
+            return
+        self.top = top
+        self.schedule_render()
@@ -1,12 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from trasker_gui.refresh_scheduler import RefreshScheduler
 from trasker_gui.supporting_view.add_task_view import AddTaskView
+from trasker_gui.supporting_view.tree_pager import TreePager
+from trasker_psql import PAGE_SIZE
 from datetime import datetime
 
 class TaskView(ttk.Frame):
+    # Tables whose change notifications this view applies (see TraskerGUI.dispatch_changes).
+    watched_tables = {"tasks", "task_sessions"}
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller  # Reference to the main controller (TraskerGUI)
+        # Filter changes are debounced into one reload, skipped when the filters end up unchanged.
+        self.refresher = RefreshScheduler(self, self.get_task_filters, self.filter_tasks)
 
         # TOP PANEL: Filters (User, and Team)
         filter_panel = ttk.Frame(self)
@@ -20,13 +28,13 @@ class TaskView(ttk.Frame):
         ttk.Label(filter_panel, text="Filter by Team:").pack(side=tk.LEFT, padx=5)
         self.team_filter = ttk.Combobox(filter_panel, state="readonly")
         self.team_filter.pack(side=tk.LEFT, padx=5)
-        self.team_filter.bind("<<ComboboxSelected>>", self.filter_tasks)
+        self.team_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
 
         # User filter combobox
         ttk.Label(filter_panel, text="Filter by User:").pack(side=tk.LEFT, padx=5)
         self.user_filter = ttk.Combobox(filter_panel, state="readonly")
         self.user_filter.pack(side=tk.LEFT, padx=5)
-        self.user_filter.bind("<<ComboboxSelected>>", self.filter_tasks)
+        self.user_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
 
         # Epic filter combobox
         ttk.Label(filter_panel_2, text="Filter by Epic:").pack(side=tk.LEFT, padx=5)
@@ -38,13 +46,13 @@ class TaskView(ttk.Frame):
         ttk.Label(filter_panel_2, text="Filter by Sprint:").pack(side=tk.LEFT, padx=5)
         self.sprint_filter = ttk.Combobox(filter_panel_2, state="readonly")
         self.sprint_filter.pack(side=tk.LEFT, padx=5)
-        self.sprint_filter.bind("<<ComboboxSelected>>", self.filter_tasks)
+        self.sprint_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
 
         # Status filter combobox
         ttk.Label(filter_panel_2, text="Filter by Status:").pack(side=tk.LEFT, padx=5)
         self.status_filter = ttk.Combobox(filter_panel_2, state="readonly")
         self.status_filter.pack(side=tk.LEFT, padx=5)
-        self.status_filter.bind("<<ComboboxSelected>>", self.filter_tasks)
+        self.status_filter.bind("<<ComboboxSelected>>", self.refresher.schedule)
 
         # Date range filter for Due Dates
         ttk.Label(filter_panel_2, text="Due Date From (YYYY-MM-DD):").pack(side=tk.LEFT, padx=5)
@@ -53,7 +61,9 @@ class TaskView(ttk.Frame):
         ttk.Label(filter_panel_2, text="To:").pack(side=tk.LEFT, padx=5)
         self.to_date_entry = ttk.Entry(filter_panel_2, width=12)
         self.to_date_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Button(filter_panel_2, text="Apply Date Filter", command=self.filter_tasks).pack(side=tk.LEFT, padx=5)
+        ttk.Button(filter_panel_2, text="Apply Date Filter", command=self.refresher.schedule).pack(side=tk.LEFT, padx=5)
+        self.loading_label = ttk.Label(filter_panel_2, text="")
+        self.loading_label.pack(side=tk.LEFT, padx=10)
 
         # Populate the static comboboxes.
         self.load_epic_dropdown()
@@ -84,31 +94,45 @@ class TaskView(ttk.Frame):
         right_panel = ttk.Frame(main_frame)
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
+        # Scoped to this view so the other lists keep the default row height.
         style = ttk.Style()
-        style.configure("Treeview", rowheight=50)
+        style.configure("Tasks.Treeview", rowheight=50)
 
         # Include columns for ID, Title, Description, Due Date, Status, Category, Priority, User, Team, Timer.
         columns = ("ID", "Title", "Description", "Due Date", "Status", "Category", "Priority", "User", "Team", "Timer")
-        self.tree = ttk.Treeview(right_panel, columns=columns, show="headings")
+        self.tree = ttk.Treeview(right_panel, columns=columns, show="headings", style="Tasks.Treeview")
         for col in columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=150)
         self.tree.pack(pady=10, fill=tk.BOTH, expand=True)
         self.tree.bind("<Double-1>", lambda event: self.show_task_details())
+        self.pager = TreePager(self.tree, self.task_values, key=lambda row: row[0][0],
+                               runner=controller.queries, loading=self.loading_label)
 
         # Load tasks on initialization.
         self.load_tasks()
 
     def load_epic_dropdown(self):
         epics = self.controller.trasker.list_epics()
-        epic_names = ["All Epics"] + [epic[1] for epic in epics]
+        epic_names = ["All Epics"]
+        self.epic_map = {}
+        for epic in epics:
+            if epic[1] not in self.epic_map:
+                epic_names.append(epic[1])
+            self.epic_map.setdefault(epic[1], []).append(epic[0])
         self.epic_filter['values'] = epic_names
         self.epic_filter.current(0)
 
     def load_sprint_dropdown(self, sprints=None):
         if sprints is None:
             sprints = self.controller.trasker.list_sprints()
-        sprint_names = ["All Sprints"] + [sprint[1] for sprint in sprints]
+        sprint_names = ["All Sprints"]
+        # Several sprints can share a title (e.g. "Sprint 1" in two epics), so map names to all matching ids.
+        self.sprint_map = {}
+        for sprint in sprints:
+            if sprint[1] not in self.sprint_map:
+                sprint_names.append(sprint[1])
+            self.sprint_map.setdefault(sprint[1], []).append(sprint[0])
         self.sprint_filter['values'] = sprint_names
         self.sprint_filter.current(0)
 
@@ -125,16 +149,9 @@ class TaskView(ttk.Frame):
                 current_user_id = current_user[0]
             else:
                 current_user_id = current_user
-            # Retrieve users from teams that current user is a member of.
-            query = """
-                SELECT u.id, u.username
-                FROM users u
-                JOIN user_team ut ON u.id = ut.user_id
-                WHERE ut.team_id IN (
-                    SELECT team_id FROM user_team WHERE user_id = %s
-                )
-            """
-            rows = self.controller.trasker.db_execute(query, (current_user_id,), fetch=True)
+            # Users from the teams the current user is a member of.
+            trasker = self.controller.trasker
+            rows = trasker.team_members(trasker.get_user_teams(current_user_id))
             user_names = ["All Users"]
             self.user_map = {}
             for row in rows:
@@ -155,13 +172,7 @@ class TaskView(ttk.Frame):
                 current_user_id = current_user[0]
             else:
                 current_user_id = current_user
-            query = """
-                SELECT t.id, t.name
-                FROM teams t
-                JOIN user_team ut ON t.id = ut.team_id
-                WHERE ut.user_id = %s
-            """
-            rows = self.controller.trasker.db_execute(query, (current_user_id,), fetch=True)
+            rows = self.controller.trasker.teams_for_user(current_user_id)
             team_names = ["All Teams"]
             self.team_map = {}
             for row in rows:
@@ -175,95 +186,115 @@ class TaskView(ttk.Frame):
             self.team_filter.current(0)
 
     def load_tasks(self):
-        """Load tasks (using the filter criteria) into the treeview."""
-        self.filter_tasks()
+        """Reload tasks (using the filter criteria) into the treeview now, e.g. after a task changed."""
+        self.refresher.refresh_now()
 
-    def filter_tasks(self, event=None):
-        # Retrieve all tasks from the core logic.
-        tasks = self.controller.trasker.list_all_tasks()
-        filtered_tasks = tasks
+    def get_task_filters(self):
+        """Translate the filter widgets into a Trasker.query_tasks() filter dict."""
+        filters = {}
 
-        # Apply due date range filtering.
+        # Due date range.
         from_date_str = self.from_date_entry.get().strip()
         to_date_str = self.to_date_entry.get().strip()
-        if from_date_str or to_date_str:
-            try:
-                from_date = datetime.strptime(from_date_str, "%Y-%m-%d") if from_date_str else None
-                to_date = datetime.strptime(to_date_str, "%Y-%m-%d") if to_date_str else None
-            except ValueError:
-                messagebox.showerror("Error", "Due date filters must be in YYYY-MM-DD format")
-                return
-            temp_tasks = []
-            for task in filtered_tasks:
-                try:
-                    due_date = datetime.strptime(task[3], "%Y-%m-%d")
-                except ValueError:
-                    continue
-                if from_date and to_date:
-                    if from_date <= due_date <= to_date:
-                        temp_tasks.append(task)
-                elif from_date and due_date >= from_date:
-                    temp_tasks.append(task)
-                elif to_date and due_date <= to_date:
-                    temp_tasks.append(task)
-            filtered_tasks = temp_tasks
-
-        # Epic filtering.
+        try:
+            if from_date_str:
+                datetime.strptime(from_date_str, "%Y-%m-%d")
+                filters["due_from"] = from_date_str
+            if to_date_str:
+                datetime.strptime(to_date_str, "%Y-%m-%d")
+                filters["due_to"] = to_date_str
+        except ValueError:
+            messagebox.showerror("Error", "Due date filters must be in YYYY-MM-DD format")
+            return None
+
         selected_epic = self.epic_filter.get()
         if selected_epic != "All Epics":
-            epics = self.controller.trasker.list_epics()
-            epic_ids = [epic[0] for epic in epics if epic[1] == selected_epic]
-            # Here, we assume the sprint (which links to epic) is at index 9.
-            filtered_tasks = [task for task in filtered_tasks if task[9] in epic_ids]
+            filters["epic_id"] = self.epic_map.get(selected_epic, [])
 
-        # Sprint filtering.
         selected_sprint = self.sprint_filter.get()
         if selected_sprint != "All Sprints":
-            sprints = self.controller.trasker.list_sprints()
-            sprint_ids = [sprint[0] for sprint in sprints if sprint[1] == selected_sprint]
-            filtered_tasks = [task for task in filtered_tasks if task[9] in sprint_ids]
+            filters["sprint_id"] = self.sprint_map.get(selected_sprint, [])
 
-        # Status filtering.
         selected_status = self.status_filter.get()
         if selected_status != "All Statuses":
-            filtered_tasks = [task for task in filtered_tasks if task[4] == selected_status]
+            filters["status"] = selected_status
 
-        # Team filtering.
         selected_team = self.team_filter.get()
         if selected_team != "All Teams":
-            filtered_tasks = [task for task in filtered_tasks if task[11] == selected_team]
+            filters["team_id"] = [self.team_map[selected_team]] if selected_team in self.team_map else []
 
-        # User filtering.
         selected_user = self.user_filter.get()
         if selected_user != "All Users":
-            filtered_tasks = [task for task in filtered_tasks if task[10] == selected_user]
-
-        # Clear the treeview and insert filtered tasks.
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for task in filtered_tasks:
-            task_id = task[0]
-            timer_value = "running" if self.controller.trasker.is_timer_running(task_id) else self.controller.trasker.get_total_task_time(task_id)
-            # Convert user_id and team_id into names using our maps.
-            username = task[10]
-            teamname = task[11]
-            values = (task[0], task[1], task[2], task[3], task[4], task[5], task[6], username, teamname, timer_value)
-            self.tree.insert("", tk.END, values=values)
+            filters["user_id"] = [self.user_map[selected_user]] if selected_user in self.user_map else []
+
+        return filters
+
+    def filter_tasks(self, filters):
+        # Pages are fetched off the Tk thread as the list is scrolled; a newer filter change supersedes them.
+        self.pager.load(self.task_pages(self.controller.trasker, filters))
+
+    @staticmethod
+    def task_pages(trasker, filters):
+        """Yield pages of (task, (timer_running, total_time)) for the tasks matching filters."""
+        # Filtering happens in SQL, and pages continue after the (due_date, id) of the last row rather than
+        # at an offset, so tasks added or deleted while scrolling neither repeat nor skip rows.
+        for tasks in trasker.pages(trasker.list_matching_tasks, filters, page_size=PAGE_SIZE):
+            # Timer state for every task on the page comes back in a single query.
+            time_summary = trasker.task_time_summary([task[0] for task in tasks])
+            yield [(task, time_summary[task[0]]) for task in tasks]
+
+    def on_data_changed(self, changes):
+        """Patch the rows of changed tasks in place; reload only for new tasks or a resync."""
+        if any(change["op"] in ("resync", "insert") and change["table"] != "task_sessions" for change in changes):
+            self.load_tasks()
+            return
+        deleted = {change["id"] for change in changes if change["table"] == "tasks" and change["op"] == "delete"}
+        changed = {change["id"] for change in changes if change["table"] == "tasks" and change["op"] == "update"}
+        changed |= {change.get("task_id") for change in changes if change["table"] == "task_sessions"}
+        changed -= deleted | {None}
+        self.pager.remove(deleted)
+        filters = self.refresher.state
+        if not changed or filters is None:
+            return
+        task_ids = list(changed)
+        trasker = self.controller.trasker
+
+        def fetch():
+            # The changed tasks that still match the filters, with fresh timer state.
+            tasks = trasker.query_tasks({**filters, "id": task_ids})
+            time_summary = trasker.task_time_summary([task[0] for task in tasks])
+            return [(task, time_summary[task[0]]) for task in tasks]
+
+        self.controller.queries.submit((id(self), "patch"), fetch,
+                                       lambda rows: self.apply_task_changes(task_ids, rows))
+
+    def apply_task_changes(self, task_ids, rows):
+        matching = {row[0][0] for row in rows}
+        if self.pager.pages is None and not matching <= self.pager.keys:
+            # Everything is loaded and a task now matches the filters: reload to place it in order.
+            self.load_tasks()
+            return
+        self.pager.patch(rows)
+        self.pager.remove(set(task_ids) - matching)
+
+    @staticmethod
+    def task_values(row):
+        task, (running, total_time) = row
+        timer_value = "running" if running else total_time
+        username = task[10]
+        teamname = task[11]
+        return (task[0], task[1], task[2], task[3], task[4], task[5], task[6], username, teamname, timer_value)
 
     def epic_filter_changed(self, event=None):
         selected_epic = self.epic_filter.get()
         if selected_epic == "All Epics":
             self.load_sprint_dropdown()
         else:
-            epics = self.controller.trasker.list_epics()
-            epic_id = next((epic[0] for epic in epics if epic[1] == selected_epic), None)
-            if epic_id:
-                all_sprints = self.controller.trasker.list_sprints()
-                filtered_sprints = [sprint for sprint in all_sprints if sprint[5] == epic_id]
-                self.load_sprint_dropdown(filtered_sprints)
-            else:
-                self.load_sprint_dropdown([])
-        self.filter_tasks()
+            epic_ids = self.epic_map.get(selected_epic, [])
+            all_sprints = self.controller.trasker.list_sprints()
+            filtered_sprints = [sprint for sprint in all_sprints if sprint[5] in epic_ids]
+            self.load_sprint_dropdown(filtered_sprints)
+        self.refresher.schedule()
 
     def show_add_task_window(self):
         AddTaskView(self, self.controller, refresh_callback=self.load_tasks)
@@ -277,7 +308,6 @@ class TaskView(ttk.Frame):
         if not task_values:
             return
         task_id = task_values[0]
-        print("Task id:", task_id)  # Debug
         from trasker_gui.supporting_view.single_task_view import SingleTaskView
         SingleTaskView(self, self.controller, task_id, refresh_callback=self.load_tasks)
 
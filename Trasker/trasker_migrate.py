@@ -0,0 +1,384 @@
+import argparse
+from trasker_db_psql import connect
+
+# Values that look like a date (optionally followed by a time) are converted; anything else becomes NULL.
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}"
+
+
+def to_date(column):
+    return f"CASE WHEN {column} ~ '{DATE_PATTERN}' THEN LEFT({column}, 10)::date END"
+
+
+def to_timestamptz(column):
+    return f"CASE WHEN {column} ~ '{DATE_PATTERN}' THEN {column}::timestamptz END"
+
+
+def alter_type(table, column, new_type, using, default=None):
+    """Statements that change a TEXT column's type in place, re-applying its default afterwards."""
+    statements = [
+        f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT",
+        f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {new_type} USING {using}",
+    ]
+    if default:
+        statements.append(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT {default}")
+    return statements
+
+
+# Columns that early databases stored as TEXT, with the type migration 1 converts them to:
+# (table, column, type, conversion, default).
+TYPED_COLUMNS = [
+    ("tasks", "due_date", "DATE", to_date, None),
+    ("epics", "start_date", "DATE", to_date, None),
+    ("epics", "end_date", "DATE", to_date, None),
+    ("sprints", "start_date", "DATE", to_date, None),
+    ("sprints", "end_date", "DATE", to_date, None),
+    ("bugs", "created_date", "TIMESTAMPTZ", to_timestamptz, None),
+    ("bugs", "resolved_date", "TIMESTAMPTZ", to_timestamptz, None),
+    ("notes", "created_date", "TIMESTAMPTZ", to_timestamptz, "CURRENT_TIMESTAMP"),
+    ("notes", "updated_date", "TIMESTAMPTZ", to_timestamptz, "CURRENT_TIMESTAMP"),
+    ("documents", "upload_date", "TIMESTAMPTZ", to_timestamptz, "CURRENT_TIMESTAMP"),
+    ("task_sessions", "start_time", "TIMESTAMPTZ", to_timestamptz, None),
+    ("task_sessions", "end_time", "TIMESTAMPTZ", to_timestamptz, None),
+]
+
+# Recompute task_time_rollups from every closed session. Sessions are the source of truth; the rollups
+# are only kept up to date incrementally by Trasker.stop_task_timer.
+REBUILD_TIME_ROLLUPS = [
+    "DELETE FROM task_time_rollups",
+    """
+    INSERT INTO task_time_rollups (task_id, user_id, day, elapsed_time, session_count)
+    SELECT task_id, COALESCE(user_id, 0), start_time::date, SUM(elapsed_time), COUNT(*)
+    FROM task_sessions
+    WHERE end_time IS NOT NULL
+    GROUP BY task_id, COALESCE(user_id, 0), start_time::date
+    """,
+]
+
+# Ordered list of (version, name, statements). Never edit an applied migration; append a new one.
+MIGRATIONS = [
+    (1, "typed date and time columns", [
+        statement
+        for table, column, new_type, conversion, default in TYPED_COLUMNS
+        for statement in alter_type(table, column, new_type, conversion(column), default)
+    ]),
+    (2, "indexes for Trasker list queries", [
+        # Visibility is always "user_id = me OR team_id = my team"; Postgres combines these with a BitmapOr.
+        "CREATE INDEX IF NOT EXISTS tasks_team_status_due_idx ON tasks (team_id, status, due_date)",
+        "CREATE INDEX IF NOT EXISTS tasks_user_status_due_idx ON tasks (user_id, status, due_date)",
+        "CREATE INDEX IF NOT EXISTS tasks_sprint_idx ON tasks (sprint_id)",
+        "CREATE INDEX IF NOT EXISTS tasks_parent_idx ON tasks (parent_task_id) WHERE parent_task_id IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS task_sessions_open_idx ON task_sessions (task_id) WHERE end_time IS NULL",
+        "CREATE INDEX IF NOT EXISTS task_sessions_task_idx ON task_sessions (task_id) INCLUDE (elapsed_time)",
+        # task_time_rollups_day_idx moved to migration 6, which creates its table on databases set up before it.
+        "CREATE INDEX IF NOT EXISTS bugs_team_status_idx ON bugs (team_id, status)",
+        "CREATE INDEX IF NOT EXISTS bugs_user_idx ON bugs (user_id)",
+        "CREATE INDEX IF NOT EXISTS bugs_task_idx ON bugs (task_id) WHERE task_id IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS notes_type_reference_idx ON notes (note_type, reference_id)",
+        "CREATE INDEX IF NOT EXISTS notes_team_idx ON notes (team_id)",
+        "CREATE INDEX IF NOT EXISTS notes_user_idx ON notes (user_id)",
+        "CREATE INDEX IF NOT EXISTS documents_note_idx ON documents (note_id)",
+        "CREATE INDEX IF NOT EXISTS documents_team_idx ON documents (team_id)",
+        "CREATE INDEX IF NOT EXISTS documents_user_idx ON documents (user_id)",
+        "CREATE INDEX IF NOT EXISTS sprints_epic_idx ON sprints (epic_id)",
+        "CREATE INDEX IF NOT EXISTS sprints_team_idx ON sprints (team_id)",
+        "CREATE INDEX IF NOT EXISTS sprints_user_idx ON sprints (user_id)",
+        "CREATE INDEX IF NOT EXISTS epics_team_idx ON epics (team_id)",
+        "CREATE INDEX IF NOT EXISTS epics_user_idx ON epics (user_id)",
+        "CREATE INDEX IF NOT EXISTS user_team_team_idx ON user_team (team_id)",
+    ]),
+    (3, "uncompressed document storage", [
+        # substring() on an uncompressed, out-of-line value reads only the TOAST chunks it needs,
+        # which keeps streamed downloads from decompressing the whole file per slice.
+        # Applies to values written from now on.
+        "ALTER TABLE documents ALTER COLUMN document_blob SET STORAGE EXTERNAL",
+    ]),
+    (4, "content-addressed document storage", [
+        # Each distinct file is stored once, keyed by the hex SHA-256 of its content.
+        # refcount is the number of document_versions rows pointing at it and is kept by the triggers below.
+        """
+        CREATE TABLE IF NOT EXISTS document_blobs (
+            content_hash TEXT PRIMARY KEY,
+            content BYTEA NOT NULL,
+            size BIGINT NOT NULL,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "ALTER TABLE document_blobs ALTER COLUMN content SET STORAGE EXTERNAL",
+        """
+        CREATE TABLE IF NOT EXISTS document_versions (
+            id SERIAL PRIMARY KEY,
+            document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+            version INTEGER NOT NULL,
+            content_hash TEXT NOT NULL REFERENCES document_blobs(content_hash),
+            filename TEXT,
+            mimetype TEXT,
+            size BIGINT,
+            uploaded_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+            user_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+            UNIQUE (document_id, version)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS document_versions_hash_idx ON document_versions (content_hash)",
+        """
+        CREATE OR REPLACE FUNCTION document_versions_refcount() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE document_blobs SET refcount = refcount + 1 WHERE content_hash = NEW.content_hash;
+                RETURN NEW;
+            END IF;
+            UPDATE document_blobs SET refcount = refcount - 1 WHERE content_hash = OLD.content_hash;
+            DELETE FROM document_blobs WHERE content_hash = OLD.content_hash AND refcount <= 0;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER document_versions_refcount
+        AFTER INSERT OR DELETE ON document_versions
+        FOR EACH ROW EXECUTE FUNCTION document_versions_refcount()
+        """,
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash TEXT REFERENCES document_blobs(content_hash)",
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS size BIGINT",
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1",
+        # Move existing content into the blob store, one copy per distinct file.
+        """
+        INSERT INTO document_blobs (content_hash, content, size)
+        SELECT DISTINCT ON (encode(sha256(document_blob), 'hex'))
+               encode(sha256(document_blob), 'hex'), document_blob, octet_length(document_blob)
+        FROM documents
+        WHERE document_blob IS NOT NULL
+        ON CONFLICT (content_hash) DO NOTHING
+        """,
+        """
+        UPDATE documents
+        SET content_hash = encode(sha256(document_blob), 'hex'), size = octet_length(document_blob), version = 1
+        WHERE document_blob IS NOT NULL
+        """,
+        """
+        INSERT INTO document_versions (document_id, version, content_hash, filename, mimetype, size, uploaded_at, user_id)
+        SELECT id, 1, content_hash, filename, mimetype, size, upload_date, user_id
+        FROM documents
+        WHERE content_hash IS NOT NULL
+        """,
+        "ALTER TABLE documents DROP COLUMN document_blob",
+    ]),
+    (5, "change notifications", [
+        # Every row change on a watched table sends a small JSON payload on the trasker_changes channel,
+        # e.g. {"table": "tasks", "op": "update", "id": 42, "team_id": 3, "user_id": 7}.
+        # Clients fetch the row itself if they need it; the payload stays far below the 8000-byte limit.
+        """
+        CREATE OR REPLACE FUNCTION trasker_notify_change() RETURNS trigger AS $$
+        DECLARE
+            changed JSONB;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed := to_jsonb(OLD);
+            ELSE
+                changed := to_jsonb(NEW);
+            END IF;
+            PERFORM pg_notify('trasker_changes', jsonb_strip_nulls(jsonb_build_object(
+                'table', TG_TABLE_NAME,
+                'op', lower(TG_OP),
+                'id', changed->'id',
+                'task_id', changed->'task_id',
+                'user_id', changed->'user_id',
+                'team_id', changed->'team_id'
+            ))::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        *[f"""
+        CREATE TRIGGER {table}_notify_change
+        AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION trasker_notify_change()
+        """ for table in ("tasks", "bugs", "notes", "documents", "sprints", "task_sessions")],
+    ]),
+    (6, "per-session users and time rollups", [
+        # setup() creates these for new databases; older ones get them here.
+        "ALTER TABLE task_sessions ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE SET NULL",
+        """
+        CREATE TABLE IF NOT EXISTS task_time_rollups (
+            task_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL DEFAULT 0,
+            day DATE NOT NULL,
+            elapsed_time BIGINT NOT NULL DEFAULT 0,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (task_id, user_id, day),
+            FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS task_time_rollups_day_idx ON task_time_rollups (day)",
+    ]),
+    (7, "backfill task time rollups", [
+        # Task time is read from the rollups only; sessions closed before they existed would show as 0.
+        *REBUILD_TIME_ROLLUPS,
+    ]),
+    (8, "task list keyset index", [
+        # The task list pages on (due_date, id), undated tasks last; see TASK_PAGE_KEY in trasker_psql.
+        # Walking this index lets a page stop after LIMIT rows instead of sorting every visible task.
+        "CREATE INDEX IF NOT EXISTS tasks_page_idx ON tasks ((COALESCE(due_date, 'infinity')), id)",
+    ]),
+]
+
+# Representative Trasker queries whose plans are reported before and after migrating.
+# Each takes (user_id, team_id) as parameters.
+EXPLAIN_QUERIES = {
+    "tasks visible to user": """
+        SELECT t.id FROM tasks t
+        WHERE (t.user_id = %s OR t.team_id = %s) AND t.status = 'Pending'
+        ORDER BY t.due_date
+    """,
+    "task list page": """
+        SELECT t.id FROM tasks t
+        WHERE (t.user_id = %s OR t.team_id = %s) AND (COALESCE(t.due_date, 'infinity'), t.id) > ('infinity', 0)
+        ORDER BY COALESCE(t.due_date, 'infinity'), t.id
+        LIMIT 200
+    """,
+    "open timer for task": """
+        SELECT id FROM task_sessions
+        WHERE task_id = (SELECT MIN(id) FROM tasks WHERE user_id = %s OR team_id = %s) AND end_time IS NULL
+    """,
+    "sprint tasks": """
+        SELECT t.id FROM tasks t
+        WHERE t.sprint_id = (SELECT MIN(id) FROM sprints) AND (t.user_id = %s OR t.team_id = %s)
+    """,
+    "notes by reference": """
+        SELECT * FROM notes
+        WHERE note_type = 'task' AND reference_id = 1 AND (user_id = %s OR team_id = %s)
+    """,
+    "bugs visible to user": """
+        SELECT b.id FROM bugs b WHERE b.user_id = %s OR b.team_id = %s
+    """,
+}
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def explain_plans(cursor, analyze=False):
+    """Return {query name: plan text} for EXPLAIN_QUERIES using the first user and one of their teams."""
+    cursor.execute("SELECT u.id, ut.team_id FROM users u LEFT JOIN user_team ut ON ut.user_id = u.id ORDER BY u.id LIMIT 1")
+    params = cursor.fetchone() or (None, None)
+    explain = "EXPLAIN (ANALYZE, BUFFERS)" if analyze else "EXPLAIN"
+    plans = {}
+    for name, query in EXPLAIN_QUERIES.items():
+        cursor.execute(f"{explain} {query}", params)
+        plans[name] = "\n".join(row[0] for row in cursor.fetchall())
+    return plans
+
+
+def print_plans(title, plans):
+    print(f"\n===== {title} =====")
+    for name, plan in plans.items():
+        print(f"--- {name} ---")
+        print(plan)
+
+
+def migrate(target=None, explain=True, analyze=False):
+    """Apply every pending migration up to target (all by default), each in its own transaction."""
+    conn = connect()
+    cursor = conn.cursor()
+    ensure_migrations_table(cursor)
+    conn.commit()
+
+    done = applied_versions(cursor)
+    pending = [m for m in MIGRATIONS if m[0] not in done and (target is None or m[0] <= target)]
+    if not pending:
+        print("[MIGRATE] Schema is up to date.")
+        cursor.close()
+        conn.close()
+        return
+
+    before = explain_plans(cursor, analyze) if explain else None
+    conn.rollback()  # EXPLAIN ANALYZE executes the queries; don't keep anything it touched.
+
+    for version, name, statements in pending:
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            print(f"[MIGRATE] Applied {version}: {name}")
+        except Exception as e:
+            conn.rollback()
+            print(f"[MIGRATE] Migration {version} ({name}) failed: {e}")
+            cursor.close()
+            conn.close()
+            raise
+
+    # Refresh planner statistics so the "after" plans reflect the new indexes.
+    cursor.execute("ANALYZE")
+    conn.commit()
+
+    if explain:
+        after = explain_plans(cursor, analyze)
+        conn.rollback()
+        print_plans("Plans before migration", before)
+        print_plans("Plans after migration", after)
+
+    cursor.close()
+    conn.close()
+
+
+def status():
+    conn = connect()
+    cursor = conn.cursor()
+    ensure_migrations_table(cursor)
+    conn.commit()
+    done = applied_versions(cursor)
+    for version, name, _ in MIGRATIONS:
+        print(f"{'[x]' if version in done else '[ ]'} {version}: {name}")
+    cursor.close()
+    conn.close()
+
+
+def has_typed_columns(cursor):
+    """True when none of the TYPED_COLUMNS is still TEXT, i.e. the tables were created typed and migration 1 has nothing to do."""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND data_type = 'text' AND (table_name, column_name) IN %s
+        LIMIT 1
+    """, (tuple((table, column) for table, column, *_ in TYPED_COLUMNS),))
+    return cursor.fetchone() is None
+
+
+def mark_applied(cursor, versions):
+    """Record migrations as applied without running them; used by setup() for a schema created already typed."""
+    ensure_migrations_table(cursor)
+    for version, name, _ in MIGRATIONS:
+        if version not in versions:
+            continue
+        cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+                       (version, name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trasker: versioned schema migrations")
+    parser.add_argument("--status", action="store_true", help="List migrations and whether they are applied")
+    parser.add_argument("--target", type=int, help="Only apply migrations up to this version")
+    parser.add_argument("--no-explain", action="store_true", help="Skip the before/after EXPLAIN report")
+    parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE for the report")
+    args = parser.parse_args()
+
+    if args.status:
+        status()
+    else:
+        migrate(target=args.target, explain=not args.no_explain, analyze=args.analyze)
+
+
+if __name__ == "__main__":
+    main()
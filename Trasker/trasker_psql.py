@@ -1,132 +1,512 @@
+import hashlib
+import json
 import os
-import psycopg2
+import re
+import select
+import threading
+import time
+from contextlib import contextmanager
 from colorama import Fore, Style
-from psycopg2 import OperationalError, pool
+from psycopg2 import OperationalError, extensions
+from psycopg2.extras import execute_batch, execute_values
+from trasker_connection import get_connection_factory
 
 
 def create_connection_pool(minconn=1, maxconn=10):
-    # Define your connection parameters.
-    LOCAL_DB_HOST = "192.168.68.123"
-    EXTERNAL_DB_HOST = os.environ.get("DB_HOST", "EXTERNAL_IP_ADDRESS")
-    DB_NAME = os.environ.get("DB_NAME", "trasker_db")
-    DB_USER = os.environ.get("DB_USER", "trasker_user")
-    DB_PASSWORD = os.environ.get("DB_PASSWORD", "wotgyx-Risky5-hazsej")
-    DB_PORT = os.environ.get("DB_PORT", "5432")
-
-    # Attempt local connection first, fallback to external.
-    try:
-        pool = psycopg2.pool.SimpleConnectionPool(
-            minconn,
-            maxconn,
-            host=LOCAL_DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            port=DB_PORT,
-            connect_timeout=5
-        )
-        print("Connected to local database at", LOCAL_DB_HOST)
-        return pool
-    except Exception as local_error:
-        print("Local connection failed:", local_error)
-        print("Falling back to external connection...")
-
-    pool = psycopg2.pool.SimpleConnectionPool(
-        minconn,
-        maxconn,
-        host=EXTERNAL_DB_HOST,
-        database=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        port=DB_PORT,
-        connect_timeout=5
-    )
-    print("Connected to external database at", EXTERNAL_DB_HOST)
-    return pool
+    """
+    Create a thread-safe connection pool against the reachable database host.
+    Host selection (parallel probe, cached on disk) is handled by the shared connection factory.
+    """
+    return get_connection_factory().create_pool(minconn, maxconn)
 
 def connect():
+    """Open a single connection to the reachable database host."""
+    return get_connection_factory().connect()
+
+
+# Matches "INSERT INTO table (cols) VALUES (%s, ...)" so queued inserts can be sent with execute_values.
+INSERT_PATTERN = re.compile(r"^(INSERT\s+INTO\s+(\w+)\s*\(.*?\))\s*VALUES\s*(\(.*\))$", re.IGNORECASE | re.DOTALL)
+# Statements db_execute may safely resend after the connection dropped mid-query.
+READ_QUERY = re.compile(r"^SELECT\b", re.IGNORECASE)
+# Tables keyed by something other than a SERIAL id column.
+NO_ID_TABLES = {"user_team"}
+
+
+# Filters accepted by Trasker.query_tasks() that map directly onto a tasks column.
+TASK_FILTER_COLUMNS = {
+    "id": "t.id",
+    "sprint_id": "t.sprint_id",
+    "status": "t.status",
+    "priority": "t.priority",
+    "category": "t.category",
+    "user_id": "t.user_id",
+    "team_id": "t.team_id",
+    "parent_task_id": "t.parent_task_id",
+}
+TASK_DUE_DATE = "t.due_date"
+TASK_ORDER_COLUMNS = {
+    "id": "t.id",
+    "title": "t.title",
+    "status": "t.status",
+    "due_date": TASK_DUE_DATE,
+    "priority": "CASE t.priority WHEN 'Critical' THEN 1 WHEN 'High' THEN 2 WHEN 'Medium' THEN 3 WHEN 'Low' THEN 4 END",
+}
+
+
+# Keyset orderings for the paginated list_* methods: (sort expression, placeholder for the "after" value) pairs.
+# The last expression is always the primary key so the ordering is total. Tasks without a due date sort last.
+TASK_PAGE_KEY = [("COALESCE(t.due_date, 'infinity')", "COALESCE(%s::date, 'infinity')"), ("t.id", "%s")]
+BUG_PAGE_KEY = [("b.id", "%s")]
+NOTE_PAGE_KEY = [("id", "%s")]
+DOCUMENT_PAGE_KEY = [("d.id", "%s")]
+EPIC_PAGE_KEY = [("e.id", "%s")]
+SPRINT_PAGE_KEY = [("s.id", "%s")]
+# How Trasker.pages() reads the "after" key back out of the last row of a page, per list method.
+PAGE_CURSORS = {
+    "list_all_tasks": lambda row: (row[3], row[0]),
+    "list_matching_tasks": lambda row: (row[3], row[0]),
+}
+PAGE_SIZE = int(os.environ.get("TRASKER_PAGE_SIZE", "200"))
+# Passed as limit= by the reference cache to bypass it and load every row.
+EVERY_ROW = -1
+# Bytes fetched per round trip when streaming document content.
+DOCUMENT_CHUNK_SIZE = int(os.environ.get("TRASKER_DOCUMENT_CHUNK_SIZE", str(1024 * 1024)))
+
+
+def keyset(key, after=None, limit=None):
+    """
+    Build the keyset pagination pieces for a listing ordered by `key`.
+    Returns (condition, order_by, params): condition selects the rows strictly after `after`
+    ("TRUE" on the first page), and order_by carries the ORDER BY and optional LIMIT.
+    params holds the condition's values followed by the limit, in that order.
     """
-    Try connecting to the local PostgreSQL server first (using a 5-second timeout).
-    If that fails, fall back to the external host.
+    params = []
+    condition = "TRUE"
+    if after is not None:
+        if not isinstance(after, (list, tuple)):
+            after = (after,)
+        condition = (f"({', '.join(column for column, _ in key)}) > "
+                     f"({', '.join(placeholder for _, placeholder in key)})")
+        params.extend(after)
+    order_by = "ORDER BY " + ", ".join(column for column, _ in key)
+    if limit is not None:
+        order_by += " LIMIT %s"
+        params.append(limit)
+    return condition, order_by, params
+
+
+def blank_to_none(value):
+    """Date columns are typed, so the empty string the GUI entries produce must be stored as NULL."""
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+class TraskerBatch:
+    """
+    Unit of work returned by Trasker.batch().
+    Mutations issued through the Trasker while the batch is open are queued here and sent on exit:
+    consecutive runs of the same statement go out in one round trip, and everything commits once.
     """
-    # Define the two host options.
-    LOCAL_DB_HOST = "192.168.68.123"
-    EXTERNAL_DB_HOST = os.environ.get("DB_HOST", "EXTERNAL_IP_ADDRESS")
-
-    # Other connection parameters.
-    DB_NAME = os.environ.get("DB_NAME", "trasker_db")
-    DB_USER = os.environ.get("DB_USER", "trasker_user")
-    DB_PASSWORD = os.environ.get("DB_PASSWORD", "wotgyx-Risky5-hazsej")
-    DB_PORT = os.environ.get("DB_PORT", "5432")
-
-    # Try connecting to the local database first.
-    try:
-        conn = psycopg2.connect(
-            host=LOCAL_DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            port=DB_PORT,
-            connect_timeout=5  # Timeout in seconds
-        )
-        print("Connected to local database at", LOCAL_DB_HOST)
-        return conn
-    except OperationalError as local_error:
-        print("Local connection failed:", local_error)
-        print("Falling back to external connection...")
-
-    # Try connecting to the external database.
-    try:
-        conn = psycopg2.connect(
-            host=EXTERNAL_DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            port=DB_PORT,
-            connect_timeout=5  # You can adjust this timeout as needed
-        )
-        print("Connected to external database at", EXTERNAL_DB_HOST)
-        return conn
-    except OperationalError as external_error:
-        print("External connection failed:", external_error)
-        raise external_error
 
+    def __init__(self):
+        self.statements = []
+        self.ids = []  # Generated ids of queued INSERTs, in the order they were queued.
+
+    def queue(self, query, params):
+        self.statements.append((query, params))
+
+    def __len__(self):
+        return len(self.statements)
+
+    def groups(self):
+        """Yield (query, [params, ...]) for each run of consecutive identical statements."""
+        group_query, group_params = None, []
+        for query, params in self.statements:
+            if query != group_query and group_params:
+                yield group_query, group_params
+                group_params = []
+            group_query = query
+            group_params.append(params)
+        if group_params:
+            yield group_query, group_params
+
+    def flush(self, cursor):
+        """Send all queued statements on the given cursor."""
+        for query, rows in self.groups():
+            match = INSERT_PATTERN.match(query)
+            if match:
+                head, table, template = match.groups()
+                if table.lower() in NO_ID_TABLES:
+                    execute_values(cursor, f"{head} VALUES %s", rows, template=template, page_size=len(rows))
+                else:
+                    returned = execute_values(cursor, f"{head} VALUES %s RETURNING id", rows,
+                                              template=template, page_size=len(rows), fetch=True)
+                    self.ids.extend(row[0] for row in returned)
+            else:
+                execute_batch(cursor, query, rows, page_size=len(rows))
+        self.statements = []
+
+
+# Seconds a cached reference table (users, teams, memberships, epics, sprints) is trusted before reloading.
+REFERENCE_CACHE_TTL = float(os.environ.get("TRASKER_CACHE_TTL", "300"))
+# Seconds dashboard_stats() results are reused; task writes from other clients show up after at most this long.
+DASHBOARD_CACHE_TTL = float(os.environ.get("TRASKER_DASHBOARD_TTL", "30"))
+
+
+class ReferenceCache:
+    """
+    Process-wide cache of the small, rarely changing tables every view needs for dropdowns and
+    id-to-name lookups. Entries are keyed by tuples whose first element names the table, e.g.
+    ("teams",) or ("epics", user_id, team_id); they are loaded on first use and reloaded after
+    ttl seconds (or the ttl passed to get()), or sooner once a Trasker mutator invalidates that table.
+    """
+
+    def __init__(self, ttl=REFERENCE_CACHE_TTL):
+        self.ttl = ttl
+        self.entries = {}
+        self.generation = 0  # Bumped on invalidation so a load that raced with it isn't stored.
+        self.lock = threading.Lock()
+
+    def get(self, key, loader, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+            generation = self.generation
+        value = loader()
+        with self.lock:
+            if generation == self.generation:
+                self.entries[key] = (time.monotonic(), value)
+        return value
+
+    def invalidate(self, *tables):
+        """Drop the cached entries for the given tables, or everything when none are given."""
+        with self.lock:
+            self.generation += 1
+            if not tables:
+                self.entries.clear()
+                return
+            for key in [key for key in self.entries if key[0] in tables]:
+                del self.entries[key]
+
+
+# NOTIFY channel fed by the trasker_notify_change() triggers (migration 5).
+CHANGE_CHANNEL = "trasker_changes"
+# Seconds between checks for ChangeListener.stop(), and before reconnecting a dropped listener.
+LISTEN_POLL_INTERVAL = 1.0
+LISTEN_RECONNECT_DELAY = 5.0
+
+
+class ChangeListener:
+    """
+    Listens for row-change notifications on its own autocommit connection (outside the pool) in a
+    daemon thread, and passes each decoded payload to the subscribed callbacks, on that thread.
+    Payloads look like {"table": "tasks", "op": "update", "id": 42, "team_id": 3, "user_id": 7}.
+
+    Notifications sent while the connection was down are lost, so after a reconnect subscribers get
+    {"table": None, "op": "resync"} and should reload everything they show.
+    """
 
-class Trasker:
     def __init__(self):
-        self.conn = connect()  # Open connection once
+        self.subscribers = {}  # token -> (callback, set of tables, or None for all)
+        self.counter = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.connected = False  # True while LISTEN is active and the triggers exist.
+
+    def subscribe(self, callback, tables=None):
+        """Call callback(change) for changes to the given tables (all when None). Returns a token for unsubscribe()."""
+        with self.lock:
+            self.counter += 1
+            self.subscribers[self.counter] = (callback, set(tables) if tables else None)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="trasker-listen", daemon=True)
+                self.thread.start()
+            return self.counter
+
+    def unsubscribe(self, token):
+        with self.lock:
+            self.subscribers.pop(token, None)
+
+    def dispatch(self, change):
+        with self.lock:
+            subscribers = list(self.subscribers.values())
+        for callback, tables in subscribers:
+            if tables is None or change.get("table") in tables or change.get("op") == "resync":
+                try:
+                    callback(change)
+                except Exception as e:
+                    print(Fore.RED + f"[LISTEN] Change handler failed: {e}" + Style.RESET_ALL)
+
+    def run(self):
+        reconnecting = False
+        while not self.stopped.is_set():
+            try:
+                conn = connect()
+            except Exception as e:
+                print(Fore.YELLOW + f"[LISTEN] Cannot connect ({e}). Retrying..." + Style.RESET_ALL)
+                self.stopped.wait(LISTEN_RECONNECT_DELAY)
+                continue
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM pg_proc WHERE proname = 'trasker_notify_change'")
+                    if cursor.fetchone() is None:
+                        print(Fore.YELLOW + "[LISTEN] Change triggers are missing; run trasker_migrate.py."
+                              + Style.RESET_ALL)
+                        return
+                    cursor.execute(f"LISTEN {CHANGE_CHANNEL}")
+                self.connected = True
+                if reconnecting:
+                    self.dispatch({"table": None, "op": "resync"})
+                reconnecting = True
+                while not self.stopped.is_set():
+                    if not select.select([conn], [], [], LISTEN_POLL_INTERVAL)[0]:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            change = json.loads(notify.payload)
+                        except ValueError:
+                            continue
+                        self.dispatch(change)
+            except (OperationalError, OSError) as e:
+                print(Fore.YELLOW + f"[LISTEN] Connection lost ({e}). Reconnecting..." + Style.RESET_ALL)
+            finally:
+                self.connected = False
+                conn.close()
+            self.stopped.wait(LISTEN_RECONNECT_DELAY)
+
+    def stop(self):
+        self.stopped.set()
+
+
+class Trasker:
+    def __init__(self, minconn=None, maxconn=None, retries=1):
+        """
+        Every query checks a connection out of a shared ThreadedConnectionPool, so GUI views,
+        background workers and the CLI can run queries concurrently.
+        Pool size defaults to the DB_POOL_MIN / DB_POOL_MAX environment variables.
+        """
+        if minconn is None:
+            minconn = int(os.environ.get("DB_POOL_MIN", "1"))
+        if maxconn is None:
+            maxconn = int(os.environ.get("DB_POOL_MAX", "10"))
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.retries = retries  # How many times to reconnect and retry after an OperationalError.
+        self.pool = create_connection_pool(minconn, maxconn)
+        self.pool_lock = threading.Lock()
+        # ThreadedConnectionPool raises instead of waiting when exhausted, so callers queue here.
+        self.pool_slots = threading.BoundedSemaphore(maxconn)
+        self.local = threading.local()  # Holds the active batch, per thread.
+        self.cache = ReferenceCache()
+        self.listener = ChangeListener()
+        self.listening = False
         self.current_user = None
         self.current_team = None
 
+    def get_connection(self):
+        """
+        Check a healthy connection out of the pool; returns (connection, the pool it came from).
+        Connections that were closed by the server or left in an unknown state are discarded,
+        and the pool opens a fresh one in their place. If the pool's host stops accepting
+        connections altogether, the host is resolved again and the pool replaced.
+        """
+        pool = self.pool
+        for _ in range(self.maxconn + 1):
+            try:
+                conn = pool.getconn()
+            except OperationalError:
+                pool = self.reopen_pool(pool)
+                conn = pool.getconn()
+            if not conn.closed and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_UNKNOWN:
+                return conn, pool
+            pool.putconn(conn, close=True)
+        raise OperationalError("Could not obtain a healthy database connection from the pool.")
+
+    def reopen_pool(self, failed):
+        """
+        Replace the pool `failed` with one against whichever host answers now, and return it.
+        Connections still checked out of the old pool are closed as they are released.
+        """
+        with self.pool_lock:
+            if self.pool is failed:
+                get_connection_factory().invalidate()
+                self.pool = create_connection_pool(self.minconn, self.maxconn)
+            return self.pool
+
+    def release_connection(self, conn, pool, discard=False):
+        """Return a connection to the pool it came from, closing it if it is broken or the pool was replaced."""
+        if pool.closed:
+            conn.close()
+            return
+        pool.putconn(conn, close=discard or bool(conn.closed) or pool is not self.pool)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks out a connection for the duration of the block.
+        Commits on success and rolls back on error.
+        """
+        self.pool_slots.acquire()
+        try:
+            conn, pool = self.get_connection()
+        except Exception:
+            self.pool_slots.release()
+            raise
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except OperationalError:
+            # The socket may be gone; don't hand this connection to anyone else.
+            discard = True
+            if conn.closed:
+                # Forget the cached host so the next connection attempt probes the candidates again.
+                get_connection_factory().invalidate()
+            raise
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release_connection(conn, pool, discard)
+            self.pool_slots.release()
+
+    @contextmanager
+    def batch(self):
+        """
+        Queue every mutation made inside the block and send them in a single transaction.
+
+            with trasker.batch() as batch:
+                for task_id in task_ids:
+                    trasker.task_change_status(task_id, "Completed")
+            print(batch.ids)  # ids generated by any add_* calls
+
+        Reads inside the block run immediately and do not see the queued writes.
+        If the block raises, nothing is sent.
+        """
+        if getattr(self.local, "batch", None) is not None:
+            # Nested batches join the outer unit of work.
+            yield self.local.batch
+            return
+        batch = TraskerBatch()
+        self.local.batch = batch
+        try:
+            yield batch
+        finally:
+            self.local.batch = None
+        if batch.statements:
+            with self.connection() as conn:
+                with conn.cursor() as cursor:
+                    batch.flush(cursor)
+            # Mutators invalidated the cache before their writes were sent; drop anything reloaded meanwhile.
+            self.cache.invalidate()
+
     def db_execute(self, query, params=(), fetch=False, fetch_one=False):
         query = query.strip()
-        try:
-            with self.conn.cursor() as cursor:
-                cursor.execute(query, params)
-                if fetch_one:
-                    result = cursor.fetchone()
-                elif fetch:
-                    result = cursor.fetchall()
-                else:
-                    result = None
-                self.conn.commit()
+        batch = getattr(self.local, "batch", None)
+        if batch is not None and not fetch and not fetch_one:
+            batch.queue(query, params)
+            return None
+        attempt = 0
+        while True:
+            conn = None
+            sent = False
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        sent = True
+                        cursor.execute(query, params)
+                        if fetch_one:
+                            result = cursor.fetchone()
+                        elif fetch:
+                            result = cursor.fetchall()
+                        else:
+                            result = None
                 return result
-        except Exception as e:
-            # Optionally handle reconnection logic here if needed.
-            self.conn.rollback()
-            raise e
+            except OperationalError as e:
+                # Retry on a fresh connection only when the old one broke, and only if that can't apply a
+                # write twice: the query never reached the server, or it only reads. Cancellations and
+                # deadlocks (also OperationalErrors) leave the connection open and are raised as they are.
+                broken = conn is None or bool(conn.closed)
+                if not broken or (sent and not READ_QUERY.match(query)) or attempt >= self.retries:
+                    raise e
+                attempt += 1
+                print(Fore.YELLOW + f"[DB] Connection lost ({e}). Reconnecting..." + Style.RESET_ALL)
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        self.listener.stop()
+        if self.pool and not self.pool.closed:
+            self.pool.closeall()
+
+    # ---------------- CHANGE NOTIFICATIONS ----------------
+
+    def subscribe(self, callback, tables=None):
+        """
+        Call callback(change) from the listener thread whenever another session (or this one) changes a row
+        in tasks, bugs, notes, documents, sprints or task_sessions. See ChangeListener for the payload.
+        The listener starts with the first subscription. Returns a token for unsubscribe().
+        """
+        if not self.listening:
+            self.listening = True
+            # Writes from other clients also make cached reference data and dashboard counts stale.
+            self.listener.subscribe(self.invalidate_on_change)
+        return self.listener.subscribe(callback, tables)
+
+    def unsubscribe(self, token):
+        self.listener.unsubscribe(token)
+
+    def invalidate_on_change(self, change):
+        if change["op"] == "resync":
+            self.cache.invalidate()
+        elif change["table"] == "sprints":
+            self.cache.invalidate("sprints", "dashboard")
+        elif change["table"] == "tasks":
+            self.cache.invalidate("dashboard")
+
+    # ---------------- REFERENCE DATA (cached) ----------------
+
+    def cached_users(self):
+        """{user_id: (id, username, full_name, email)} for every user."""
+        return self.cache.get(("users",), lambda: {row[0]: row for row in self.get_all_users()})
+
+    def cached_teams(self):
+        """{team_id: (id, name, description)} for every team."""
+        return self.cache.get(("teams",), lambda: {row[0]: row for row in self.get_all_teams()})
+
+    def cached_memberships(self):
+        """Every (user_id, team_id) pair from user_team."""
+        query = "SELECT user_id, team_id FROM user_team ORDER BY team_id, user_id"
+        return self.cache.get(("memberships",), lambda: self.db_execute(query, fetch=True))
 
     # ---------------- TEAM MANAGEMENT ----------------
 
+    def teams_for_user(self, user_id):
+        """[(team_id, team_name)] for the teams the user belongs to."""
+        teams = self.cached_teams()
+        return [(team_id, teams[team_id][1]) for member_id, team_id in self.cached_memberships()
+                if member_id == user_id and team_id in teams]
+
+    def team_members(self, team_ids):
+        """[(user_id, username)] for members of the given team id(s), each user listed once."""
+        if not isinstance(team_ids, (list, tuple, set)):
+            team_ids = [team_ids]
+        users = self.cached_users()
+        members = {}
+        for user_id, team_id in self.cached_memberships():
+            if team_id in team_ids and user_id in users:
+                members.setdefault(user_id, users[user_id][1])
+        return list(members.items())
+
     def get_team_name(self, team_id):
         """Returns the team name for the given team_id."""
-        query = "SELECT name FROM teams WHERE id = %s"
-        result = self.db_execute(query, (team_id,), fetch_one=True)
-        return result[0] if result else "Unknown"
+        team = self.cached_teams().get(team_id)
+        return team[1] if team else "Unknown"
 
     # ---------------- USER MANAGEMENT ----------------
 
@@ -158,21 +538,19 @@ class Trasker:
 
     def get_username(self, user_id):
         """Given a user ID, return the username."""
-        query = "SELECT username FROM users WHERE id = %s LIMIT 1"
-        result = self.db_execute(query, (user_id,), fetch_one=True)
-        return result[0] if result else "Unknown"
+        user = self.cached_users().get(user_id)
+        return user[1] if user else "Unknown"
 
     def get_user_id_from_username(self, username):
         """Given a username, return the user ID."""
-        query = "SELECT id FROM users WHERE username = %s LIMIT 1"
-        result = self.db_execute(query, (username,), fetch_one=True)
-        return result[0] if result else "Unknown"
+        for user in self.cached_users().values():
+            if user[1] == username:
+                return user[0]
+        return "Unknown"
 
     def get_user_teams(self, user_id):
         """Retrieve all team IDs associated with the given user."""
-        query = "SELECT team_id FROM user_team WHERE user_id = %s"
-        result = self.db_execute(query, (user_id,), fetch=True)
-        return [row[0] for row in result] if result else []
+        return [team_id for member_id, team_id in self.cached_memberships() if member_id == user_id]
 
     # ---------------- TASK MANAGEMENT ----------------
 
@@ -191,24 +569,35 @@ class Trasker:
               (title, description, due_date, status, category, priority, recurrence, parent_task_id, sprint_id, user_id, team_id)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
-        self.db_execute(query, (title, description, due_date, status, category, priority,
+        self.db_execute(query, (title, description, blank_to_none(due_date), status, category, priority,
                                   recurrence, parent_task_id, sprint_id, user_id, team_id))
+        self.cache.invalidate("dashboard")
 
     def delete_task(self, task_id):
         query = "DELETE FROM tasks WHERE id = %s"
         self.db_execute(query, (task_id,))
+        self.cache.invalidate("dashboard")
 
     def task_mark_completed(self, task_id):
         query = "UPDATE tasks SET status = 'Completed' WHERE id = %s"
         self.db_execute(query, (task_id,))
+        self.cache.invalidate("dashboard")
 
     def task_mark_archived(self, task_id):
         query = "UPDATE tasks SET status = 'Archived' WHERE id = %s"
         self.db_execute(query, (task_id,))
+        self.cache.invalidate("dashboard")
 
     def task_change_status(self, task_id, status):
         query = "UPDATE tasks SET status = %s WHERE id = %s"
         self.db_execute(query, (status, task_id))
+        self.cache.invalidate("dashboard")
+
+    def tasks_change_status(self, task_ids, status):
+        """Change the status of many tasks in one round trip and one commit."""
+        with self.batch():
+            for task_id in task_ids:
+                self.task_change_status(task_id, status)
 
     def task_change_title(self, task_id, title):
         query = "UPDATE tasks SET title = %s WHERE id = %s"
@@ -229,24 +618,39 @@ class Trasker:
     # ---------------- TASK SESSION TRACKING ----------------
 
     def start_task_timer(self, task_id):
-        query = "INSERT INTO task_sessions (task_id, start_time) VALUES (%s, CURRENT_TIMESTAMP)"
-        self.db_execute(query, (task_id,))
+        user_id = self.current_user[0] if self.current_user else None
+        query = "INSERT INTO task_sessions (task_id, user_id, start_time) VALUES (%s, %s, CURRENT_TIMESTAMP)"
+        self.db_execute(query, (task_id, user_id))
 
     def stop_task_timer(self, task_id):
-        query = "SELECT id, start_time FROM task_sessions WHERE task_id = %s AND end_time IS NULL"
-        session = self.db_execute(query, (task_id,), fetch_one=True)
-        if session:
-            session_id, start_time = session
-            update_query = """
-                UPDATE task_sessions 
-                SET end_time = CURRENT_TIMESTAMP, 
-                    elapsed_time = EXTRACT(EPOCH FROM CURRENT_TIMESTAMP) - EXTRACT(EPOCH FROM start_time::timestamp)
-                WHERE id = %s
-            """
-            self.db_execute(update_query, (session_id,))
+        """
+        Close the task's open sessions and add their time to task_time_rollups in one statement.
+        Returns the number of seconds that were just recorded.
+        """
+        query = """
+            WITH stopped AS (
+                UPDATE task_sessions
+                SET end_time = CURRENT_TIMESTAMP,
+                    elapsed_time = EXTRACT(EPOCH FROM CURRENT_TIMESTAMP - start_time)
+                WHERE task_id = %s AND end_time IS NULL
+                RETURNING task_id, user_id, start_time, elapsed_time
+            ), rolled_up AS (
+                INSERT INTO task_time_rollups AS r (task_id, user_id, day, elapsed_time, session_count)
+                SELECT task_id, COALESCE(user_id, 0), start_time::date, SUM(elapsed_time), COUNT(*)
+                FROM stopped
+                GROUP BY task_id, COALESCE(user_id, 0), start_time::date
+                ON CONFLICT (task_id, user_id, day) DO UPDATE
+                SET elapsed_time = r.elapsed_time + EXCLUDED.elapsed_time,
+                    session_count = r.session_count + EXCLUDED.session_count
+            )
+            SELECT COALESCE(SUM(elapsed_time), 0) FROM stopped
+        """
+        result = self.db_execute(query, (task_id,), fetch_one=True)
+        return result[0] if result else 0
 
     def get_total_task_time(self, task_id):
-        query = "SELECT SUM(elapsed_time) FROM task_sessions WHERE task_id = %s"
+        """Total tracked seconds for a task, read from the precomputed rollups."""
+        query = "SELECT SUM(elapsed_time) FROM task_time_rollups WHERE task_id = %s"
         result = self.db_execute(query, (task_id,), fetch_one=True)
         return result[0] if result and result[0] is not None else 0
 
@@ -255,11 +659,53 @@ class Trasker:
         session = self.db_execute(query, (task_id,), fetch_one=True)
         return session is not None
 
-    def list_all_tasks(self):
+    def task_time_summary(self, task_ids):
         """
-        List all tasks visible to the current user: tasks owned by the user or shared in the active team.
+        Return {task_id: (timer_running, total_elapsed_seconds)} for many tasks in one query.
+        Totals come from task_time_rollups; tasks without any sessions map to (False, 0).
         """
+        task_ids = [int(task_id) for task_id in task_ids]
+        summary = {task_id: (False, 0) for task_id in task_ids}
+        if not task_ids:
+            return summary
         query = """
+            SELECT ids.task_id,
+                   EXISTS (SELECT 1 FROM task_sessions s WHERE s.task_id = ids.task_id AND s.end_time IS NULL),
+                   COALESCE((SELECT SUM(r.elapsed_time) FROM task_time_rollups r WHERE r.task_id = ids.task_id), 0)
+            FROM unnest(%s::integer[]) AS ids(task_id)
+        """
+        for task_id, running, total in self.db_execute(query, (task_ids,), fetch=True):
+            summary[task_id] = (running, total)
+        return summary
+
+    def get_timesheet(self, start_date, end_date, user_id=None):
+        """
+        Tracked time per task, user and day between two dates (inclusive), read from task_time_rollups.
+        Returns tuples (day, task_id, task_title, username, elapsed_seconds, session_count).
+        """
+        query = """
+            SELECT r.day, r.task_id, t.title, u.username, r.elapsed_time, r.session_count
+            FROM task_time_rollups r
+            JOIN tasks t ON r.task_id = t.id
+            LEFT JOIN users u ON r.user_id = u.id
+            WHERE r.day BETWEEN %s AND %s
+              AND (t.user_id = %s OR t.team_id = %s)
+        """
+        params = [start_date, end_date, self.current_user[0], self.current_team]
+        if user_id is not None:
+            query += " AND r.user_id = %s"
+            params.append(user_id)
+        query += " ORDER BY r.day, t.title"
+        return self.db_execute(query, params, fetch=True)
+
+    def list_all_tasks(self, after=None, limit=None):
+        """
+        List all tasks visible to the current user: tasks owned by the user or shared in the active team.
+        Ordered by (due_date, id). Pass limit for one page and after=(due_date, id) of the previous
+        page's last row to continue; see pages().
+        """
+        condition, order_by, page_params = keyset(TASK_PAGE_KEY, after, limit)
+        query = f"""
             SELECT t.id, t.title, t.description, t.due_date, t.status, t.category, t.priority, t.recurrence,
                    t.parent_task_id, t.sprint_id,
                    u.username,
@@ -267,9 +713,169 @@ class Trasker:
             FROM tasks t
             LEFT JOIN users u ON t.user_id = u.id
             LEFT JOIN teams tm ON t.team_id = tm.id
-            WHERE t.user_id = %s OR t.team_id = %s
+            WHERE (t.user_id = %s OR t.team_id = %s) AND {condition}
+            {order_by}
+        """
+        return self.db_execute(query, [self.current_user[0], self.current_team] + page_params, fetch=True)
+
+    def pages(self, list_method, *args, page_size=None, **kwargs):
         """
-        return self.db_execute(query, (self.current_user[0], self.current_team), fetch=True)
+        Lazily yield successive pages (lists of rows) from one of the paginated list_* methods,
+        e.g. pages(trasker.list_notes, "task", 3). Each page is fetched only when the previous one is consumed.
+        """
+        page_size = page_size or PAGE_SIZE
+        cursor = PAGE_CURSORS.get(list_method.__name__, lambda row: row[0])
+        after = None
+        while True:
+            page = list_method(*args, after=after, limit=page_size, **kwargs)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after = cursor(page[-1])
+
+    def query_tasks(self, filters=None, order=None, limit=None, offset=None):
+        """
+        List tasks visible to the current user, filtered and ordered on the server.
+        Returns the same tuples as list_all_tasks().
+
+        filters: dict with any of
+          - id, epic_id, sprint_id, status, priority, category, user_id, team_id, parent_task_id:
+            a single value, or a list/tuple to match any of them.
+          - due_from, due_to: "YYYY-MM-DD" bounds (inclusive) on the due date.
+          - keyword: case-insensitive match on title or description.
+        order: list of column names from TASK_ORDER_COLUMNS; prefix with "-" for descending.
+        """
+        clauses, params = self.task_filter_clauses(filters)
+
+        order_by = []
+        for name in order or ["due_date", "priority", "id"]:
+            direction = "DESC" if name.startswith("-") else "ASC"
+            column = TASK_ORDER_COLUMNS.get(name.lstrip("-"))
+            if column is None:
+                raise ValueError(f"Cannot order tasks by {name!r}")
+            order_by.append(f"{column} {direction}")
+
+        query = f"""
+            SELECT t.id, t.title, t.description, t.due_date, t.status, t.category, t.priority, t.recurrence,
+                   t.parent_task_id, t.sprint_id,
+                   u.username,
+                   tm.name as team_name
+            FROM tasks t
+            LEFT JOIN users u ON t.user_id = u.id
+            LEFT JOIN teams tm ON t.team_id = tm.id
+            WHERE {" AND ".join(clauses)}
+            ORDER BY {", ".join(order_by)}
+        """
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        if offset:
+            query += " OFFSET %s"
+            params.append(offset)
+        return self.db_execute(query, params, fetch=True)
+
+    def list_matching_tasks(self, filters=None, after=None, limit=None):
+        """
+        query_tasks() for paging: the tasks matching filters, ordered by (due_date, id) like
+        list_all_tasks(). Pass limit for one page and after=(due_date, id) of the previous page's
+        last row to continue; see pages(). Unlike OFFSET paging, tasks added or removed while
+        paging don't shift the following pages, and a deep page costs the same as the first.
+        """
+        clauses, params = self.task_filter_clauses(filters)
+        condition, order_by, page_params = keyset(TASK_PAGE_KEY, after, limit)
+        query = f"""
+            SELECT t.id, t.title, t.description, t.due_date, t.status, t.category, t.priority, t.recurrence,
+                   t.parent_task_id, t.sprint_id,
+                   u.username,
+                   tm.name as team_name
+            FROM tasks t
+            LEFT JOIN users u ON t.user_id = u.id
+            LEFT JOIN teams tm ON t.team_id = tm.id
+            WHERE {" AND ".join(clauses)} AND {condition}
+            {order_by}
+        """
+        return self.db_execute(query, params + page_params, fetch=True)
+
+    def task_filter_clauses(self, filters):
+        """The WHERE clauses and their params for a query_tasks() filter dict, visibility included."""
+        filters = filters or {}
+        clauses = ["(t.user_id = %s OR t.team_id = %s)"]
+        params = [self.current_user[0], self.current_team]
+
+        for key, column in TASK_FILTER_COLUMNS.items():
+            value = filters.get(key)
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                clauses.append(f"{column} = ANY(%s)")
+                params.append(list(value))
+            else:
+                clauses.append(f"{column} = %s")
+                params.append(value)
+
+        if filters.get("epic_id") is not None:
+            epic_ids = filters["epic_id"]
+            if not isinstance(epic_ids, (list, tuple, set)):
+                epic_ids = [epic_ids]
+            clauses.append("t.sprint_id IN (SELECT s.id FROM sprints s WHERE s.epic_id = ANY(%s))")
+            params.append(list(epic_ids))
+        if filters.get("due_from"):
+            clauses.append(f"{TASK_DUE_DATE} >= %s::date")
+            params.append(filters["due_from"])
+        if filters.get("due_to"):
+            clauses.append(f"{TASK_DUE_DATE} <= %s::date")
+            params.append(filters["due_to"])
+        if filters.get("keyword"):
+            clauses.append("(t.title ILIKE %s OR t.description ILIKE %s)")
+            params.extend([f"%{filters['keyword']}%"] * 2)
+        return clauses, params
+
+    def dashboard_stats(self, team_id=None):
+        """
+        Task counts by status for the dashboard, aggregated in SQL, for the tasks visible to the current
+        user (and only team_id's tasks when given). Returns a dict with
+          - "overall": {status: count} over all those tasks.
+          - "last_sprint": (sprint_id, title), the visible sprint that started last, or None.
+          - "last_sprint_counts": {status: count} for its tasks, or the overall counts if there is no sprint.
+        Results are cached for DASHBOARD_CACHE_TTL seconds; task status changes made here invalidate them.
+        """
+        key = ("dashboard", self.current_user[0], self.current_team, team_id)
+        return self.cache.get(key, lambda: self.load_dashboard_stats(team_id), ttl=DASHBOARD_CACHE_TTL)
+
+    def load_dashboard_stats(self, team_id):
+        visible = [self.current_user[0], self.current_team]
+        sprint_query = """
+            SELECT s.id, s.title FROM sprints s
+            WHERE s.user_id = %s OR s.team_id = %s
+            ORDER BY s.start_date DESC NULLS LAST, s.id DESC
+            LIMIT 1
+        """
+        team_clause = "AND t.team_id = %s" if team_id is not None else ""
+        count_query = f"""
+            SELECT t.sprint_id = %s AS in_last_sprint, t.status, COUNT(*)
+            FROM tasks t
+            WHERE (t.user_id = %s OR t.team_id = %s) {team_clause}
+            GROUP BY 1, 2
+        """
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(sprint_query, visible)
+                last_sprint = cursor.fetchone()
+                params = [last_sprint[0] if last_sprint else None] + visible
+                cursor.execute(count_query, params + [team_id] if team_id is not None else params)
+                rows = cursor.fetchall()
+
+        overall, sprint_counts = {}, {}
+        for in_last_sprint, status, count in rows:
+            overall[status] = overall.get(status, 0) + count
+            if in_last_sprint:
+                sprint_counts[status] = sprint_counts.get(status, 0) + count
+        return {
+            "overall": overall,
+            "last_sprint": tuple(last_sprint) if last_sprint else None,
+            "last_sprint_counts": sprint_counts if last_sprint else dict(overall),
+        }
 
     def list_tasks(self):
         """
@@ -383,19 +989,23 @@ class Trasker:
               (title, description, status, created_date, resolved_date, task_id, user_id, team_id)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
-        self.db_execute(query, (title, description, status, created_date, resolved_date, task_id, user_id, team_id))
+        self.db_execute(query, (title, description, status, blank_to_none(created_date), blank_to_none(resolved_date),
+                                task_id, user_id, team_id))
 
-    def list_all_bugs(self):
-        query = """
+    def list_all_bugs(self, after=None, limit=None):
+        """List bugs visible to the current user, ordered by id. Paginate with after=<last id> and limit."""
+        condition, order_by, page_params = keyset(BUG_PAGE_KEY, after, limit)
+        query = f"""
             SELECT b.id, b.title, b.description, b.status, b.created_date, b.resolved_date, b.task_id,
                    u.username,
                    tm.name as team_name
             FROM bugs b
             LEFT JOIN users u ON b.user_id = u.id
             LEFT JOIN teams tm ON b.team_id = tm.id
-            WHERE b.user_id = %s OR b.team_id = %s
+            WHERE (b.user_id = %s OR b.team_id = %s) AND {condition}
+            {order_by}
         """
-        return self.db_execute(query, (self.current_user[0], self.current_team), fetch=True)
+        return self.db_execute(query, [self.current_user[0], self.current_team] + page_params, fetch=True)
 
     def list_bugs_by_task(self, task_id):
         query = "SELECT * FROM bugs WHERE task_id = %s AND (user_id = %s OR team_id = %s)"
@@ -431,7 +1041,8 @@ class Trasker:
                 task_id = %s
             WHERE id = %s
         """
-        return self.db_execute(query, (title, description, status, created_date, resolved_date, task_id, bug_id))
+        return self.db_execute(query, (title, description, status, blank_to_none(created_date),
+                                       blank_to_none(resolved_date), task_id, bug_id))
 
     def delete_bug(self, bug_id):
         """Deletes the bug with the provided id."""
@@ -451,20 +1062,20 @@ class Trasker:
         query = "INSERT INTO notes (note, note_type, reference_id, user_id, team_id) VALUES (%s, %s, %s, %s, %s)"
         self.db_execute(query, (note, note_type, reference_id, user_id, team_id))
 
-    def list_notes(self, note_type=None, reference_id=None):
-        if note_type and reference_id:
-            query = "SELECT * FROM notes WHERE note_type = %s AND reference_id = %s AND (user_id = %s OR team_id = %s)"
-            return self.db_execute(query, (note_type, reference_id, self.current_user[0], self.current_team),
-                                   fetch=True)
-        elif note_type:
-            query = "SELECT * FROM notes WHERE note_type = %s AND (user_id = %s OR team_id = %s)"
-            return self.db_execute(query, (note_type, self.current_user[0], self.current_team), fetch=True)
-        elif reference_id:
-            query = "SELECT * FROM notes WHERE reference_id = %s AND (user_id = %s OR team_id = %s)"
-            return self.db_execute(query, (reference_id, self.current_user[0], self.current_team), fetch=True)
-        else:
-            query = "SELECT * FROM notes WHERE (user_id = %s OR team_id = %s)"
-            return self.db_execute(query, (self.current_user[0], self.current_team), fetch=True)
+    def list_notes(self, note_type=None, reference_id=None, after=None, limit=None):
+        """List notes visible to the current user, ordered by id. Paginate with after=<last id> and limit."""
+        clauses = ["(user_id = %s OR team_id = %s)"]
+        params = [self.current_user[0], self.current_team]
+        if note_type:
+            clauses.append("note_type = %s")
+            params.append(note_type)
+        if reference_id:
+            clauses.append("reference_id = %s")
+            params.append(reference_id)
+        condition, order_by, page_params = keyset(NOTE_PAGE_KEY, after, limit)
+        clauses.append(condition)
+        query = f"SELECT * FROM notes WHERE {' AND '.join(clauses)} {order_by}"
+        return self.db_execute(query, params + page_params, fetch=True)
 
     def update_note(self, note_id, note):
         query = "UPDATE notes SET note = %s, updated_date = CURRENT_TIMESTAMP WHERE id = %s"
@@ -484,31 +1095,75 @@ class Trasker:
 
     # ---------------- DOCUMENTS MANAGEMENT ----------------
 
-    def add_document(self, note_id, filename, mimetype, document_blob):
-        user_id = self.current_user[0] if self.current_user else None
-        team_id = self.current_team
-        query = "INSERT INTO documents (note_id, filename, mimetype, document_blob, user_id, team_id) VALUES (%s, %s, %s, %s, %s, %s)"
-        self.db_execute(query, (note_id, filename, mimetype, document_blob, user_id, team_id))
+    def store_document_blob(self, cursor, content):
+        """
+        Make sure content is in the blob store and return its hash. Bytes already stored under the same
+        SHA-256 are not sent again. The FOR SHARE lock keeps a concurrent delete from dropping the blob
+        before the caller's document_versions row references it.
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        cursor.execute("SELECT 1 FROM document_blobs WHERE content_hash = %s FOR SHARE", (content_hash,))
+        if cursor.fetchone() is None:
+            cursor.execute("""
+                INSERT INTO document_blobs (content_hash, content, size) VALUES (%s, %s, %s)
+                ON CONFLICT (content_hash) DO NOTHING
+            """, (content_hash, content, len(content)))
+        return content_hash
+
+    def add_document(self, note_id, filename, mimetype, document_blob, user_id=None, team_id=None):
+        """
+        Add a document as version 1. The content goes to the deduplicated blob store; the documents
+        row only holds its hash and metadata.
+        If user_id or team_id are not provided, assign the document to the current user and active team.
+        Returns the new document id.
+        """
+        if user_id is None and self.current_user:
+            user_id = self.current_user[0]
+        if team_id is None:
+            team_id = self.current_team
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                content_hash = self.store_document_blob(cursor, document_blob)
+                cursor.execute("""
+                    INSERT INTO documents (note_id, filename, mimetype, content_hash, size, version, user_id, team_id)
+                    VALUES (%s, %s, %s, %s, %s, 1, %s, %s)
+                    RETURNING id
+                """, (note_id, filename, mimetype, content_hash, len(document_blob), user_id, team_id))
+                document_id = cursor.fetchone()[0]
+                cursor.execute("""
+                    INSERT INTO document_versions (document_id, version, content_hash, filename, mimetype, size, user_id)
+                    VALUES (%s, 1, %s, %s, %s, %s, %s)
+                """, (document_id, content_hash, filename, mimetype, len(document_blob), user_id))
+        return document_id
 
     def delete_document(self, document_id):
+        """Delete a document; triggers release its versions' blobs once nothing else references them."""
         query = "DELETE FROM documents WHERE id = %s"
         self.db_execute(query, (document_id,))
 
-    def list_all_documents(self):
-        query = """
+    def list_all_documents(self, after=None, limit=None):
+        """List documents (without their blobs) visible to the current user, ordered by id."""
+        condition, order_by, page_params = keyset(DOCUMENT_PAGE_KEY, after, limit)
+        query = f"""
             SELECT d.id, d.note_id, d.filename, d.mimetype, d.upload_date,
                    u.username,
                    tm.name as team_name
             FROM documents d
             LEFT JOIN users u ON d.user_id = u.id
             LEFT JOIN teams tm ON d.team_id = tm.id
-            WHERE d.user_id = %s OR d.team_id = %s
+            WHERE (d.user_id = %s OR d.team_id = %s) AND {condition}
+            {order_by}
         """
-        return self.db_execute(query, (self.current_user[0], self.current_team), fetch=True)
+        return self.db_execute(query, [self.current_user[0], self.current_team] + page_params, fetch=True)
 
     def get_document(self, document_id):
+        """
+        Document metadata without its content:
+        (id, note_id, filename, mimetype, size in bytes, upload_date, username, team_name).
+        Read the content with open_document_stream().
+        """
         query = """
-            SELECT d.id, d.note_id, d.filename, d.mimetype, d.document_blob, d.upload_date,
+            SELECT d.id, d.note_id, d.filename, d.mimetype, d.size, d.upload_date,
                    u.username,
                    tm.name as team_name
             FROM documents d
@@ -518,9 +1173,90 @@ class Trasker:
         """
         return self.db_execute(query, (document_id, self.current_user[0], self.current_team), fetch_one=True)
 
-    def update_document(self, document_id, new_blob):
-        query = "UPDATE documents SET document_blob = %s, upload_date = CURRENT_TIMESTAMP WHERE id = %s"
-        self.db_execute(query, (new_blob, document_id))
+    def list_document_versions(self, document_id):
+        """Version history, newest first: (version, filename, mimetype, size, content_hash, uploaded_at, username)."""
+        query = """
+            SELECT v.version, v.filename, v.mimetype, v.size, v.content_hash, v.uploaded_at, u.username
+            FROM document_versions v
+            JOIN documents d ON d.id = v.document_id
+            LEFT JOIN users u ON v.user_id = u.id
+            WHERE v.document_id = %s AND (d.user_id = %s OR d.team_id = %s)
+            ORDER BY v.version DESC
+        """
+        return self.db_execute(query, (document_id, self.current_user[0], self.current_team), fetch=True)
+
+    def open_document_stream(self, document_id, chunk_size=None, version=None):
+        """
+        Return an iterator over the document's content (the current version unless one is given) in
+        chunk_size byte slices, or None if the document is not visible to the current user.
+        Each slice is fetched with substring() when the previous one has been consumed, so memory use
+        is bounded by chunk_size whatever the file size.
+        """
+        query = """
+            SELECT v.content_hash, v.size
+            FROM documents d
+            JOIN document_versions v ON v.document_id = d.id AND v.version = COALESCE(%s, d.version)
+            WHERE d.id = %s AND (d.user_id = %s OR d.team_id = %s)
+        """
+        row = self.db_execute(query, (version, document_id, self.current_user[0], self.current_team), fetch_one=True)
+        if row is None:
+            return None
+        return self.document_chunks(row[0], row[1] or 0, chunk_size or DOCUMENT_CHUNK_SIZE)
+
+    def document_chunks(self, content_hash, size, chunk_size):
+        # Blobs are immutable, so reading by hash stays consistent even if a new version is uploaded meanwhile.
+        query = "SELECT substring(content FROM %s FOR %s) FROM document_blobs WHERE content_hash = %s"
+        for offset in range(0, size, chunk_size):
+            row = self.db_execute(query, (offset + 1, chunk_size, content_hash), fetch_one=True)
+            if row is None or row[0] is None:
+                return
+            yield bytes(row[0])
+
+    def read_document(self, document_id, limit=None, version=None):
+        """Return the document's content as bytes (at most limit bytes when given), or None if not visible."""
+        stream = self.open_document_stream(document_id, chunk_size=limit, version=version)
+        if stream is None:
+            return None
+        content = bytearray()
+        for chunk in stream:
+            content.extend(chunk)
+            if limit is not None and len(content) >= limit:
+                break
+        return bytes(content[:limit] if limit is not None else content)
+
+    def update_document(self, document_id, new_blob, filename=None, mimetype=None):
+        """
+        Upload a new version of a document. Filename and mimetype carry over unless given.
+        Re-uploading identical content with the same metadata does not create a version.
+        Returns the current version number.
+        """
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT version, content_hash, filename, mimetype FROM documents WHERE id = %s FOR UPDATE
+                """, (document_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                version, current_hash, current_filename, current_mimetype = row
+                filename = filename or current_filename
+                mimetype = mimetype or current_mimetype
+                content_hash = self.store_document_blob(cursor, new_blob)
+                if (content_hash, filename, mimetype) == (current_hash, current_filename, current_mimetype):
+                    return version
+                version += 1
+                user_id = self.current_user[0] if self.current_user else None
+                cursor.execute("""
+                    INSERT INTO document_versions (document_id, version, content_hash, filename, mimetype, size, user_id)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, (document_id, version, content_hash, filename, mimetype, len(new_blob), user_id))
+                cursor.execute("""
+                    UPDATE documents
+                    SET content_hash = %s, size = %s, filename = %s, mimetype = %s, version = %s,
+                        upload_date = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (content_hash, len(new_blob), filename, mimetype, version, document_id))
+        return version
 
     # ---------------- SPRINT MANAGEMENT ----------------
 
@@ -529,17 +1265,29 @@ class Trasker:
             INSERT INTO epics (name, description, start_date, end_date, user_id, team_id)
             VALUES (%s, %s, %s, %s, %s, %s)
         """
-        self.db_execute(query, (name, description, start_date, end_date, user_id, team_id))
+        self.db_execute(query, (name, description, blank_to_none(start_date), blank_to_none(end_date), user_id, team_id))
+        self.cache.invalidate("epics")
 
-    def list_epics(self):
-        query = """
+    def list_epics(self, after=None, limit=None):
+        """
+        List epics visible to the current user, ordered by id. Paginate with after=<last id> and limit.
+        The unpaginated list (used by every epic dropdown) is served from the reference cache.
+        """
+        if after is None and limit is None:
+            return self.cache.get(("epics", self.current_user[0], self.current_team),
+                                  lambda: self.list_epics(limit=EVERY_ROW))
+        if limit == EVERY_ROW:
+            limit = None
+        condition, order_by, page_params = keyset(EPIC_PAGE_KEY, after, limit)
+        query = f"""
             SELECT e.id, e.name, e.description, e.start_date, e.end_date, u.username, tm.name as team_name 
             FROM epics e 
             LEFT JOIN users u ON e.user_id = u.id 
             LEFT JOIN teams tm ON e.team_id = tm.id
-            WHERE e.user_id = %s OR e.team_id = %s
+            WHERE (e.user_id = %s OR e.team_id = %s) AND {condition}
+            {order_by}
         """
-        return self.db_execute(query, (self.current_user[0], self.current_team), fetch=True)
+        return self.db_execute(query, [self.current_user[0], self.current_team] + page_params, fetch=True)
 
     def list_epic_by_id(self, epic_id):
         query = "SELECT * FROM epics WHERE id = %s"
@@ -547,7 +1295,10 @@ class Trasker:
 
     def delete_epic(self, epic_id):
         query = "DELETE FROM epics WHERE id = %s"
-        return self.db_execute(query, (epic_id,))
+        result = self.db_execute(query, (epic_id,))
+        # Sprints of the epic have their epic_id cleared by the foreign key.
+        self.cache.invalidate("epics", "sprints")
+        return result
 
     def list_epic_sprints(self, epic_id):
         query = """
@@ -563,17 +1314,30 @@ class Trasker:
         user_id = self.current_user[0] if self.current_user else None
         team_id = self.current_team
         query = "INSERT INTO sprints (title, description, start_date, end_date, epic_id, user_id, team_id) VALUES (%s, %s, %s, %s, %s, %s, %s)"
-        self.db_execute(query, (title, description, start_date, end_date, epic_id, user_id, team_id))
+        self.db_execute(query, (title, description, blank_to_none(start_date), blank_to_none(end_date), epic_id,
+                                user_id, team_id))
+        self.cache.invalidate("sprints")
 
-    def list_sprints(self):
-        query = """
+    def list_sprints(self, after=None, limit=None):
+        """
+        List sprints visible to the current user, ordered by id. Paginate with after=<last id> and limit.
+        The unpaginated list (used by every sprint dropdown) is served from the reference cache.
+        """
+        if after is None and limit is None:
+            return self.cache.get(("sprints", self.current_user[0], self.current_team),
+                                  lambda: self.list_sprints(limit=EVERY_ROW))
+        if limit == EVERY_ROW:
+            limit = None
+        condition, order_by, page_params = keyset(SPRINT_PAGE_KEY, after, limit)
+        query = f"""
             SELECT s.id, s.title, s.description, s.start_date, s.end_date, s.epic_id, u.username, tm.name as team_name 
             FROM sprints s 
             LEFT JOIN users u ON s.user_id = u.id 
             LEFT JOIN teams tm ON s.team_id = tm.id
-            WHERE s.user_id = %s OR s.team_id = %s
+            WHERE (s.user_id = %s OR s.team_id = %s) AND {condition}
+            {order_by}
         """
-        return self.db_execute(query, (self.current_user[0], self.current_team), fetch=True)
+        return self.db_execute(query, [self.current_user[0], self.current_team] + page_params, fetch=True)
 
     def list_sprint_tasks(self, sprint_id):
         query = """
@@ -632,17 +1396,6 @@ class Trasker:
         """
         return self.db_execute(query, (self.current_user[0], self.current_team, f"%{keyword}%", f"%{keyword}%"), fetch=True)
 
-    def list_all_bugs(self):
-        query = """
-            SELECT b.id, b.title, b.description, b.status, b.created_date, b.resolved_date, b.task_id,
-                   u.username,
-                   tm.name as team_name
-            FROM bugs b
-            LEFT JOIN users u ON b.user_id = u.id
-            LEFT JOIN teams tm ON b.team_id = tm.id
-            WHERE b.user_id = %s OR b.team_id = %s
-        """
-        return self.db_execute(query, (self.current_user[0], self.current_team), fetch=True)
 
     # ----------------- USER OPERATIONS -----------------
 
@@ -653,18 +1406,29 @@ class Trasker:
     def add_user(self, username, password, full_name, email):
         query = "INSERT INTO users (username, password, full_name, email) VALUES (%s, %s, %s, %s)"
         self.db_execute(query, (username, password, full_name, email))
+        self.cache.invalidate("users")
 
     def edit_user(self, user_id, new_username, new_full_name, new_email):
         query = "UPDATE users SET username = %s, full_name = %s, email = %s WHERE id = %s"
         self.db_execute(query, (new_username, new_full_name, new_email, user_id))
+        # Epic and sprint listings carry usernames and team names.
+        self.cache.invalidate("users", "epics", "sprints")
+
+    def delete_user(self, user_id):
+        query = "DELETE FROM users WHERE id = %s"
+        self.db_execute(query, (user_id,))
+        # Cascades to the user's memberships, epics and sprints.
+        self.cache.invalidate("users", "memberships", "epics", "sprints")
 
     def assign_user_to_team(self, user_id, team_id):
         query = "INSERT INTO user_team (user_id, team_id) VALUES (%s, %s)"
         self.db_execute(query, (user_id, team_id))
+        self.cache.invalidate("memberships")
 
     def remove_user_from_team(self, user_id, team_id):
         query = "DELETE FROM user_team WHERE user_id = %s AND team_id = %s"
         self.db_execute(query, (user_id, team_id))
+        self.cache.invalidate("memberships")
 
     # ----------------- TEAM OPERATIONS -----------------
 
@@ -675,10 +1439,19 @@ class Trasker:
     def add_team(self, name, description):
         query = "INSERT INTO teams (name, description) VALUES (%s, %s)"
         self.db_execute(query, (name, description))
+        self.cache.invalidate("teams")
 
     def edit_team(self, team_id, new_name, new_description):
         query = "UPDATE teams SET name = %s, description = %s WHERE id = %s"
         self.db_execute(query, (new_name, new_description, team_id))
+        # Epic and sprint listings carry usernames and team names.
+        self.cache.invalidate("teams", "epics", "sprints")
+
+    def delete_team(self, team_id):
+        query = "DELETE FROM teams WHERE id = %s"
+        self.db_execute(query, (team_id,))
+        # Memberships cascade; epics and sprints of the team lose their team_id.
+        self.cache.invalidate("teams", "memberships", "epics", "sprints")
 
 
 # End of Trasker class
@@ -0,0 +1,460 @@
+# trasker_app/api.py
+"""
+JSON API over the Trasker models.
+
+    GET    /api/<resource>/                list, cursor-paginated
+    POST   /api/<resource>/                create
+    GET    /api/<resource>/<id>/           detail
+    PATCH  /api/<resource>/<id>/           partial update (PUT is accepted too)
+    DELETE /api/<resource>/<id>/           delete
+
+List parameters:
+    limit=<n>         page size (default API_PAGE_SIZE, at most API_MAX_PAGE_SIZE)
+    cursor=<token>    the "next" token of the previous page
+    fields=a,b,c      only return these fields; relations that aren't asked for aren't loaded
+    any filter listed in the resource's `filters`, e.g. /api/tasks/?status=Pending&team=3
+
+Every list page costs a constant number of queries: relations are loaded with select_related /
+prefetch_related, never per row. Users only see rows of teams they belong to (or assigned to or
+created by them); superusers see everything.
+"""
+import base64
+import binascii
+import json
+
+from django import forms
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.forms import modelform_factory
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+
+from .models import Document, Issue, Note, Project, Task, Team, WorkWeek
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors
+
+
+class Field:
+    """A serialized field: how to read it from an instance, and which relations it needs loaded."""
+
+    def __init__(self, getter, select=(), prefetch=()):
+        self.getter = getter
+        self.select = select
+        self.prefetch = prefetch
+
+
+def attr(name):
+    return Field(lambda obj: getattr(obj, name))
+
+
+def related(name, label, select=None):
+    """A foreign key shown as {"id": ..., <label>: ...}, loaded with select_related."""
+    def get(obj):
+        target = getattr(obj, name)
+        return None if target is None else {"id": target.pk, label: getattr(target, label)}
+    return Field(get, select=(select or name,))
+
+
+def related_id(name):
+    """A foreign key shown as its id only; needs no join."""
+    return Field(lambda obj: getattr(obj, f"{name}_id"))
+
+
+def users(name):
+    """A many-to-many to User shown as [{"id": ..., "username": ...}], loaded with prefetch_related."""
+    return Field(lambda obj: [{"id": user.pk, "username": user.username} for user in getattr(obj, name).all()],
+                 prefetch=(name,))
+
+
+class Resource:
+    """
+    One model exposed through the API.
+
+    fields: {name: Field}, in output order.
+    filters: {query parameter: ORM lookup}; a value of "null" matches NULL. Values are parsed with
+        the form field of the model field the lookup ends at (an id for relations), see filter_field.
+    writable: model fields accepted on create and update, validated through a ModelForm.
+    """
+
+    def __init__(self, model, fields, filters, writable, scope):
+        self.model = model
+        self.fields = fields
+        self.filters = filters
+        self.filter_form = type(f"{model.__name__}Filters", (forms.Form,),
+                                {param: filter_field(model, lookup) for param, lookup in filters.items()})
+        self.form_class = modelform_factory(model, fields=writable)
+        self.scope = scope  # user -> Q of the rows that user may see
+
+    def queryset(self, user, fields=None):
+        queryset = self.model.objects.all()
+        if not user.is_superuser:
+            queryset = queryset.filter(self.scope(user))
+        if fields is None:
+            fields = self.fields.keys()
+        select = {lookup for name in fields for lookup in self.fields[name].select}
+        prefetch = {lookup for name in fields for lookup in self.fields[name].prefetch}
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        return queryset
+
+    def serialize(self, obj, fields=None):
+        return {name: self.fields[name].getter(obj) for name in (fields or self.fields)}
+
+    def selected_fields(self, request):
+        requested = request.GET.get("fields")
+        if not requested:
+            return None
+        fields = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in fields if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}")
+        return fields
+
+    def apply_filters(self, queryset, request):
+        values = {param: request.GET[param] for param in self.filters if request.GET.get(param)}
+        form = self.filter_form({param: value for param, value in values.items() if value != "null"})
+        if not form.is_valid():
+            raise ApiError("Invalid filter", errors=form.errors.get_json_data())
+        for param, value in values.items():
+            lookup = self.filters[param]
+            if value == "null":
+                queryset = queryset.filter(**{f"{lookup}__isnull": True})
+            else:
+                queryset = queryset.filter(**{lookup: form.cleaned_data[param]})
+        return queryset
+
+
+def filter_field(model, lookup):
+    """The form field that parses query-string values for an ORM lookup such as "workweek__project" or "due_date__gte"."""
+    parts = lookup.split("__")
+    if parts[-1] in ("gte", "lte"):
+        parts = parts[:-1]
+    for part in parts:
+        field = model._meta.get_field(part)
+        if field.is_relation:
+            model = field.related_model
+    if field.is_relation:
+        return forms.IntegerField(min_value=1, max_value=2 ** 63 - 1, required=False)
+    return field.formfield(required=False)
+
+
+def team_scope(user_field=None, assignees=None):
+    """Rows of the user's teams, plus rows they created (user_field) or are assigned to (assignees)."""
+    def scope(request_user):
+        q = Q(team__in=Team.objects.filter(members=request_user))
+        if user_field:
+            q |= Q(**{user_field: request_user})
+        if assignees:
+            # A subquery instead of a join keeps rows with several assignees from repeating.
+            q |= Q(pk__in=assignees.objects.filter(assignees=request_user).values("pk"))
+        return q
+    return scope
+
+
+RESOURCES = {
+    "tasks": Resource(
+        Task,
+        fields={
+            "id": attr("id"),
+            "title": attr("title"),
+            "description": attr("description"),
+            "due_date": attr("due_date"),
+            "status": attr("status"),
+            "priority": attr("priority"),
+            "recurrence": attr("recurrence"),
+            "parent_task": related_id("parent_task"),
+            "team": related("team", "name"),
+            "workweek": related("workweek", "title", select="workweek__project"),
+            "project": Field(lambda task: None if task.workweek is None or task.workweek.project is None
+                             else {"id": task.workweek.project.pk, "name": task.workweek.project.name},
+                             select=("workweek__project",)),
+            "assignees": users("assignees"),
+            "created_at": attr("created_at"),
+            "updated_at": attr("updated_at"),
+        },
+        filters={
+            "status": "status",
+            "priority": "priority",
+            "team": "team",
+            "workweek": "workweek",
+            "project": "workweek__project",
+            "parent_task": "parent_task",
+            "assignee": "assignees",
+            "due_after": "due_date__gte",
+            "due_before": "due_date__lte",
+        },
+        writable=["title", "description", "due_date", "status", "priority", "recurrence", "parent_task",
+                  "workweek", "team", "assignees"],
+        scope=team_scope(assignees=Task),
+    ),
+    "issues": Resource(
+        Issue,
+        fields={
+            "id": attr("id"),
+            "title": attr("title"),
+            "description": attr("description"),
+            "status": attr("status"),
+            "resolved_date_issue": attr("resolved_date_issue"),
+            "task": related("task", "title"),
+            "team": related("team", "name"),
+            "assignees": users("assignees"),
+            "created_at": attr("created_at"),
+            "updated_at": attr("updated_at"),
+        },
+        filters={"status": "status", "team": "team", "task": "task", "assignee": "assignees"},
+        writable=["title", "description", "status", "resolved_date_issue", "task", "team", "assignees"],
+        scope=team_scope(assignees=Issue),
+    ),
+    "workweeks": Resource(
+        WorkWeek,
+        fields={
+            "id": attr("id"),
+            "title": attr("title"),
+            "description": attr("description"),
+            "start_date": attr("start_date"),
+            "end_date": attr("end_date"),
+            "project": related("project", "name"),
+            "team": related("team", "name"),
+            "assignees": users("assignees"),
+            "created_at": attr("created_at"),
+            "updated_at": attr("updated_at"),
+        },
+        filters={"project": "project", "team": "team", "assignee": "assignees",
+                 "starts_after": "start_date__gte", "ends_before": "end_date__lte"},
+        writable=["title", "description", "start_date", "end_date", "project", "team", "assignees"],
+        scope=team_scope(assignees=WorkWeek),
+    ),
+    "projects": Resource(
+        Project,
+        fields={
+            "id": attr("id"),
+            "name": attr("name"),
+            "description": attr("description"),
+            "start_date": attr("start_date"),
+            "end_date": attr("end_date"),
+            "team": related("team", "name"),
+            "assignees": users("assignees"),
+            "created_at": attr("created_at"),
+            "updated_at": attr("updated_at"),
+        },
+        filters={"team": "team", "assignee": "assignees"},
+        writable=["name", "description", "start_date", "end_date", "team", "assignees"],
+        scope=team_scope(assignees=Project),
+    ),
+    "notes": Resource(
+        Note,
+        fields={
+            "id": attr("id"),
+            "note": attr("note"),
+            "note_type": attr("note_type"),
+            "user": related("user", "username"),
+            "team": related("team", "name"),
+            "created_at": attr("created_at"),
+            "updated_at": attr("updated_at"),
+        },
+        filters={"note_type": "note_type", "team": "team", "user": "user"},
+        writable=["note", "note_type", "team"],
+        scope=team_scope(user_field="user"),
+    ),
+    "documents": Resource(
+        Document,
+        fields={
+            "id": attr("id"),
+            "filename": attr("filename"),
+            "mimetype": attr("mimetype"),
+            "note": related_id("note"),
+            "sha256": attr("sha256"),
+            "url": Field(lambda doc: reverse("trasker_app:document_download", args=[doc.pk])),
+            "user": related("user", "username"),
+            "team": related("team", "name"),
+            "created_at": attr("created_at"),
+            "updated_at": attr("updated_at"),
+        },
+        filters={"note": "note", "team": "team", "user": "user", "mimetype": "mimetype"},
+        # The file itself is sent as multipart/form-data under "document_file".
+        writable=["note", "filename", "mimetype", "document_file", "team"],
+        scope=team_scope(user_field="user"),
+    ),
+}
+
+
+def encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        return int(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode())
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ApiError("Invalid cursor")
+
+
+def page_size(request):
+    try:
+        limit = int(request.GET.get("limit", API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+
+def request_data(request):
+    """
+    Fields sent with the request: a JSON object body, or form fields and files for multipart uploads.
+    Django only parses form bodies on POST, so files can be uploaded on create but not on update.
+    """
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            raise ApiError("Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise ApiError("Request body must be a JSON object")
+        return data, None
+    return request.POST, request.FILES
+
+
+def choices(model, user, keep=()):
+    """
+    Rows of model that user may link a row to: their teams, their teammates, or rows of a resource
+    they can see. keep adds the ids already linked, so an update doesn't fail over a link made earlier.
+    """
+    if model is Team:
+        visible = Team.objects.filter(members=user)
+    elif model is User:
+        visible = User.objects.filter(Q(pk=user.pk) | Q(team_members__members=user))
+    else:
+        visible = next(resource for resource in RESOURCES.values() if resource.model is model).queryset(user, ())
+    return model.objects.filter(Q(pk__in=visible.values("pk")) | Q(pk__in=keep))
+
+
+def limit_choices(form, user, current=None):
+    """Restrict the relation fields of form to what user may link to (see choices)."""
+    if user.is_superuser:
+        return
+    for name, field in form.fields.items():
+        if isinstance(field, forms.ModelChoiceField):  # Includes ModelMultipleChoiceField.
+            keep = (current or {}).get(name)
+            keep = [] if keep is None else keep if isinstance(keep, list) else [keep]
+            field.queryset = choices(field.queryset.model, user, keep)
+
+
+def save(resource, request, instance=None):
+    """
+    Validate the request against the resource's ModelForm and save it. Missing fields keep their values.
+    Links to rows the user can't see fail validation, and a row the user couldn't see once saved
+    (e.g. created with no team) is refused with 403 and not saved.
+    """
+    data, files = request_data(request)
+    current = None
+    if instance is not None:
+        current = model_to_dict(instance, fields=resource.form_class._meta.fields)
+        if "assignees" in current:
+            current["assignees"] = [user.pk for user in current["assignees"]]
+        data = {**current, **{
+            # Form data repeats a key for each value of a many-to-many field.
+            name: data[name] if files is None or name != "assignees" else data.getlist(name) for name in data
+        }}
+    else:
+        # Fields left out on create take the model's default, as they would outside the API.
+        fields = [resource.model._meta.get_field(name) for name in resource.form_class._meta.fields]
+        defaults = {field.name: field.get_default() for field in fields
+                    if field.name not in data and field.has_default()}
+        if defaults:
+            data = data.copy()
+            data.update(defaults)
+    form = resource.form_class(data, files, instance=instance)
+    limit_choices(form, request.user, current)
+    if not form.is_valid():
+        raise ApiError("Validation failed", errors=form.errors.get_json_data())
+    with transaction.atomic():
+        obj = form.save(commit=False)
+        if instance is None and hasattr(obj, "user_id") and obj.user_id is None:
+            obj.user = request.user
+        obj.save()
+        form.save_m2m()
+        if not resource.queryset(request.user, ()).filter(pk=obj.pk).exists():
+            raise ApiError("Set a team you belong to, or assign yourself, to save this", status=403)
+    return obj
+
+
+def json_view(view):
+    """Authenticate with the session and turn ApiErrors into JSON responses."""
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "Authentication required"}, status=401)
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as e:
+            body = {"error": str(e)}
+            if e.errors:
+                body["errors"] = e.errors
+            return JsonResponse(body, status=e.status)
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+def api_view(view):
+    """json_view that also looks up the resource named in the URL."""
+    @json_view
+    def wrapper(request, resource, *args, **kwargs):
+        if resource not in RESOURCES:
+            raise ApiError(f"Unknown resource {resource!r}", status=404)
+        return view(request, RESOURCES[resource], *args, **kwargs)
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+@require_http_methods(["GET", "POST"])
+@api_view
+def api_list_view(request, resource):
+    if request.method == "POST":
+        obj = save(resource, request)
+        obj = resource.queryset(request.user).get(pk=obj.pk)
+        return JsonResponse(resource.serialize(obj), status=201)
+
+    fields = resource.selected_fields(request)
+    limit = page_size(request)
+    queryset = resource.apply_filters(resource.queryset(request.user, fields), request)
+    cursor = request.GET.get("cursor")
+    if cursor:
+        queryset = queryset.filter(pk__gt=decode_cursor(cursor))
+    # One extra row tells whether there is a next page without a COUNT(*).
+    rows = list(queryset.order_by("pk")[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1].pk) if len(rows) > limit else None
+    return JsonResponse({
+        "results": [resource.serialize(obj, fields) for obj in rows[:limit]],
+        "next": next_cursor,
+    })
+
+
+@require_http_methods(["GET", "PATCH", "PUT", "DELETE"])
+@api_view
+def api_detail_view(request, resource, pk):
+    if request.method == "GET":
+        fields = resource.selected_fields(request)
+        obj = get_object_or_404(resource.queryset(request.user, fields), pk=pk)
+        return JsonResponse(resource.serialize(obj, fields))
+
+    obj = get_object_or_404(resource.queryset(request.user, ()), pk=pk)
+    if request.method == "DELETE":
+        obj.delete()
+        return HttpResponse(status=204)
+    obj = save(resource, request, instance=obj)
+    obj = resource.queryset(request.user).get(pk=obj.pk)
+    return JsonResponse(resource.serialize(obj))
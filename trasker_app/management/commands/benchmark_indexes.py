@@ -0,0 +1,124 @@
+# trasker_app/management/commands/benchmark_indexes.py
+"""
+Show what the indexes of migration 0002 do to the hot queries.
+
+    python manage.py benchmark_indexes --tasks 200000
+
+Seeds a dataset, then runs EXPLAIN ANALYZE on each query twice: with the indexes and after dropping
+them. Everything happens inside one transaction that is rolled back, so the database is left as it
+was. Meant for PostgreSQL, where DDL is transactional.
+"""
+import datetime
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from trasker_app.models import Issue, Note, Task, TaskSession, Team, WorkWeek
+
+
+class Rollback(Exception):
+    pass
+
+
+def hot_queries(team, workweek, task):
+    """The access paths the indexes are for, as (label, queryset)."""
+    return [
+        ("tasks by team, status and due date",
+         Task.objects.filter(team=team, status="Pending", due_date__lte=datetime.date(2025, 6, 30))
+         .order_by("due_date")),
+        ("tasks of a workweek in a status", Task.objects.filter(workweek=workweek, status="In Progress")),
+        ("open session of a task", TaskSession.objects.filter(task=task, end_time__isnull=True)),
+        ("issues by team and status", Issue.objects.filter(team=team, status="Open")),
+        ("notes by team and type", Note.objects.filter(team=team, note_type="Task")),
+        ("workweeks of a team by start date", WorkWeek.objects.filter(team=team).order_by("start_date")),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Compare query plans with and without the trasker_app indexes on a seeded dataset."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=100000, help="Number of tasks to seed.")
+        parser.add_argument("--teams", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stderr.write("benchmark_indexes needs PostgreSQL (it drops indexes inside a transaction).")
+            return
+        random.seed(options["seed"])
+        try:
+            with transaction.atomic():
+                team, workweek, task = self.seed(options["tasks"], options["teams"])
+                with_indexes = self.explain_all(team, workweek, task)
+                self.drop_indexes()
+                without_indexes = self.explain_all(team, workweek, task)
+                raise Rollback
+        except Rollback:
+            pass
+
+        for label in with_indexes:
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            for heading, results in (("without indexes", without_indexes), ("with indexes", with_indexes)):
+                elapsed, plan = results[label]
+                self.stdout.write(f"  {heading}: {elapsed:.2f} ms")
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+    def seed(self, task_count, team_count):
+        self.stdout.write(f"Seeding {task_count} tasks over {team_count} teams...")
+        started = time.perf_counter()
+        users = User.objects.bulk_create(User(username=f"bench-user-{i}") for i in range(team_count))
+        teams = Team.objects.bulk_create(Team(name=f"bench-team-{i}") for i in range(team_count))
+        weeks = WorkWeek.objects.bulk_create(
+            WorkWeek(title=f"Week {i}", team=teams[i % team_count],
+                     start_date=datetime.date(2024, 1, 1) + datetime.timedelta(weeks=i // team_count))
+            for i in range(team_count * 52))
+        statuses = [status for status, _ in Task.STATUS_CHOICES]
+        tasks = Task.objects.bulk_create(
+            (Task(title=f"Task {i}", team=random.choice(teams), workweek=random.choice(weeks),
+                  status=random.choice(statuses),
+                  due_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=random.randrange(730)))
+             for i in range(task_count)), batch_size=5000)
+        now = timezone.now()
+        # Most sessions are finished; about one in fifty is still running.
+        TaskSession.objects.bulk_create(
+            (TaskSession(task=task, start_time=now, end_time=None if random.random() < 0.02 else now)
+             for task in tasks for _ in range(2)), batch_size=5000)
+        issue_statuses = [status for status, _ in Issue.STATUS_CHOICES]
+        Issue.objects.bulk_create(
+            (Issue(title=f"Issue {i}", team=random.choice(teams), status=random.choice(issue_statuses))
+             for i in range(task_count // 4)), batch_size=5000)
+        note_types = [note_type for note_type, _ in Note.NOTE_TYPE_CHOICES]
+        Note.objects.bulk_create(
+            (Note(note=f"Note {i}", team=random.choice(teams), user=random.choice(users),
+                  note_type=random.choice(note_types))
+             for i in range(task_count // 2)), batch_size=5000)
+        self.analyze()
+        self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f} s")
+        return teams[0], weeks[0], tasks[0]
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            for model in (Task, TaskSession, Issue, Note, WorkWeek):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+    def drop_indexes(self):
+        with connection.schema_editor(atomic=False) as editor:
+            for model in (Task, TaskSession, Issue, Note, WorkWeek):
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+        self.analyze()
+
+    def explain_all(self, team, workweek, task):
+        results = {}
+        for label, queryset in hot_queries(team, workweek, task):
+            plan = queryset.explain(analyze=True)
+            started = time.perf_counter()
+            list(queryset)
+            results[label] = ((time.perf_counter() - started) * 1000, plan)
+        return results
@@ -0,0 +1,110 @@
+# trasker_app/management/commands/loadtest.py
+"""
+Compare the throughput and latency of running Trasker servers.
+
+    docker-compose up -d web                      # runserver on :8000
+    docker-compose --profile prod up -d web-prod  # Gunicorn on :8001
+    python manage.py loadtest http://localhost:8000 http://localhost:8001 --username admin --password ...
+
+Each server gets the same load in turn: --concurrency clients, each on its own keep-alive
+connection, requesting the --path URLs round-robin for --duration seconds. With credentials the
+clients are logged in first; without them the API paths answer 401. Any response other than a
+2xx is counted as an error, so a run with errors is not timing the pages it claims to. Only the
+standard library is used on the client side; the command never touches the database.
+"""
+import http.client
+import http.cookiejar
+import statistics
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ["/accounts/login/", "/api/tasks/?limit=50", "/api/projects/?limit=50"]
+
+
+def log_in(base_url, username, password):
+    """Log in through the login form and return the Cookie header for the session."""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    login_url = urllib.parse.urljoin(base_url, "/accounts/login/")
+    opener.open(login_url).read()
+    csrf = next((cookie.value for cookie in jar if cookie.name == "csrftoken"), None)
+    if csrf is None:
+        raise CommandError(f"{login_url} did not set a csrftoken cookie")
+    form = urllib.parse.urlencode({"username": username, "password": password, "csrfmiddlewaretoken": csrf})
+    opener.open(urllib.request.Request(login_url, data=form.encode(), headers={"Referer": login_url})).read()
+    if not any(cookie.name == "sessionid" for cookie in jar):
+        raise CommandError(f"Logging in to {base_url} as {username} failed")
+    return "; ".join(f"{cookie.name}={cookie.value}" for cookie in jar)
+
+
+def client(base_url, paths, cookie, deadline, results):
+    """Request paths in turn over one keep-alive connection until deadline; append (latency, status)."""
+    url = urllib.parse.urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+    connection = connection_class(url.netloc, timeout=30)
+    headers = {"Cookie": cookie} if cookie else {}
+    samples = []
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            if response.will_close:
+                connection.close()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            status = None
+        samples.append((time.perf_counter() - started, status))
+    connection.close()
+    results.extend(samples)
+
+
+class Command(BaseCommand):
+    help = "Load-test one or more running Trasker servers and compare requests/s and latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="Base URLs of the servers, e.g. http://localhost:8000")
+        parser.add_argument("--path", action="append", dest="paths",
+                            help=f"Path to request; repeatable (default: {', '.join(DEFAULT_PATHS)}).")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=15.0, help="Seconds per server.")
+        parser.add_argument("--username")
+        parser.add_argument("--password")
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or DEFAULT_PATHS
+        for base_url in options["urls"]:
+            cookie = None
+            if options["username"]:
+                cookie = log_in(base_url, options["username"], options["password"] or "")
+            results = []
+            deadline = time.perf_counter() + options["duration"]
+            threads = [threading.Thread(target=client, args=(base_url, paths, cookie, deadline, results))
+                       for _ in range(options["concurrency"])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.report(base_url, results, options["duration"])
+
+    def report(self, base_url, results, duration):
+        self.stdout.write(self.style.MIGRATE_HEADING(base_url))
+        if not results:
+            self.stdout.write("  no requests completed")
+            return
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        # Anything but a 2xx is an error: a fast 400 or a login redirect says nothing about the server.
+        errors = sum(1 for _, status in results if status is None or not 200 <= status < 300)
+        centiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(f"  requests:  {len(results)} ({len(results) / duration:.1f}/s), {errors} errors")
+        self.stdout.write(f"  latency:   p50 {centiles[49]:.1f} ms, p95 {centiles[94]:.1f} ms, "
+                          f"p99 {centiles[98]:.1f} ms, max {latencies[-1]:.1f} ms")
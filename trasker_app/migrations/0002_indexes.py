@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trasker_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workweek',
+            index=models.Index(fields=['project', 'start_date'], name='workweek_project_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workweek',
+            index=models.Index(fields=['team', 'start_date'], name='workweek_team_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['team', 'status', 'due_date'], name='task_team_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['workweek', 'status'], name='task_workweek_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasksession',
+            index=models.Index(condition=models.Q(('end_time__isnull', True)), fields=['task'], name='tasksession_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['team', 'status'], name='issue_team_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['team', 'note_type'], name='note_team_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['note', 'filename'], name='document_note_filename_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['team', 'id'], name='document_team_id_idx'),
+        ),
+    ]
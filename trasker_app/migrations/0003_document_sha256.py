@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:00
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_documents(apps, schema_editor):
+    Document = apps.get_model('trasker_app', 'Document')
+    for document in Document.objects.filter(sha256='').exclude(document_file='').iterator():
+        digest = hashlib.sha256()
+        try:
+            with document.document_file.open('rb') as file:
+                for chunk in file.chunks():
+                    digest.update(chunk)
+        except FileNotFoundError:
+            continue  # The download view hashes it if the file ever turns up.
+        document.sha256 = digest.hexdigest()
+        document.save(update_fields=['sha256'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trasker_app', '0002_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(hash_documents, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,8 @@
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -39,6 +44,12 @@ class WorkWeek(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'start_date'], name='workweek_project_start_idx'),
+            models.Index(fields=['team', 'start_date'], name='workweek_team_start_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -74,6 +85,14 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Task lists filter on team and status and sort or range on due_date.
+            models.Index(fields=['team', 'status', 'due_date'], name='task_team_status_due_idx'),
+            # Board columns: the tasks of a workweek in a given status.
+            models.Index(fields=['workweek', 'status'], name='task_workweek_status_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -86,6 +105,12 @@ class TaskSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Only running sessions are looked up by task; finished ones never are.
+            models.Index(fields=['task'], condition=models.Q(end_time__isnull=True), name='tasksession_open_idx'),
+        ]
+
     def __str__(self):
         return f"Session for {self.task.title} at {self.start_time}"
 
@@ -110,6 +135,11 @@ class Issue(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['team', 'status'], name='issue_team_status_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -131,6 +161,11 @@ class Note(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['team', 'note_type'], name='note_team_type_idx'),
+        ]
+
     def __str__(self):
         return self.note[:50] + "..."
 
@@ -139,11 +174,76 @@ class Document(models.Model): # Singular model name convention
     filename = models.CharField(max_length=255)
     mimetype = models.CharField(max_length=100, blank=True, null=True)
     document_file = models.FileField(upload_to='documents/%Y/%m/%d/')
+    # SHA-256 of the file contents, hex. Downloads use it as their ETag.
+    sha256 = models.CharField(max_length=64, blank=True, default='')
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='uploaded_documents')
     team = models.ForeignKey('Team', on_delete=models.SET_NULL, null=True, blank=True, related_name='team_documents')
     # upload_date is effectively created_at
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # A note's attachments, and a team's documents in the API's id order.
+            models.Index(fields=['note', 'filename'], name='document_note_filename_idx'),
+            models.Index(fields=['team', 'id'], name='document_team_id_idx'),
+        ]
+
     def __str__(self):
-        return self.filename
\ No newline at end of file
+        return self.filename
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        document = super().from_db(db, field_names, values)
+        # The stored file name, to tell in save() whether document_file was replaced since loading.
+        document._stored_file_name = document.__dict__.get('document_file')
+        return document
+
+    def file_changed(self):
+        file = self.document_file
+        if not file:
+            return False
+        if not file._committed:
+            return True  # Newly assigned content, not yet written to storage.
+        if self._state.adding:
+            return not self.sha256  # A file already in storage; trust a hash the caller computed.
+        return file.name != getattr(self, '_stored_file_name', None)
+
+    def save(self, *args, **kwargs):
+        if self.file_changed() or (self.document_file and not self.sha256):
+            self.sha256 = file_sha256(self.document_file)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'sha256' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'sha256']
+        super().save(*args, **kwargs)
+        self._stored_file_name = self.document_file.name
+
+
+class UploadSession(models.Model):
+    """A document upload sent in chunks. The bytes received so far live in part_path() until the last one."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    mimetype = models.CharField(max_length=100, blank=True, null=True)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, null=True, blank=True, related_name='upload_sessions')
+    team = models.ForeignKey('Team', on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload of {self.filename} ({self.received}/{self.size})"
+
+    def part_path(self):
+        # Under MEDIA_ROOT so the finished file can be renamed into place on the same filesystem.
+        return os.path.join(settings.MEDIA_ROOT, 'uploads', f'{self.pk}.part')
+
+
+def file_sha256(file):
+    """Hex SHA-256 of a Django File, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
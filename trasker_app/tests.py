@@ -0,0 +1,339 @@
+import hashlib
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import uploads
+from .models import Document, Issue, Note, Project, Task, Team, UploadSession, WorkWeek
+
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='trasker-test-media-')
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ApiQueryCountTests(TestCase):
+    """Every API endpoint costs the same number of queries whatever the number of rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", password="secret")
+        cls.other = User.objects.create_user("bob", password="secret")
+        cls.team = Team.objects.create(name="Core")
+        cls.team.members.add(cls.user, cls.other)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def add_rows(self, count):
+        """Create count rows of every model, each with its relations and two assignees."""
+        for _ in range(count):
+            n = Project.objects.count()
+            project = Project.objects.create(name=f"Project {n}", team=self.team)
+            project.assignees.add(self.user, self.other)
+            week = WorkWeek.objects.create(title=f"Week {n}", project=project, team=self.team)
+            week.assignees.add(self.user, self.other)
+            task = Task.objects.create(title=f"Task {n}", workweek=week, team=self.team)
+            task.assignees.add(self.user, self.other)
+            issue = Issue.objects.create(title=f"Issue {n}", task=task, team=self.team)
+            issue.assignees.add(self.user, self.other)
+            note = Note.objects.create(note=f"Note {n}", user=self.user, team=self.team)
+            Document.objects.create(note=note, filename=f"doc{n}.txt", user=self.user, team=self.team,
+                                    document_file=ContentFile(b"x", name=f"doc{n}.txt"))
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assert_constant_queries(self, resource, model):
+        list_url = reverse("trasker_app:api_list", args=[resource])
+        self.add_rows(2)
+        list_queries = self.count_queries(list_url)
+        detail_url = reverse("trasker_app:api_detail", args=[resource, model.objects.first().pk])
+        detail_queries = self.count_queries(detail_url)
+
+        self.add_rows(10)
+        with self.assertNumQueries(list_queries):
+            response = self.client.get(list_url)
+        self.assertEqual(len(response.json()["results"]), 12)
+        with self.assertNumQueries(detail_queries):
+            self.client.get(detail_url)
+
+    def test_tasks(self):
+        self.assert_constant_queries("tasks", Task)
+
+    def test_issues(self):
+        self.assert_constant_queries("issues", Issue)
+
+    def test_workweeks(self):
+        self.assert_constant_queries("workweeks", WorkWeek)
+
+    def test_projects(self):
+        self.assert_constant_queries("projects", Project)
+
+    def test_notes(self):
+        self.assert_constant_queries("notes", Note)
+
+    def test_documents(self):
+        self.assert_constant_queries("documents", Document)
+
+    def test_cursor_pagination(self):
+        self.add_rows(5)
+        url = reverse("trasker_app:api_list", args=["tasks"])
+        seen = []
+        response = self.client.get(url, {"limit": 2}).json()
+        seen += [task["id"] for task in response["results"]]
+        while response["next"]:
+            response = self.client.get(url, {"limit": 2, "cursor": response["next"]}).json()
+            seen += [task["id"] for task in response["results"]]
+        self.assertEqual(seen, list(Task.objects.order_by("pk").values_list("pk", flat=True)))
+
+    def test_fields_skip_unused_relations(self):
+        self.add_rows(3)
+        url = reverse("trasker_app:api_list", args=["tasks"])
+        # Session, user, and one query for the tasks: no prefetch of assignees.
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {"fields": "id,title,status"})
+        self.assertEqual(set(response.json()["results"][0]), {"id", "title", "status"})
+
+    def test_rows_of_other_teams_are_hidden(self):
+        Task.objects.create(title="Elsewhere", team=Team.objects.create(name="Other"))
+        response = self.client.get(reverse("trasker_app:api_list", args=["tasks"]))
+        self.assertEqual(response.json()["results"], [])
+
+    def test_bad_filter_values(self):
+        url = reverse("trasker_app:api_list", args=["tasks"])
+        for params in ({"team": "abc"}, {"due_after": "notadate"}, {"status": "Sleeping"}, {"project": "-1"}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.json()["errors"])
+
+    def test_filters(self):
+        self.add_rows(2)
+        url = reverse("trasker_app:api_list", args=["tasks"])
+        task = Task.objects.first()
+        response = self.client.get(url, {"workweek": task.workweek_id, "parent_task": "null"})
+        self.assertEqual([row["id"] for row in response.json()["results"]], [task.pk])
+
+    def test_anonymous_requests_are_rejected(self):
+        self.client.logout()
+        response = self.client.get(reverse("trasker_app:api_list", args=["tasks"]))
+        self.assertEqual(response.status_code, 401)
+
+
+class ApiWriteScopeTests(TestCase):
+    """Writes can only link rows to the user's teams, teammates and visible rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", password="secret")
+        cls.stranger = User.objects.create_user("mallory", password="secret")
+        cls.team = Team.objects.create(name="Core")
+        cls.team.members.add(cls.user)
+        cls.other_team = Team.objects.create(name="Other")
+        cls.other_team.members.add(cls.stranger)
+        cls.other_week = WorkWeek.objects.create(title="Their week", team=cls.other_team)
+        cls.task = Task.objects.create(title="Ours", team=cls.team)
+        cls.list_url = reverse("trasker_app:api_list", args=["tasks"])
+        cls.detail_url = reverse("trasker_app:api_detail", args=["tasks", cls.task.pk])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post(self, data):
+        return self.client.post(self.list_url, data, content_type="application/json")
+
+    def test_create_in_own_team(self):
+        response = self.post({"title": "New", "team": self.team.pk, "assignees": [self.user.pk]})
+        self.assertEqual(response.status_code, 201)
+
+    def test_create_in_other_team(self):
+        response = self.post({"title": "Sneaky", "team": self.other_team.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("team", response.json()["errors"])
+        self.assertFalse(Task.objects.filter(title="Sneaky").exists())
+
+    def test_create_with_other_teams_relations(self):
+        response = self.post({"title": "Sneaky", "team": self.team.pk, "workweek": self.other_week.pk,
+                              "assignees": [self.stranger.pk]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["errors"]), {"workweek", "assignees"})
+
+    def test_create_without_team(self):
+        response = self.post({"title": "Orphan"})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Task.objects.filter(title="Orphan").exists())
+
+    def test_update_into_other_team(self):
+        response = self.client.patch(self.detail_url, {"team": self.other_team.pk}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.team, self.team)
+
+    def test_update_keeps_existing_links(self):
+        # Linked before the stranger was out of reach; editing the title must not trip over it.
+        self.task.assignees.add(self.stranger)
+        response = self.client.patch(self.detail_url, {"title": "Renamed"}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Renamed")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DocumentDownloadTests(TestCase):
+    content = bytes(range(256)) * 40
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", password="secret")
+        cls.team = Team.objects.create(name="Core")
+        cls.team.members.add(cls.user)
+        cls.document = Document.objects.create(filename="data.bin", team=cls.team, user=cls.user,
+                                               document_file=ContentFile(cls.content, name="data.bin"))
+        cls.url = reverse("trasker_app:document_download", args=[cls.document.pk])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["ETag"], f'"{hashlib.sha256(self.content).hexdigest()}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_range(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=100-199"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.content)}")
+        self.assertEqual(b"".join(response.streaming_content), self.content[100:200])
+
+    def test_suffix_range(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=-10"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.content[-10:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, headers={"Range": f"bytes={len(self.content)}-"})
+        self.assertEqual(response.status_code, 416)
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_replaced_file_gets_new_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        document = Document.objects.get(pk=self.document.pk)
+        document.document_file = ContentFile(b"new contents", name="data.bin")
+        document.save()
+        self.assertEqual(document.sha256, hashlib.sha256(b"new contents").hexdigest())
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"new contents")
+
+    def test_saving_without_file_change_keeps_hash(self):
+        document = Document.objects.get(pk=self.document.pk)
+        document.filename = "renamed.bin"
+        document.save()
+        self.assertEqual(document.sha256, self.document.sha256)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ChunkedUploadTests(TestCase):
+    content = bytes(range(256)) * 100
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", password="secret")
+        cls.team = Team.objects.create(name="Core")
+        cls.team.members.add(cls.user)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def start(self):
+        response = self.client.post(reverse("trasker_app:upload_start"), {
+            "filename": "design.bin", "size": len(self.content), "team": self.team.pk,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        return reverse("trasker_app:upload_session", args=[response.json()["id"]])
+
+    def put_chunk(self, url, first, last):
+        return self.client.put(url, self.content[first:last + 1], content_type="application/octet-stream",
+                               headers={"Content-Range": f"bytes {first}-{last}/{len(self.content)}"})
+
+    def test_upload_in_chunks(self):
+        url = self.start()
+        self.assertEqual(self.put_chunk(url, 0, 9999).json()["offset"], 10000)
+        response = self.put_chunk(url, 10000, len(self.content) - 1)
+        self.assertEqual(response.status_code, 201)
+        document = Document.objects.get(pk=response.json()["id"])
+        self.assertEqual(document.sha256, hashlib.sha256(self.content).hexdigest())
+        with document.document_file.open("rb") as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_resume_in_another_process(self):
+        url = self.start()
+        self.put_chunk(url, 0, 4999)
+        uploads.hashers.clear()  # The next chunk lands on a worker that never saw this upload.
+        response = self.put_chunk(url, 5000, len(self.content) - 1)
+        self.assertEqual(response.json()["sha256"], hashlib.sha256(self.content).hexdigest())
+
+    def test_out_of_order_chunk(self):
+        url = self.start()
+        self.put_chunk(url, 0, 999)
+        response = self.put_chunk(url, 2000, 2999)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], 1000)
+
+    def test_other_teams_and_notes_are_refused(self):
+        other_team = Team.objects.create(name="Other")
+        their_note = Note.objects.create(note="Theirs", team=other_team)
+        for data in ({"team": other_team.pk}, {"note": their_note.pk}):
+            response = self.client.post(reverse("trasker_app:upload_start"),
+                                        {"filename": "x.bin", "size": 10, **data}, content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(next(iter(data)), response.json()["errors"])
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_idle_hashes_are_dropped(self):
+        url = self.start()
+        self.put_chunk(url, 0, 4999)
+        with mock.patch.object(uploads.time, "monotonic", return_value=time.monotonic() + uploads.HASHER_IDLE_SECONDS + 1):
+            self.start()  # Any other upload sweeps out the idle entry.
+        self.assertEqual(len(uploads.hashers), 1)
+        response = self.put_chunk(url, 5000, len(self.content) - 1)
+        self.assertEqual(response.json()["sha256"], hashlib.sha256(self.content).hexdigest())
+
+    def test_failed_move_leaves_no_document(self):
+        url = self.start()
+        self.put_chunk(url, 0, 4999)
+        with mock.patch.object(uploads.os, "replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.put_chunk(url, 5000, len(self.content) - 1)
+        self.assertFalse(Document.objects.exists())
+        self.assertEqual(UploadSession.objects.get().received, 5000)
+
+    def test_abort(self):
+        url = self.start()
+        self.put_chunk(url, 0, 999)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(UploadSession.objects.exists())
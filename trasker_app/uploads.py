@@ -0,0 +1,178 @@
+# trasker_app/uploads.py
+"""
+Resumable, chunked document uploads.
+
+    POST   /uploads/          {"filename", "size", "mimetype"?, "note"?, "team"?}  -> 201 {"id", "offset", ...}
+    GET    /uploads/<id>/     where to resume: {"offset": bytes received so far, ...}
+    PUT    /uploads/<id>/     one chunk as the raw body, with "Content-Range: bytes <first>-<last>/<size>"
+    DELETE /uploads/<id>/     abandon the upload
+
+Chunks must arrive in order: a chunk whose first byte isn't the session's offset gets 409 with the
+offset to send from. A chunk cut short by a dropped connection isn't counted; the client asks for the
+offset and sends it again. The chunk that completes the file answers 201 with the new Document.
+
+Chunks are streamed from the request straight into a .part file under MEDIA_ROOT and hashed on
+the way, so the finished file is never read back or copied: it is renamed into documents/%Y/%m/%d/
+and its SHA-256 stored with it. This needs a storage on the local filesystem (FileSystemStorage).
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+
+from django.db import transaction
+from django.forms import modelform_factory
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods
+
+from .api import RESOURCES, ApiError, json_view, limit_choices, request_data
+from .models import Document, UploadSession
+
+UPLOAD_READ_SIZE = 64 * 1024
+
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+UploadSessionForm = modelform_factory(UploadSession, fields=["filename", "mimetype", "size", "note", "team"])
+
+# How long a running hash is kept in memory after the last chunk of its upload.
+HASHER_IDLE_SECONDS = 15 * 60
+
+# Running hashes of the uploads this process is receiving: session id -> (offset, hash object, last used).
+# hashlib objects can't be stored, so when a session resumes in another process, after a restart or
+# after its entry went idle, the hash of the bytes already received is rebuilt from the .part file once.
+# Gunicorn's threads share it, so it is only touched with hashers_lock held.
+hashers = {}
+hashers_lock = threading.Lock()
+
+
+def remember_hash(session, hasher):
+    now = time.monotonic()
+    with hashers_lock:
+        for pk in [pk for pk, (_, _, used) in hashers.items() if now - used > HASHER_IDLE_SECONDS]:
+            del hashers[pk]  # Abandoned uploads; resuming one rebuilds its hash.
+        hashers[session.pk] = (session.received, hasher, now)
+
+
+def forget_hash(session):
+    with hashers_lock:
+        hashers.pop(session.pk, None)
+
+
+def session_status(session):
+    return {"id": str(session.pk), "filename": session.filename, "size": session.size, "offset": session.received}
+
+
+def running_hash(session):
+    with hashers_lock:
+        offset, hasher, _ = hashers.get(session.pk, (None, None, None))
+    if offset == session.received:
+        return hasher
+    hasher = hashlib.sha256()
+    with open(session.part_path(), "rb") as part:
+        remaining = session.received
+        while remaining:
+            data = part.read(min(UPLOAD_READ_SIZE, remaining))
+            if not data:
+                raise ApiError("Upload data is missing; start a new upload", status=410)
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+
+def receive_chunk(request, session, length):
+    """Append `length` bytes of the request body to the .part file. Returns the hash including them."""
+    # Work on a copy so a chunk that is cut short leaves the running hash as it was.
+    hasher = running_hash(session).copy()
+    received = 0
+    with open(session.part_path(), "r+b") as part:
+        # Overwrite whatever a previous, interrupted attempt at this chunk left behind.
+        part.seek(session.received)
+        part.truncate()
+        while received < length:
+            data = request.read(min(UPLOAD_READ_SIZE, length - received))
+            if not data:
+                break
+            part.write(data)
+            hasher.update(data)
+            received += len(data)
+    if received != length:
+        raise ApiError(f"Chunk ended after {received} of {length} bytes; resume from offset {session.received}")
+    return hasher
+
+
+def finish(session, digest):
+    """Create the Document for a completed upload and move its .part file into document storage."""
+    field = Document._meta.get_field("document_file")
+    document = Document(note=session.note, filename=session.filename, mimetype=session.mimetype,
+                        user=session.user, team=session.team, sha256=digest)
+    name = field.storage.get_available_name(field.generate_filename(document, session.filename))
+    path = field.storage.path(name)
+    document.document_file.name = name
+    # Saved first: if the rename then fails, the caller's transaction drops the row and no file is orphaned.
+    document.save()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(session.part_path(), path)
+    forget_hash(session)
+    session.delete()
+    return document
+
+
+@require_http_methods(["POST"])
+@json_view
+def upload_start_view(request):
+    data, _ = request_data(request)
+    form = UploadSessionForm(data)
+    # Only the user's own teams and notes they can see, as for the API's writes.
+    limit_choices(form, request.user)
+    if not form.is_valid():
+        raise ApiError("Validation failed", errors=form.errors.get_json_data())
+    if form.cleaned_data["size"] <= 0:
+        raise ApiError("size must be positive")
+    session = form.save(commit=False)
+    session.user = request.user
+    session.save()
+    os.makedirs(os.path.dirname(session.part_path()), exist_ok=True)
+    open(session.part_path(), "wb").close()
+    remember_hash(session, hashlib.sha256())
+    return JsonResponse(session_status(session), status=201)
+
+
+@require_http_methods(["GET", "PUT", "DELETE"])
+@json_view
+def upload_session_view(request, pk):
+    if request.method == "GET":
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        return JsonResponse(session_status(session))
+
+    with transaction.atomic():
+        # The row lock keeps two requests for the same upload from writing the .part file at once.
+        session = get_object_or_404(UploadSession.objects.select_for_update(), pk=pk, user=request.user)
+        if request.method == "DELETE":
+            forget_hash(session)
+            try:
+                os.remove(session.part_path())
+            except FileNotFoundError:
+                pass
+            session.delete()
+            return HttpResponse(status=204)
+
+        match = CONTENT_RANGE.match(request.headers.get("Content-Range", ""))
+        if match is None:
+            raise ApiError("Content-Range: bytes <first>-<last>/<size> is required")
+        first, last, size = (int(group) for group in match.groups())
+        if size != session.size or last < first or last >= size:
+            raise ApiError(f"Content-Range does not fit an upload of {session.size} bytes")
+        if first != session.received:
+            return JsonResponse({**session_status(session), "error": f"Expected offset {session.received}"},
+                                status=409)
+
+        hasher = receive_chunk(request, session, last - first + 1)
+        session.received = last + 1
+        if session.received < session.size:
+            session.save(update_fields=["received", "updated_at"])
+            remember_hash(session, hasher)
+            return JsonResponse(session_status(session))
+        document = finish(session, hasher.hexdigest())
+    return JsonResponse(RESOURCES["documents"].serialize(document), status=201)
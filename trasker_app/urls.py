@@ -1,9 +1,14 @@
 # trasker_app/urls.py
 from django.urls import path
-from . import views
+from . import api, uploads, views
 
 app_name = 'trasker_app'
 urlpatterns = [
     path('', views.app_home_view, name='app_home'),
+    path('api/<str:resource>/', api.api_list_view, name='api_list'),
+    path('api/<str:resource>/<int:pk>/', api.api_detail_view, name='api_detail'),
+    path('uploads/', uploads.upload_start_view, name='upload_start'),
+    path('uploads/<uuid:pk>/', uploads.upload_session_view, name='upload_session'),
+    path('documents/<int:pk>/download/', views.document_download_view, name='document_download'),
     # other app-specific paths
-]
\ No newline at end of file
+]
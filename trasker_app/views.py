@@ -1,7 +1,12 @@
 # trasker_app/views.py
-from django.shortcuts import render, redirect
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required
-from .models import Task, Team
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_http_methods
+from .api import RESOURCES
+from .models import Task, Team, file_sha256
 from .forms import TaskForm # You'll create a TaskForm in forms.py
 
 
@@ -33,3 +38,100 @@ def add_task_view(request):
     return render(request, 'trasker_app/add_task_form.html', {'form': form})
 
 
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """File-like view of `length` bytes of `file` from `start` on, for FileResponse to stream."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    The (first, last) byte positions, inclusive, asked for by a Range header on a file of `size` bytes.
+    Returns None when the whole file should be sent: no header, several ranges, or a header that
+    doesn't parse (RFC 9110 lets a server ignore those). Raises RangeNotSatisfiable when the range
+    starts past the end of the file.
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    try:
+        first = int(first) if first else None
+        last = int(last) if last else None
+    except ValueError:
+        return None
+    if first is None:
+        # "bytes=-N": the last N bytes.
+        if last is None:
+            return None
+        if last == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - last), size - 1
+    if last is not None and last < first:
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable
+    return first, size - 1 if last is None else min(last, size - 1)
+
+
+@login_required
+@require_http_methods(['GET', 'HEAD'])
+def document_download_view(request, pk):
+    """
+    Stream a document in chunks, whole or one byte range of it.
+
+    The ETag is the stored SHA-256 of the contents, so conditional requests (If-None-Match,
+    If-Modified-Since) are answered with 304 from the database row alone, before the file is opened.
+    """
+    document = get_object_or_404(RESOURCES['documents'].queryset(request.user, ()), pk=pk)
+    if not document.sha256:
+        # Saved before hashes were recorded and the file was missing when migration 0003 ran.
+        document.sha256 = file_sha256(document.document_file)
+        document.save(update_fields=['sha256'])
+    etag = f'"{document.sha256}"'
+    last_modified = int(document.updated_at.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        file = document.document_file
+        size = file.size
+        byte_range = None
+        # If-Range: only send the range if the client's copy is still this version of the file.
+        if request.headers.get('If-Range', etag) in (etag, http_date(last_modified)):
+            try:
+                byte_range = parse_range(request.headers.get('Range'), size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+        file.open('rb')
+        if byte_range is None:
+            response = FileResponse(file, as_attachment=True, filename=document.filename,
+                                    content_type=document.mimetype or None)
+        else:
+            first, last = byte_range
+            response = FileResponse(FileRange(file, first, last - first + 1), status=206, as_attachment=True,
+                                    filename=document.filename, content_type=document.mimetype or None)
+            response['Content-Length'] = str(last - first + 1)
+            response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Accept-Ranges'] = 'bytes'
+        response['Last-Modified'] = http_date(last_modified)
+    response['ETag'] = etag
+    # Private to the user, and revalidated on every use, which the ETag makes cheap.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response